@@ -1,18 +1,85 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi_azure_auth import SingleTenantAzureAuthorizationCodeBearer
 from llm4quality_api.routes.routes import router
+from llm4quality_api.routes.health import router as health_router
+from llm4quality_api.routes.debug import router as debug_router
+import asyncio
+import time
 from threading import Thread
 from llm4quality_api.config.config import Config
-from llm4quality_api.utils.broker import consume_messages
-from llm4quality_api.tasks.verbatims import handle_worker_response
+from llm4quality_api.controllers.verbatim_controller import get_verbatim_controller
+from llm4quality_api.db.circuit_breaker import DatabaseUnavailableError
+from llm4quality_api.utils.broker import (
+    consume_messages,
+    consume_broadcasts,
+    check_connection,
+)
+from llm4quality_api.utils.logger import Logger
+from llm4quality_api.utils.profiling import LoopWatchdog
+from llm4quality_api.utils.startup import (
+    retry_failed_phases,
+    run_blocking,
+    run_phases,
+)
+from llm4quality_api.tasks.verbatims import (
+    handle_worker_response,
+    handle_broadcast_update,
+    set_main_loop,
+)
+from llm4quality_api.tasks.scheduler import DispatchScheduler
+
+# Logger instance
+logger = Logger.get_instance().get_logger()
 
 
 async def lifespan(app: FastAPI):
-    # Perform startup tasks
-    await azure_scheme.openid_config.load_config()
+    # Report the event loop stalls from the start, when enabled
+    watchdog = None
+    if Config.LOOP_WATCHDOG_ENABLED:
+        watchdog = LoopWatchdog(
+            threshold=Config.LOOP_STALL_THRESHOLD_MS / 1000,
+            interval=Config.LOOP_HEARTBEAT_INTERVAL_MS / 1000,
+        )
+        watchdog.start()
+    app.state.loop_watchdog = watchdog
+
+    # Perform the independent startup tasks in parallel, each with a timeout.
+    # A failed phase does not prevent the startup: readiness reports it, and
+    # it is retried in the background until it succeeds.
+    start = time.perf_counter()
+    controller = get_verbatim_controller()
+    startup_phases = {
+        "openid_config": azure_scheme.openid_config.load_config,
+        "mongodb": lambda: run_blocking(controller.ensure_indexes),
+        "rabbitmq": lambda: run_blocking(check_connection, Config.STARTUP_TIMEOUT_SECONDS),
+    }
+    phases = await run_phases(startup_phases, timeout=Config.STARTUP_TIMEOUT_SECONDS)
+    app.state.startup_report = {
+        "phases": phases,
+        "total_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+    logger.info(f"Startup report: {app.state.startup_report}")
+    startup_retry = asyncio.create_task(
+        retry_failed_phases(
+            startup_phases,
+            phases,
+            timeout=Config.STARTUP_TIMEOUT_SECONDS,
+            interval=Config.STARTUP_RETRY_INTERVAL_SECONDS,
+        )
+    )
 
-    # Start the message consumer thread
+    # Start the broadcast consumer thread feeding the WebSocket clients of this process
+    set_main_loop(asyncio.get_running_loop())
+    broadcast_thread = Thread(
+        target=consume_broadcasts,
+        args=(Config.BROADCAST_EXCHANGE, handle_broadcast_update),
+        daemon=True,
+    )
+    broadcast_thread.start()
+
+    # Start the message consumer thread, competing with the other processes
     consumer_thread = Thread(
         target=consume_messages,
         args=("worker_responses", handle_worker_response),
@@ -20,9 +87,17 @@ async def lifespan(app: FastAPI):
     )
     consumer_thread.start()
 
+    # Start the redispatch of verbatims stuck in RUN
+    scheduler = DispatchScheduler()
+    scheduler.start()
+
     yield
 
     # Perform shutdown tasks if necessary
+    startup_retry.cancel()
+    await scheduler.stop()
+    if watchdog:
+        await watchdog.stop()
     # For example, join the consumer thread if it's not daemonized
     # consumer_thread.join()
 
@@ -71,10 +146,33 @@ azure_scheme = SingleTenantAzureAuthorizationCodeBearer(
     scopes=Config.SCOPES,
 )
 
+# Fail fast while the database circuit breaker is open, for every route
+@app.exception_handler(DatabaseUnavailableError)
+async def database_unavailable_handler(request: Request, exc: DatabaseUnavailableError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
 # Include API routes
 app.include_router(router)
+app.include_router(health_router)
+if Config.DEBUG_ENDPOINTS_ENABLED:
+    app.include_router(debug_router)
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=int(Config.PORT))
+    if Config.WORKERS > 1:
+        # Each worker process imports the app and elects its own consumers
+        uvicorn.run(
+            "llm4quality_api.app:app",
+            host="0.0.0.0",
+            port=int(Config.PORT),
+            workers=Config.WORKERS,
+            ws_per_message_deflate=Config.WS_PER_MESSAGE_DEFLATE,
+        )
+    else:
+        uvicorn.run(
+            app,
+            host="0.0.0.0",
+            port=int(Config.PORT),
+            ws_per_message_deflate=Config.WS_PER_MESSAGE_DEFLATE,
+        )
@@ -2,6 +2,8 @@ from fastapi import Depends, HTTPException, Security
 from fastapi.security import OAuth2AuthorizationCodeBearer
 from msal import ConfidentialClientApplication
 from starlette.requests import Request
+from functools import lru_cache
+from typing import Optional
 import os
 from fastapi import WebSocket, WebSocketDisconnect
 import json
@@ -17,11 +19,19 @@ client_secret = os.environ.get("CLIENT_SECRET")
 authority = os.environ.get("AUTHORITY")
 api_scope = [os.environ.get("API_SCOPE")]
 
-app = ConfidentialClientApplication(
-    client_id,
-    authority=authority,
-    client_credential=client_secret,
-)
+
+@lru_cache(maxsize=None)
+def get_msal_app() -> ConfidentialClientApplication:
+    """
+    Get the MSAL application, created on first use since its creation fetches
+    the authority metadata over the network.
+    """
+    return ConfidentialClientApplication(
+        client_id,
+        authority=authority,
+        client_credential=client_secret,
+    )
+
 
 oauth2_scheme = OAuth2AuthorizationCodeBearer(
     authorizationUrl="https://login.microsoftonline.com/4c1633ed-3be4-4aa7-a440-b4b227becdde/oauth2/v2.0/authorize",
@@ -29,19 +39,46 @@ oauth2_scheme = OAuth2AuthorizationCodeBearer(
 )
 
 async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)):
-    result = app.acquire_token_on_behalf_of(token, scopes=api_scope)
+    result = get_msal_app().acquire_token_on_behalf_of(token, scopes=api_scope)
 
     if "error" in result:
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
     return result["id_token_claims"]
 
 
-async def get_current_user_websocket(token: str = Depends(oauth2_scheme)):
-    result = app.acquire_token_on_behalf_of(token, scopes=api_scope)
+async def get_current_user_websocket(websocket: WebSocket):
+    """
+    Authenticate a WebSocket client from the access token passed in the
+    `token` query parameter or the Authorization header.
+
+    Returns None for an anonymous client or an invalid token, the connection
+    is still accepted but cannot use the actions tied to a user.
+    """
+    token = websocket.query_params.get("token")
+    authorization = websocket.headers.get("authorization", "")
+    if not token and authorization.lower().startswith("bearer "):
+        token = authorization[len("bearer "):]
+    if not token:
+        return
 
+    result = get_msal_app().acquire_token_on_behalf_of(token, scopes=api_scope)
     if "error" in result:
-        # If the token is invalid, close the websocket connection
         return
 
     # If the token is valid, return the claims
     return result["id_token_claims"]
+
+
+def get_principal_id(claims: Optional[dict]) -> Optional[str]:
+    """
+    Get the stable identifier of an authenticated user.
+
+    Args:
+        claims (Optional[dict]): The ID token claims of the user.
+
+    Returns:
+        Optional[str]: The Azure AD object ID of the user, None if anonymous.
+    """
+    if not claims:
+        return None
+    return claims.get("oid") or claims.get("sub")
@@ -1,4 +1,5 @@
 import os
+import socket
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -7,7 +8,45 @@ class Config:
     # MongoDB Configuration
     MONGO_URI = os.getenv("MONGO_URI", "mongodb://mongodb-service:27017/llm_quality")
     MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "llm4quality")
+    MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 100))
+    MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 60000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(
+        os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000)
+    )
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 5000))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", 30000))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 5000))
+    # Read preference of the listing, count and analytics queries
+    MONGO_ANALYTICS_READ_PREFERENCE = os.getenv(
+        "MONGO_ANALYTICS_READ_PREFERENCE", "secondaryPreferred"
+    )
+    # Write concern of the bulk ingestion, acknowledged by at least 1 member
+    MONGO_BULK_WRITE_CONCERN_W = int(os.getenv("MONGO_BULK_WRITE_CONCERN_W", 1))
+    MONGO_BULK_WRITE_CONCERN_J = (
+        os.getenv("MONGO_BULK_WRITE_CONCERN_J", "false").lower() == "true"
+    )
+    MONGO_CIRCUIT_FAILURE_THRESHOLD = int(
+        os.getenv("MONGO_CIRCUIT_FAILURE_THRESHOLD", 5)
+    )
+    MONGO_CIRCUIT_RESET_SECONDS = float(os.getenv("MONGO_CIRCUIT_RESET_SECONDS", 30))
     PORT = os.getenv("PORT", 3000)
+    # Store classification results in their compact codebook representation
+    COMPACT_RESULTS = os.getenv("COMPACT_RESULTS", "false").lower() == "true"
+    WORKERS = int(os.getenv("WORKERS", 1))
+    STARTUP_TIMEOUT_SECONDS = float(os.getenv("STARTUP_TIMEOUT_SECONDS", 10))
+    HEALTH_CHECK_TIMEOUT_SECONDS = float(os.getenv("HEALTH_CHECK_TIMEOUT_SECONDS", 2))
+    HEALTH_CHECK_THREADS = int(os.getenv("HEALTH_CHECK_THREADS", 4))
+    STARTUP_RETRY_INTERVAL_SECONDS = float(
+        os.getenv("STARTUP_RETRY_INTERVAL_SECONDS", 10)
+    )
+
+    # WebSocket Configuration (batch framing defaults, compression of the frames)
+    WS_BATCH_SIZE = int(os.getenv("WS_BATCH_SIZE", 500))
+    WS_FLUSH_INTERVAL_MS = int(os.getenv("WS_FLUSH_INTERVAL_MS", 250))
+    WS_PER_MESSAGE_DEFLATE = (
+        os.getenv("WS_PER_MESSAGE_DEFLATE", "true").lower() == "true"
+    )
 
     # RabbitMQ Configuration
     RABBITMQ_HOST = os.getenv("RABBITMQ_HOST", "localhost")
@@ -15,6 +54,80 @@ class Config:
     RABBITMQ_USERNAME = os.getenv("RABBITMQ_USERNAME", "guest")
     RABBITMQ_PASSWORD = os.getenv("RABBITMQ_PASSWORD", "guest")
 
+    # Dispatch Configuration
+    DISPATCH_TIMEOUT_SECONDS = float(os.getenv("DISPATCH_TIMEOUT_SECONDS", 600))
+    DISPATCH_BACKOFF_FACTOR = float(os.getenv("DISPATCH_BACKOFF_FACTOR", 2))
+    DISPATCH_MAX_ATTEMPTS = int(os.getenv("DISPATCH_MAX_ATTEMPTS", 3))
+    DISPATCH_SWEEP_INTERVAL_SECONDS = float(
+        os.getenv("DISPATCH_SWEEP_INTERVAL_SECONDS", 5)
+    )
+    DISPATCH_SWEEP_BATCH_SIZE = int(os.getenv("DISPATCH_SWEEP_BATCH_SIZE", 500))
+
+    # Admission Control Configuration (a maximum backlog of 0 disables it)
+    ADMISSION_MAX_BACKLOG = int(os.getenv("ADMISSION_MAX_BACKLOG", 10000))
+    ADMISSION_SAMPLE_TTL_SECONDS = float(os.getenv("ADMISSION_SAMPLE_TTL_SECONDS", 2))
+    ADMISSION_THROUGHPUT_WINDOW_SECONDS = float(
+        os.getenv("ADMISSION_THROUGHPUT_WINDOW_SECONDS", 300)
+    )
+
+    # Latency Statistics Configuration (completed verbatims sampled for the percentiles)
+    LATENCY_SAMPLE_SIZE = int(os.getenv("LATENCY_SAMPLE_SIZE", 10000))
+    # Throughput periods returned, also the default window of the statistics
+    LATENCY_MAX_PERIODS = int(os.getenv("LATENCY_MAX_PERIODS", 1440))
+
+    # Pre-filter Configuration, keeping trivial lines away from the workers
+    # ("short_circuit" stores them as classified with an empty result,
+    # "skip" drops them, "off" disables the pre-filter)
+    PREFILTER_MODE = os.getenv("PREFILTER_MODE", "short_circuit")
+    PREFILTER_RULES = os.getenv(
+        "PREFILTER_RULES", "header,punctuation,placeholder,numeric,too_short,language"
+    )
+    PREFILTER_MIN_LENGTH = int(os.getenv("PREFILTER_MIN_LENGTH", 3))
+    PREFILTER_PLACEHOLDERS = os.getenv(
+        "PREFILTER_PLACEHOLDERS",
+        "ras,r.a.s,r.a.s.,n/a,na,nc,nsp,néant,neant,rien,aucun,aucune,sans objet,none",
+    )
+    PREFILTER_HEADERS = os.getenv(
+        "PREFILTER_HEADERS", "verbatim,verbatims,commentaire,commentaires,texte,content"
+    )
+
+    # Consistency Evaluation Configuration (results kept per verbatim)
+    RESULT_HISTORY_SIZE = int(os.getenv("RESULT_HISTORY_SIZE", 20))
+
+    # Resumable Uploads Configuration (rows committed per checkpoint)
+    UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 1000))
+
+    # Background Jobs Configuration
+    DELETE_CHUNK_SIZE = int(os.getenv("DELETE_CHUNK_SIZE", 1000))
+    DELETE_THROTTLE_SECONDS = float(os.getenv("DELETE_THROTTLE_SECONDS", 0.1))
+    ARCHIVE_CHUNK_SIZE = int(os.getenv("ARCHIVE_CHUNK_SIZE", 1000))
+    ARCHIVE_THROTTLE_SECONDS = float(os.getenv("ARCHIVE_THROTTLE_SECONDS", 0.1))
+    # Running jobs are touched every JOB_HEARTBEAT_SECONDS, and failed once
+    # not touched for JOB_STALE_SECONDS, e.g. after a restart
+    JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", 10))
+    JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", 60))
+
+    # Tiering Configuration (archived years are moved to a compressed collection)
+    ARCHIVE_COMPRESSOR = os.getenv("ARCHIVE_COMPRESSOR", "zstd")
+    TIER_CACHE_SECONDS = float(os.getenv("TIER_CACHE_SECONDS", 30))
+
+    # Scaling Configuration
+    BROADCAST_EXCHANGE = os.getenv("BROADCAST_EXCHANGE", "verbatim_updates")
+    # The pid tells apart the worker processes sharing the environment, each
+    # one competing for the scheduler lease on its own
+    INSTANCE_ID = f"{os.getenv('INSTANCE_ID', socket.gethostname())}-{os.getpid()}"
+    LEADER_LEASE_SECONDS = float(os.getenv("LEADER_LEASE_SECONDS", 30))
+
+    # Debug Configuration (the watchdog and the debug endpoints are disabled by default)
+    LOOP_WATCHDOG_ENABLED = os.getenv("LOOP_WATCHDOG_ENABLED", "false").lower() == "true"
+    LOOP_STALL_THRESHOLD_MS = float(os.getenv("LOOP_STALL_THRESHOLD_MS", 200))
+    LOOP_HEARTBEAT_INTERVAL_MS = float(os.getenv("LOOP_HEARTBEAT_INTERVAL_MS", 50))
+    DEBUG_ENDPOINTS_ENABLED = (
+        os.getenv("DEBUG_ENDPOINTS_ENABLED", "false").lower() == "true"
+    )
+    PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", 60))
+    PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", 10))
+
     # Azure Configuration
     APP_CLIENT_ID = os.getenv("APP_CLIENT_ID", "")
     TENANT_ID = os.getenv("TENANT_ID", "")
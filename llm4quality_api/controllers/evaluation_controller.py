@@ -0,0 +1,57 @@
+from functools import lru_cache
+from llm4quality_api.db.db import MongoDBClient
+from llm4quality_api.db.circuit_breaker import guarded
+from datetime import datetime, timezone
+from typing import Optional
+
+
+class EvaluationController:
+    def __init__(self):
+        self.client = MongoDBClient()
+        self.collection = self.client.get_collection("evaluations")
+
+    @guarded
+    async def save_evaluation(self, year: int, report: dict, job_id: str) -> dict:
+        """
+        Cache the consistency evaluation of a year, replacing the previous one.
+
+        Args:
+            year (int): Year of the evaluated verbatims.
+            report (dict): The evaluation report.
+            job_id (str): ID of the job that computed it.
+
+        Returns:
+            dict: The cached evaluation.
+        """
+        evaluation = {
+            "year": year,
+            "job_id": job_id,
+            "computed_at": datetime.now(timezone.utc),
+            **report,
+        }
+        self.collection.replace_one({"_id": year}, evaluation, upsert=True)
+        return evaluation
+
+    @guarded
+    async def find_evaluation(self, year: int) -> Optional[dict]:
+        """
+        Retrieve the cached consistency evaluation of a year.
+
+        Args:
+            year (int): Year of the evaluated verbatims.
+
+        Returns:
+            Optional[dict]: The cached evaluation or None.
+        """
+        return self.collection.find_one({"_id": year}, {"_id": 0})
+
+
+@lru_cache(maxsize=None)
+def get_evaluation_controller() -> EvaluationController:
+    """
+    Get the shared EvaluationController instance, created on first use.
+
+    Returns:
+        EvaluationController: The EvaluationController instance.
+    """
+    return EvaluationController()
@@ -0,0 +1,170 @@
+from functools import lru_cache
+from bson import ObjectId
+from llm4quality_api.models.models import Job, JobStatus
+from llm4quality_api.db.db import MongoDBClient
+from llm4quality_api.db.circuit_breaker import guarded
+from datetime import datetime, timezone
+from typing import Optional
+
+
+class JobController:
+    def __init__(self):
+        self.client = MongoDBClient()
+        self.collection = self.client.get_collection("jobs")
+
+    @guarded
+    async def create_job(self, kind: str, params: dict, total: int = 0) -> Job:
+        """
+        Register a new background job.
+
+        Args:
+            kind (str): Type of the job.
+            params (dict): Parameters the job was started with.
+            total (int): Number of items the job has to process.
+
+        Returns:
+            Job: The created job.
+        """
+        now = datetime.now(timezone.utc)
+        job = {
+            "kind": kind,
+            "status": JobStatus.PENDING.value,
+            "params": params,
+            "total": total,
+            "processed": 0,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        job["_id"] = self.collection.insert_one(job).inserted_id
+        return Job.from_dict(job)
+
+    @guarded
+    async def update_progress(
+        self, job_id: str, processed: int, total: Optional[int] = None
+    ):
+        """
+        Record the progress of a running job.
+
+        Args:
+            job_id (str): ID of the job.
+            processed (int): Number of items processed so far.
+            total (Optional[int]): Updated number of items to process.
+        """
+        update_data = {
+            "status": JobStatus.RUNNING.value,
+            "processed": processed,
+            "updated_at": datetime.now(timezone.utc),
+        }
+        if total is not None:
+            update_data["total"] = total
+        self.collection.update_one({"_id": ObjectId(job_id)}, {"$set": update_data})
+
+    @guarded
+    async def complete_job(self, job_id: str, result: Optional[dict] = None):
+        """
+        Mark a job as successfully completed.
+
+        Args:
+            job_id (str): ID of the job.
+            result (Optional[dict]): Summary of the job outcome.
+        """
+        self.collection.update_one(
+            {"_id": ObjectId(job_id)},
+            {
+                "$set": {
+                    "status": JobStatus.SUCCESS.value,
+                    "result": result,
+                    "updated_at": datetime.now(timezone.utc),
+                }
+            },
+        )
+
+    @guarded
+    async def fail_job(self, job_id: str, error: str):
+        """
+        Mark a job as failed.
+
+        Args:
+            job_id (str): ID of the job.
+            error (str): Description of the failure.
+        """
+        self.collection.update_one(
+            {"_id": ObjectId(job_id)},
+            {
+                "$set": {
+                    "status": JobStatus.ERROR.value,
+                    "error": error,
+                    "updated_at": datetime.now(timezone.utc),
+                }
+            },
+        )
+
+    @guarded
+    async def heartbeat(self, job_id: str):
+        """
+        Record that the process running a job is still alive.
+
+        Args:
+            job_id (str): ID of the job.
+        """
+        self.collection.update_one(
+            {
+                "_id": ObjectId(job_id),
+                "status": {"$in": [JobStatus.PENDING.value, JobStatus.RUNNING.value]},
+            },
+            {"$set": {"updated_at": datetime.now(timezone.utc)}},
+        )
+
+    @guarded
+    async def fail_orphaned_jobs(self, stale_before: datetime) -> int:
+        """
+        Mark as failed the unfinished jobs whose process stopped updating
+        them, e.g. because it was restarted.
+
+        Args:
+            stale_before (datetime): Jobs not updated since then are orphaned.
+
+        Returns:
+            int: Number of jobs marked as failed.
+        """
+        result = self.collection.update_many(
+            {
+                "status": {"$in": [JobStatus.PENDING.value, JobStatus.RUNNING.value]},
+                "updated_at": {"$lt": stale_before},
+            },
+            {
+                "$set": {
+                    "status": JobStatus.ERROR.value,
+                    "error": "Interrupted: the process running the job stopped",
+                    "updated_at": datetime.now(timezone.utc),
+                }
+            },
+        )
+        return result.modified_count
+
+    @guarded
+    async def find_job_by_id(self, job_id: str) -> Optional[Job]:
+        """
+        Retrieve a job by its ID.
+
+        Args:
+            job_id (str): ID of the job to retrieve.
+
+        Returns:
+            Optional[Job]: The retrieved job or None.
+        """
+        document = self.collection.find_one({"_id": ObjectId(job_id)})
+        return Job.from_dict(document) if document else None
+
+
+@lru_cache(maxsize=None)
+def get_job_controller() -> JobController:
+    """
+    Get the shared JobController instance, created on first use.
+
+    Returns:
+        JobController: The JobController instance.
+    """
+    return JobController()
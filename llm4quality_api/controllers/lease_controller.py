@@ -0,0 +1,74 @@
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from llm4quality_api.db.db import MongoDBClient
+from llm4quality_api.db.circuit_breaker import guarded
+
+
+class LeaseController:
+    """
+    Elect a single owner for a task across every API process and node.
+
+    A lease is a document that an owner must renew before it expires; any
+    other process can take it over once it has expired.
+    """
+
+    def __init__(self):
+        self.client = MongoDBClient()
+        self.collection = self.client.get_collection("leases")
+
+    @guarded
+    async def acquire(self, name: str, owner: str, ttl: float) -> bool:
+        """
+        Acquire or renew a lease.
+
+        Args:
+            name (str): Name of the lease.
+            owner (str): Identifier of the candidate owner.
+            ttl (float): Lease duration in seconds.
+
+        Returns:
+            bool: True if the candidate owns the lease, False otherwise.
+        """
+        now = datetime.now(timezone.utc)
+        try:
+            self.collection.find_one_and_update(
+                {
+                    "_id": name,
+                    "$or": [{"owner": owner}, {"expires_at": {"$lte": now}}],
+                },
+                {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=ttl)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # The lease exists and is held by another owner
+            return False
+        return True
+
+    @guarded
+    async def release(self, name: str, owner: str) -> bool:
+        """
+        Release a lease so another process can take it over immediately.
+
+        Args:
+            name (str): Name of the lease.
+            owner (str): Identifier of the current owner.
+
+        Returns:
+            bool: True if the lease was released, False otherwise.
+        """
+        result = self.collection.delete_one({"_id": name, "owner": owner})
+        return result.deleted_count > 0
+
+
+@lru_cache(maxsize=None)
+def get_lease_controller() -> LeaseController:
+    """
+    Get the shared LeaseController instance, created on first use.
+
+    Returns:
+        LeaseController: The LeaseController instance.
+    """
+    return LeaseController()
@@ -0,0 +1,122 @@
+from functools import lru_cache
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from pymongo import ReturnDocument
+from llm4quality_api.db.db import MongoDBClient
+from llm4quality_api.db.circuit_breaker import guarded
+
+
+class UploadController:
+    """
+    Record the progress of resumable CSV uploads.
+
+    An upload is identified by a key chosen by the client, scoped to the
+    principal owning the upload so that two users choosing the same key do
+    not share an upload. Its committed offset is the row number before which
+    every row has been inserted and published, so a reconnecting client can
+    resume from there.
+    """
+
+    def __init__(self):
+        self.client = MongoDBClient()
+        self.collection = self.client.get_collection("uploads")
+
+    @staticmethod
+    def upload_id(owner: str, upload_key: str) -> str:
+        """
+        Build the identifier of an upload, also used as the batch of its verbatims.
+
+        Args:
+            owner (str): Principal owning the upload.
+            upload_key (str): Key of the upload chosen by the client.
+
+        Returns:
+            str: The identifier, scoped to the owner.
+        """
+        return f"{owner}:{upload_key}"
+
+    @guarded
+    async def start_upload(self, owner: str, upload_key: str, year: int) -> dict:
+        """
+        Register an upload, or get the progress of an upload being resumed.
+
+        Args:
+            owner (str): Principal owning the upload.
+            upload_key (str): Key of the upload chosen by the client.
+            year (int): Year associated with the verbatims of the upload.
+
+        Returns:
+            dict: The upload, identified by `_id`.
+
+        Raises:
+            ValueError: If the upload was started for another year.
+        """
+        now = datetime.now(timezone.utc)
+        upload = self.collection.find_one_and_update(
+            {"_id": self.upload_id(owner, upload_key)},
+            {
+                "$setOnInsert": {
+                    "owner": owner,
+                    "upload_key": upload_key,
+                    "year": year,
+                    "committed_offset": 0,
+                    "created_at": now,
+                },
+                "$set": {"updated_at": now},
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        if upload["year"] != year:
+            raise ValueError(
+                f"Upload {upload_key} was started for {upload['year']}, not {year}"
+            )
+        return upload
+
+    @guarded
+    async def commit_offset(
+        self, upload_id: str, offset: int, counts: Optional[Dict[str, int]] = None
+    ):
+        """
+        Record that every row before an offset has been inserted and published.
+
+        The committed offset never moves backwards.
+
+        Args:
+            upload_id (str): Identifier of the upload.
+            offset (int): Row number the upload can be resumed from.
+            counts (Optional[Dict[str, int]]): Rows processed since the last
+                commit, by outcome, added to the totals of the upload.
+        """
+        update = {
+            "$max": {"committed_offset": offset},
+            "$set": {"updated_at": datetime.now(timezone.utc)},
+        }
+        if counts:
+            update["$inc"] = {f"counts.{name}": count for name, count in counts.items()}
+        self.collection.update_one({"_id": upload_id}, update)
+
+    @guarded
+    async def find_upload(self, owner: str, upload_key: str) -> Optional[dict]:
+        """
+        Retrieve the progress of an upload.
+
+        Args:
+            owner (str): Principal owning the upload.
+            upload_key (str): Key of the upload chosen by the client.
+
+        Returns:
+            Optional[dict]: The upload or None.
+        """
+        return self.collection.find_one({"_id": self.upload_id(owner, upload_key)})
+
+
+@lru_cache(maxsize=None)
+def get_upload_controller() -> UploadController:
+    """
+    Get the shared UploadController instance, created on first use.
+
+    Returns:
+        UploadController: The UploadController instance.
+    """
+    return UploadController()
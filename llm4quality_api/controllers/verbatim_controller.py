@@ -1,55 +1,340 @@
-from pymongo import MongoClient
+import asyncio
+import math
+import time
+from collections import Counter
+from functools import lru_cache
+from pymongo import MongoClient, ASCENDING, ReturnDocument
+from pymongo.errors import BulkWriteError, CollectionInvalid
 from bson import ObjectId
 from llm4quality_api.models.models import Verbatim, Result, Status
+from llm4quality_api.models.codebook import Codebook
 from llm4quality_api.config.config import Config
 from llm4quality_api.db.db import MongoDBClient
-from datetime import datetime, timezone
-from typing import List, Optional
+from llm4quality_api.db.circuit_breaker import guarded
+from llm4quality_api.utils.metrics import percentiles
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
 
 
 class VerbatimController:
     def __init__(self):
         self.client = MongoDBClient()
         self.collection = self.client.get_collection("verbatims")
+        self.archive_collection = self.client.get_collection("verbatims_archive")
+        self.tiers_collection = self.client.get_collection("tiers")
+        self.codebook_collection = self.client.get_collection("codebooks")
+        self.codebook = Codebook.get_instance()
+        self.codebook.loader = self.load_codebook_entries
+        self._archived_years: Optional[set] = None
+        self._archived_years_loaded_at = 0.0
 
-    async def create_verbatims(self, lines: List[str], year: int) -> List[Verbatim]:
+    @property
+    def analytics_collection(self):
+        """
+        The verbatims collection for listing, count and analytics queries,
+        which tolerate slightly stale reads from secondaries.
+        """
+        return self.collection.with_options(
+            read_preference=self.client.analytics_read_preference
+        )
+
+    def archived_years(self) -> set:
+        """
+        Get the years moved, or being moved, to the archive collection.
+
+        The set is cached for TIER_CACHE_SECONDS to keep the lookup off the
+        request path.
+
+        Returns:
+            set: The archived years.
+        """
+        if (
+            self._archived_years is None
+            or time.monotonic() - self._archived_years_loaded_at > Config.TIER_CACHE_SECONDS
+        ):
+            self._archived_years = {
+                doc["_id"] for doc in self.tiers_collection.find({}, {"_id": 1})
+            }
+            self._archived_years_loaded_at = time.monotonic()
+        return self._archived_years
+
+    def tier_collections(self, query: dict, analytics: bool = False) -> list:
+        """
+        Get the collections holding the verbatims a query can match.
+
+        Queries filtering on a single year only reach the archive if that
+        year is archived, the other queries reach it as soon as a year is.
+        The hot collection is always included, since new verbatims may still
+        be created for an archived year.
+
+        Args:
+            query (dict): MongoDB query filter.
+            analytics (bool): True for listing, count and analytics queries.
+
+        Returns:
+            list: The hot collection, followed by the archive if needed.
+        """
+        collections = [self.analytics_collection if analytics else self.collection]
+        year = query.get("year")
+        archived_years = self.archived_years()
+        if isinstance(year, int):
+            reaches_archive = year in archived_years
+        else:
+            reaches_archive = bool(archived_years)
+        if reaches_archive:
+            archive = self.archive_collection
+            if analytics:
+                archive = archive.with_options(
+                    read_preference=self.client.analytics_read_preference
+                )
+            collections.append(archive)
+        return collections
+
+    @property
+    def bulk_collection(self):
+        """
+        The verbatims collection for bulk ingestion, with a relaxed write concern.
+        """
+        return self.collection.with_options(
+            write_concern=self.client.bulk_write_concern
+        )
+
+    @staticmethod
+    def dispatch_fields(attempts: int, now: Optional[datetime] = None) -> dict:
+        """
+        Build the delivery tracking fields of a verbatim sent to the workers.
+
+        The delivery deadline grows exponentially with the number of attempts.
+
+        Args:
+            attempts (int): Number of the dispatch attempt (starting at 1).
+            now (Optional[datetime]): Dispatch time (default is the current time).
+
+        Returns:
+            dict: The `dispatched_at`, `attempts` and `dispatch_deadline` fields.
+        """
+        now = now or datetime.now(timezone.utc)
+        timeout = Config.DISPATCH_TIMEOUT_SECONDS * (
+            Config.DISPATCH_BACKOFF_FACTOR ** (attempts - 1)
+        )
+        return {
+            "dispatched_at": now,
+            "attempts": attempts,
+            "dispatch_deadline": now + timedelta(seconds=timeout),
+        }
+
+    def load_codebook_entries(self) -> List[List[str]]:
+        """
+        Load the persisted entries of the result codebook.
+
+        Returns:
+            List[List[str]]: The (theme, criterion, label) paths, in code order.
+        """
+        document = self.codebook_collection.find_one({"_id": "result"})
+        return document["entries"] if document else []
+
+    def encode_result(self, result: dict) -> dict:
+        """
+        Encode a Result dictionary into its compact representation, assigning
+        codes to the paths seen for the first time.
+
+        Args:
+            result (dict): Result dictionary.
+
+        Returns:
+            dict: The compact representation.
+        """
+        missing = self.codebook.missing_paths(result)
+        if missing:
+            # $addToSet appends atomically, so concurrent processes agree on codes
+            self.codebook_collection.update_one(
+                {"_id": "result"},
+                {"$addToSet": {"entries": {"$each": [list(path) for path in missing]}}},
+                upsert=True,
+            )
+            self.codebook.refresh()
+        return self.codebook.encode(result)
+
+    def ensure_indexes(self):
+        """
+        Create the indexes used by the controller queries.
+
+        The dispatch deadline index only covers verbatims with status RUN, so it
+        stays small however large the collection grows.
+        """
+        self.collection.create_index(
+            [("status", ASCENDING), ("dispatch_deadline", ASCENDING)],
+            name="run_dispatch_deadline",
+            partialFilterExpression={"status": Status.RUN.value},
+        )
+        self.collection.create_index(
+            [("year", ASCENDING), ("status", ASCENDING)], name="year_status"
+        )
+        self.collection.create_index(
+            [("batch_id", ASCENDING)], name="batch_id", sparse=True
+        )
+        self.collection.create_index(
+            [("deferred_at", ASCENDING)],
+            name="deferred_at",
+            partialFilterExpression={"deferred_at": {"$exists": True}},
+        )
+        self.collection.create_index(
+            [("completed_at", ASCENDING)], name="completed_at", sparse=True
+        )
+        # Each row of a resumable upload is only ever inserted once
+        self.collection.create_index(
+            [("batch_id", ASCENDING), ("row", ASCENDING)],
+            name="batch_row",
+            unique=True,
+            partialFilterExpression={"row": {"$exists": True}},
+        )
+
+        # The archive is compressed and only indexed for year and status
+        # queries, and for the rows of resumable uploads
+        try:
+            self.client.database.create_collection(
+                self.archive_collection.name,
+                storageEngine={
+                    "wiredTiger": {
+                        "configString": f"block_compressor={Config.ARCHIVE_COMPRESSOR}"
+                    }
+                },
+            )
+        except CollectionInvalid:
+            pass  # Already created
+        self.archive_collection.create_index(
+            [("year", ASCENDING), ("status", ASCENDING)], name="year_status"
+        )
+        self.archive_collection.create_index(
+            [("batch_id", ASCENDING), ("row", ASCENDING)],
+            name="batch_row",
+            partialFilterExpression={"row": {"$exists": True}},
+        )
+
+    @guarded
+    async def create_verbatims(
+        self,
+        lines: List[str],
+        year: int,
+        batch_id: Optional[str] = None,
+        deferred: bool = False,
+        prefilter_rule: Optional[str] = None,
+        rows: Optional[List[int]] = None,
+    ) -> List[Verbatim]:
         """
         Create verbatims in MongoDB.
 
+        With row numbers, the lines of a resumable upload are inserted at
+        most once: the rows already inserted, e.g. by a concurrent re-send of
+        the upload, are left untouched and not returned.
+
         Args:
             lines (List[str]): Lines of content for the verbatims.
             year (int): Year associated with the verbatims.
+            batch_id (Optional[str]): Identifier of the upload the lines come from.
+            deferred (bool): True to keep the verbatims pending until the
+                workers have capacity, instead of dispatching them right away.
+            prefilter_rule (Optional[str]): Pre-filter rule the lines matched,
+                to store them as classified with an empty result instead.
+            rows (Optional[List[int]]): Row numbers of the lines in the upload
+                identified by `batch_id`.
 
         Returns:
             List[Verbatim]: The created verbatims.
         """
+        if not lines:
+            return []
+
+        now = datetime.now(timezone.utc)
+        status, result = Status.RUN, None
+        if prefilter_rule:
+            # Never dispatched, nor counted in the worker latency and throughput
+            status, result = Status.SUCCESS, Result().model_dump()
+            dispatch_fields = {"prefilter_rule": prefilter_rule}
+        elif deferred:
+            dispatch_fields = {"deferred_at": now, "attempt_token": 0}
+        else:
+            dispatch_fields = {**self.dispatch_fields(1, now), "attempt_token": 1}
         verbatim_dicts = [
             {
                 "content": line.strip(),
-                "status": Status.RUN.value,  # Convert enum to string
-                "result": None,
+                "status": status.value,  # Convert enum to string
+                "result": result,
                 "year": year,
-                "created_at": datetime.now(timezone.utc),
+                "created_at": now,
+                "requested_at": now,
+                **dispatch_fields,
             }
             for line in lines
         ]
+        if batch_id:
+            for verbatim_dict in verbatim_dicts:
+                verbatim_dict["batch_id"] = batch_id
+        if rows is not None:
+            for verbatim_dict, row in zip(verbatim_dicts, rows):
+                verbatim_dict["row"] = row
 
         # Insert documents into MongoDB
-        result = self.collection.insert_many(verbatim_dicts)
+        try:
+            inserted_ids = self.bulk_collection.insert_many(
+                verbatim_dicts, ordered=rows is None
+            ).inserted_ids
+        except BulkWriteError as e:
+            # Only tolerate the rows already inserted
+            errors = e.details["writeErrors"]
+            if rows is None or any(error["code"] != 11000 for error in errors):
+                raise
+            duplicates = {error["index"] for error in errors}
+            inserted_ids = [
+                verbatim_dict["_id"]
+                for index, verbatim_dict in enumerate(verbatim_dicts)
+                if index not in duplicates
+            ]
 
         # Fetch inserted documents to include `_id` and `created_at`
-        inserted_verbatims = [
-            Verbatim.from_dict(self.collection.find_one({"_id": oid}))
-            for oid in result.inserted_ids
-        ]
+        documents = {
+            doc["_id"]: doc
+            for doc in self.collection.find({"_id": {"$in": inserted_ids}})
+        }
+        inserted_verbatims = [Verbatim.from_dict(documents[oid]) for oid in inserted_ids]
         return inserted_verbatims
 
+    @guarded
+    async def find_existing_rows(
+        self, batch_id: str, rows: List[int], year: Optional[int] = None
+    ) -> set:
+        """
+        Find which rows of a resumable upload were already inserted,
+        including the rows moved to the archive since.
+
+        Args:
+            batch_id (str): Identifier of the upload.
+            rows (List[int]): Row numbers to look for.
+            year (Optional[int]): Year of the upload, to look in the archive
+                once the year is archived.
+
+        Returns:
+            set: The row numbers already inserted.
+        """
+        if not rows:
+            return set()
+        query = {"batch_id": batch_id, "row": {"$in": rows}}
+        existing = set()
+        for collection in self.tier_collections({"year": year, **query}):
+            existing.update(
+                document["row"] for document in collection.find(query, {"_id": 0, "row": 1})
+            )
+        return existing
+
     async def get_verbatims(
         self, query: dict, pagination: int = 1, per_page: int = 10
     ) -> List[Verbatim]:
         """
         Retrieve verbatims based on a query with pagination.
 
+        The documents are read by get_verbatim_documents, which goes through
+        the circuit breaker.
+
         Args:
             query (dict): MongoDB query filter.
             pagination (int): Page number (default is 1).
@@ -58,10 +343,53 @@ class VerbatimController:
         Returns:
             List[Verbatim]: The retrieved verbatims.
         """
+        documents = await self.get_verbatim_documents(
+            query, pagination=pagination, per_page=per_page
+        )
+        return [Verbatim.from_dict(v) for v in documents]
+
+    @guarded
+    async def get_verbatim_documents(
+        self,
+        query: dict,
+        pagination: int = 1,
+        per_page: int = 10,
+        projection: Optional[dict] = None,
+    ) -> List[dict]:
+        """
+        Retrieve raw verbatim documents based on a query with pagination.
+
+        Args:
+            query (dict): MongoDB query filter.
+            pagination (int): Page number (default is 1).
+            per_page (int): Results per page (default is 10).
+            projection (Optional[dict]): MongoDB projection of the returned fields.
+
+        Returns:
+            List[dict]: The retrieved documents.
+        """
         skip = (pagination - 1) * per_page
-        results = self.collection.find(query).skip(skip).limit(per_page)
-        return [Verbatim.from_dict(v) for v in results]
+        # The result history is only read by the consistency evaluation
+        projection = projection or {"result_history": 0}
+        collections = self.tier_collections(query, analytics=True)
+        documents = []
+        for index, collection in enumerate(collections):
+            remaining = per_page - len(documents)
+            if remaining <= 0:
+                break
+            if skip and index < len(collections) - 1:
+                # Skip whole tiers before the requested page
+                count = collection.count_documents(query)
+                if skip >= count:
+                    skip -= count
+                    continue
+            documents.extend(
+                collection.find(query, projection).skip(skip).limit(remaining)
+            )
+            skip = 0
+        return documents
 
+    @guarded
     async def delete_verbatims(self, verbatim_ids: List[str]) -> int:
         """
         Delete multiple verbatims by their IDs.
@@ -73,40 +401,414 @@ class VerbatimController:
             int: Number of documents deleted.
         """
         object_ids = [ObjectId(vid) for vid in verbatim_ids]
-        result = self.collection.delete_many({"_id": {"$in": object_ids}})
-        return result.deleted_count
+        deleted_count = 0
+        for collection in (self.collection, self.archive_collection):
+            result = collection.delete_many({"_id": {"$in": object_ids}})
+            deleted_count += result.deleted_count
+            if deleted_count == len(object_ids):
+                break
+        return deleted_count
+
+    @guarded
+    async def delete_verbatims_chunk(self, query: dict, limit: int) -> int:
+        """
+        Delete at most `limit` verbatims matching a query.
+
+        Deleting in bounded chunks keeps each operation short, so large purges
+        neither hold locks for long nor block other requests. The chunk is
+        deleted in a worker thread, off the event loop.
+
+        Args:
+            query (dict): MongoDB query filter.
+            limit (int): Maximum number of documents to delete.
+
+        Returns:
+            int: Number of documents deleted, 0 once nothing matches anymore.
+        """
+        return await asyncio.to_thread(self._delete_chunk, query, limit)
+
+    def _delete_chunk(self, query: dict, limit: int) -> int:
+        """
+        Delete a chunk of verbatims, see delete_verbatims_chunk.
+        """
+        for collection in self.tier_collections(query):
+            object_ids = [
+                doc["_id"] for doc in collection.find(query, {"_id": 1}).limit(limit)
+            ]
+            if object_ids:
+                result = collection.delete_many({**query, "_id": {"$in": object_ids}})
+                return result.deleted_count
+        return 0
+
+    @guarded
+    async def count_verbatims(self, query: dict) -> int:
+        """
+        Count the verbatims matching a query.
+
+        Args:
+            query (dict): MongoDB query filter.
 
+        Returns:
+            int: Number of matching documents.
+        """
+        return sum(
+            collection.count_documents(query)
+            for collection in self.tier_collections(query, analytics=True)
+        )
+
+    @guarded
     async def update_verbatim_status(
-        self, verbatim_id: str, status: Status, result: Optional[Result | dict]
+        self,
+        verbatim_id: str,
+        status: Status,
+        result: Optional[Result | dict],
+        worker_started_at: Optional[datetime] = None,
+        attempt_token: Optional[int] = None,
     ) -> dict:
         """
         Update the status and result of a verbatim in MongoDB.
 
+        A completed result is also appended to the result history of the
+        verbatim, used to evaluate the consistency of the classifications.
+
+        The update only applies to a verbatim still in RUN and, when a token
+        is given, still at that dispatch, so a duplicate response or the
+        response to a superseded dispatch matches nothing. Verbatims in RUN
+        are always in the hot collection, since a rerun restores archived
+        verbatims and the archiving job skips them.
+
         Args:
             verbatim_id (str): ID of the verbatim to update.
             status (Status): New status for the verbatim.
             result (Optional[Result | dict]): Updated result for the verbatim.
+            worker_started_at (Optional[datetime]): Time the worker started
+                processing the verbatim, if it reported it.
+            attempt_token (Optional[int]): Token of the dispatch answered.
 
         Returns:
             bool: True if the update succeeded, False otherwise.
         """
         update_data = {"status": status.value}  # Convert enum to string
+        now = datetime.now(timezone.utc)
+        if status != Status.RUN:
+            update_data["completed_at"] = now
+        if worker_started_at:
+            update_data["worker_started_at"] = worker_started_at
         if result:
             update_data["result"] = (
-                result.dict() if isinstance(result, Result) else result
+                result.model_dump() if isinstance(result, Result) else result
             )
+            if Config.COMPACT_RESULTS and not Codebook.is_compact(update_data["result"]):
+                update_data["result"] = self.encode_result(update_data["result"])
+
+        query = {"_id": ObjectId(verbatim_id), "status": Status.RUN.value}
+        if attempt_token is not None:
+            query["attempt_token"] = attempt_token
+
+        update = {"$set": update_data}
+        if status != Status.RUN and "result" in update_data:
+            update["$push"] = {
+                "result_history": {
+                    "$each": [
+                        {
+                            "result": update_data["result"],
+                            "completed_at": now,
+                            "attempt_token": attempt_token,
+                        }
+                    ],
+                    "$slice": -Config.RESULT_HISTORY_SIZE,
+                }
+            }
 
         # Update document in MongoDB
-        update_result = self.collection.update_one(
-            {"_id": ObjectId(verbatim_id)},
-            {"$set": update_data},
-        )
+        update_result = self.collection.update_one(query, update)
 
         return update_result
 
+    @guarded
+    async def find_attempt_state(self, verbatim_id: str) -> Optional[dict]:
+        """
+        Retrieve the status and current dispatch token of a verbatim.
+
+        Args:
+            verbatim_id (str): ID of the verbatim.
+
+        Returns:
+            Optional[dict]: The `status` and `attempt_token` fields, or None.
+        """
+        return self.collection.find_one(
+            {"_id": ObjectId(verbatim_id)}, {"status": 1, "attempt_token": 1}
+        )
+
+    @guarded
+    async def get_attempt_tokens(self, verbatim_ids: List[str]) -> Dict[str, int]:
+        """
+        Retrieve the current dispatch token of verbatims, to publish with them.
+
+        Args:
+            verbatim_ids (List[str]): IDs of the verbatims.
+
+        Returns:
+            Dict[str, int]: The tokens, by verbatim ID.
+        """
+        object_ids = [ObjectId(vid) for vid in verbatim_ids]
+        documents = self.collection.find(
+            {"_id": {"$in": object_ids}}, {"attempt_token": 1}
+        )
+        return {str(doc["_id"]): doc.get("attempt_token", 0) for doc in documents}
+
+    @guarded
+    async def mark_dispatched(
+        self, verbatim_ids: List[str], deferred: bool = False
+    ) -> Dict[str, int]:
+        """
+        Set verbatims back to RUN and start a new delivery cycle for them.
+
+        The dispatch token is incremented, so the responses to the previous
+        dispatches are dropped. Each token is read back atomically with its
+        increment, so concurrent reruns of a verbatim get distinct tokens.
+        Archived verbatims are moved back to the hot collection first.
+
+        Args:
+            verbatim_ids (List[str]): IDs of the verbatims being dispatched.
+            deferred (bool): True to keep the verbatims pending until the
+                workers have capacity, instead of dispatching them right away.
+
+        Returns:
+            Dict[str, int]: The new dispatch tokens, by ID of the matched verbatims.
+        """
+        object_ids = [ObjectId(vid) for vid in verbatim_ids]
+        now = datetime.now(timezone.utc)
+        self.restore_archived(object_ids, now)
+        # A new classification request starts a new lifecycle
+        lifecycle_reset = {"worker_started_at": "", "completed_at": ""}
+        if deferred:
+            update = {
+                "$set": {
+                    "status": Status.RUN.value,
+                    "requested_at": now,
+                    "deferred_at": now,
+                },
+                "$unset": {"dispatch_deadline": "", **lifecycle_reset},
+            }
+        else:
+            update = {
+                "$set": {
+                    "status": Status.RUN.value,
+                    "requested_at": now,
+                    **self.dispatch_fields(1, now),
+                },
+                "$unset": {"deferred_at": "", **lifecycle_reset},
+            }
+        update["$inc"] = {"attempt_token": 1}
+        tokens = {}
+        for object_id in object_ids:
+            document = self.collection.find_one_and_update(
+                {"_id": object_id},
+                update,
+                projection={"attempt_token": 1},
+                return_document=ReturnDocument.AFTER,
+            )
+            if document:
+                tokens[str(object_id)] = document["attempt_token"]
+        return tokens
+
+    def restore_archived(self, object_ids: List[ObjectId], now: datetime) -> int:
+        """
+        Move archived verbatims back to the hot collection, to classify them again.
+
+        The verbatims are restored as deferred RUN verbatims, so the archiving
+        job skips them and an interrupted rerun leaves them waiting for
+        dispatch. Their archive copy is only deleted once they are in the hot
+        collection.
+
+        Args:
+            object_ids (List[ObjectId]): IDs of the verbatims being dispatched.
+            now (datetime): Time of the dispatch.
+
+        Returns:
+            int: Number of verbatims restored.
+        """
+        hot_ids = {
+            doc["_id"]
+            for doc in self.collection.find({"_id": {"$in": object_ids}}, {"_id": 1})
+        }
+        missing_ids = [object_id for object_id in object_ids if object_id not in hot_ids]
+        if not missing_ids:
+            return 0
+        documents = list(self.archive_collection.find({"_id": {"$in": missing_ids}}))
+        if not documents:
+            return 0
+        for document in documents:
+            document.update(status=Status.RUN.value, deferred_at=now)
+        try:
+            self.collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            # Only tolerate documents restored by a concurrent rerun
+            if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+        restored_ids = [
+            doc["_id"]
+            for doc in self.collection.find(
+                {"_id": {"$in": [document["_id"] for document in documents]}},
+                {"_id": 1},
+            )
+        ]
+        self.archive_collection.delete_many({"_id": {"$in": restored_ids}})
+        return len(restored_ids)
+
+    @guarded
+    async def find_deferred_verbatims(self, limit: int = 100) -> List[dict]:
+        """
+        Retrieve the verbatims waiting for worker capacity, oldest first.
+
+        Args:
+            limit (int): Maximum number of documents to return.
+
+        Returns:
+            List[dict]: The deferred documents.
+        """
+        results = (
+            self.collection.find({"deferred_at": {"$exists": True}})
+            .sort("deferred_at", ASCENDING)
+            .limit(limit)
+        )
+        return list(results)
+
+    @guarded
+    async def claim_deferred_verbatims(self, verbatim_ids: List[str]) -> List[str]:
+        """
+        Atomically claim deferred verbatims for dispatch.
+
+        Args:
+            verbatim_ids (List[str]): IDs of the deferred verbatims.
+
+        Returns:
+            List[str]: IDs of the claimed verbatims.
+        """
+        now = datetime.now(timezone.utc)
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        object_ids = [ObjectId(vid) for vid in verbatim_ids]
+        update_result = self.collection.update_many(
+            {"_id": {"$in": object_ids}, "deferred_at": {"$exists": True}},
+            {
+                "$set": self.dispatch_fields(1, now),
+                "$unset": {"deferred_at": ""},
+                "$inc": {"attempt_token": 1},
+            },
+        )
+        if update_result.modified_count == len(object_ids):
+            return list(verbatim_ids)
+        claimed = self.collection.find(
+            {"_id": {"$in": object_ids}, "dispatched_at": now}, {"_id": 1}
+        )
+        return [str(doc["_id"]) for doc in claimed]
+
+    @guarded
+    async def count_deferred_verbatims(self) -> int:
+        """
+        Count the verbatims waiting for worker capacity.
+
+        Returns:
+            int: Number of deferred documents.
+        """
+        return self.analytics_collection.count_documents({"deferred_at": {"$exists": True}})
+
+    @guarded
+    async def count_completed_since(self, since: datetime) -> int:
+        """
+        Count the verbatims completed since a given time.
+
+        Args:
+            since (datetime): Start of the period.
+
+        Returns:
+            int: Number of documents completed since then.
+        """
+        return self.analytics_collection.count_documents({"completed_at": {"$gte": since}})
+
+    @guarded
+    async def find_expired_dispatches(
+        self, now: datetime, limit: int = 100
+    ) -> List[dict]:
+        """
+        Retrieve verbatims still in RUN whose delivery deadline has passed.
+
+        Args:
+            now (datetime): Reference time.
+            limit (int): Maximum number of documents to return.
+
+        Returns:
+            List[dict]: The expired documents, oldest deadline first.
+        """
+        results = (
+            self.collection.find(
+                {"status": Status.RUN.value, "dispatch_deadline": {"$lte": now}}
+            )
+            .sort("dispatch_deadline", ASCENDING)
+            .limit(limit)
+        )
+        return list(results)
+
+    @guarded
+    async def claim_expired_dispatches(
+        self, verbatim_ids: List[str], attempts: int, now: datetime, status: Status
+    ) -> List[str]:
+        """
+        Atomically claim expired verbatims for a redispatch or a final failure.
+
+        Only verbatims that are still in RUN, still expired and still at the
+        given attempt are claimed, so a response received in the meantime or
+        another sweep wins the race.
+
+        Args:
+            verbatim_ids (List[str]): IDs of the expired verbatims.
+            attempts (int): Attempt number the verbatims are expected to be at.
+            now (datetime): Reference time of the sweep.
+            status (Status): RUN to redispatch the verbatims, ERROR to give up.
+
+        Returns:
+            List[str]: IDs of the claimed verbatims.
+        """
+        # Truncate to the millisecond precision of BSON dates so the claim
+        # marker can be matched back exactly.
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        object_ids = [ObjectId(vid) for vid in verbatim_ids]
+        if status == Status.RUN:
+            update = {
+                "$set": self.dispatch_fields(attempts + 1, now),
+                "$inc": {"attempt_token": 1},
+            }
+            marker = {"attempts": attempts + 1, "dispatched_at": now}
+        else:
+            # Completed like any other terminal status, for the statistics
+            update = {
+                "$set": {"status": status.value, "failed_at": now, "completed_at": now},
+                "$unset": {"dispatch_deadline": ""},
+            }
+            marker = {"status": status.value, "failed_at": now}
+
+        update_result = self.collection.update_many(
+            {
+                "_id": {"$in": object_ids},
+                "status": Status.RUN.value,
+                "attempts": attempts,
+                "dispatch_deadline": {"$lte": now},
+            },
+            update,
+        )
+        if update_result.modified_count == len(object_ids):
+            return list(verbatim_ids)
+        claimed = self.collection.find(
+            {"_id": {"$in": object_ids}, **marker}, {"_id": 1}
+        )
+        return [str(doc["_id"]) for doc in claimed]
+
+    @guarded
     async def find_verbatim_by_id(self, verbatim_id: str) -> Optional[Verbatim]:
         """
-        Retrieve a single verbatim by its ID.
+        Retrieve a single verbatim by its ID, from the hot collection or the
+        archive.
 
         Args:
             verbatim_id (str): ID of the verbatim to retrieve.
@@ -114,26 +816,289 @@ class VerbatimController:
         Returns:
             Optional[Verbatim]: The retrieved verbatim object or None.
         """
-        document = self.collection.find_one({"_id": ObjectId(verbatim_id)})
-        return Verbatim.from_dict(document) if document else None
+        for collection in (self.collection, self.archive_collection):
+            document = collection.find_one({"_id": ObjectId(verbatim_id)})
+            if document:
+                return Verbatim.from_dict(document)
+        return None
 
-    async def get_collection_count(self) -> dict:
+    @guarded
+    async def get_collection_count(self, query: Optional[dict] = None) -> dict:
         """
         Get the total number of documents in the verbatims collection.
 
+        Args:
+            query (Optional[dict]): MongoDB query filter, e.g. on the year.
+
         Returns:
             dict: -total: Total number of documents.
                     -total_run : Total number of documents with status RUN.
                     -total_success : Total number of documents with status SUCCESS.
                     -total_error : Total number of documents with status ERROR.
         """
-        total = self.collection.count_documents({})
-        total_run = self.collection.count_documents({"status": Status.RUN.value})
-        total_success = self.collection.count_documents({"status": Status.SUCCESS.value})
-        total_error = self.collection.count_documents({"status": Status.ERROR.value})
+        query = query or {}
+        collections = self.tier_collections(query, analytics=True)
+
+        def count(extra: dict) -> int:
+            return sum(c.count_documents({**query, **extra}) for c in collections)
+
+        total = count({})
+        total_run = count({"status": Status.RUN.value})
+        total_success = count({"status": Status.SUCCESS.value})
+        total_error = count({"status": Status.ERROR.value})
         return {
             "total": total,
             "total_run": total_run,
             "total_success": total_success,
             "total_error": total_error,
         }
+
+    @guarded
+    async def get_latency_stats(
+        self,
+        query: dict,
+        granularity: str = "hour",
+        sample_size: int = Config.LATENCY_SAMPLE_SIZE,
+        max_periods: int = Config.LATENCY_MAX_PERIODS,
+    ) -> dict:
+        """
+        Compute the turnaround percentiles and the throughput of completed verbatims.
+
+        The count and the throughput are aggregated by MongoDB. The
+        percentiles are computed on a random sample of at most `sample_size`
+        verbatims, drawn from each tier in proportion to its size, so the
+        cost of the statistics stays bounded however large the collection
+        grows. Both run in a worker thread, off the event loop. Only the
+        most recent `max_periods` periods of the throughput are returned.
+
+        Args:
+            query (dict): MongoDB query filter of the verbatims to analyse.
+            granularity (str): Throughput period, "minute" or "hour".
+            sample_size (int): Maximum number of verbatims sampled for the percentiles.
+            max_periods (int): Maximum number of throughput periods returned.
+
+        Returns:
+            dict: -count: Number of completed verbatims analysed.
+                    -sample_count: Number of verbatims the percentiles are computed on.
+                    -turnaround_seconds: Percentiles from request to completion.
+                    -queue_wait_seconds: Percentiles from dispatch to worker start.
+                    -processing_seconds: Percentiles from worker start to completion.
+                    -attempts: Percentiles of the dispatch attempts.
+                    -throughput: Completed verbatims per period.
+                    -throughput_truncated: True if older periods were left out.
+        """
+        return await asyncio.to_thread(
+            self._compute_latency_stats, query, granularity, sample_size, max_periods
+        )
+
+    def _compute_latency_stats(
+        self, query: dict, granularity: str, sample_size: int, max_periods: int
+    ) -> dict:
+        """
+        Compute the latency statistics, see get_latency_stats.
+        """
+        match = {"completed_at": {"$exists": True}, **query}
+        period_format = "%Y-%m-%dT%H:%M" if granularity == "minute" else "%Y-%m-%dT%H:00"
+        collections = self.tier_collections(query, analytics=True)
+
+        periods: Counter = Counter()
+        tier_counts = []
+        for collection in collections:
+            throughput = collection.aggregate(
+                [
+                    {"$match": match},
+                    {
+                        "$group": {
+                            "_id": {
+                                "$dateToString": {
+                                    "format": period_format,
+                                    "date": "$completed_at",
+                                }
+                            },
+                            "count": {"$sum": 1},
+                        }
+                    },
+                ]
+            )
+            tier_count = 0
+            for bucket in throughput:
+                periods[bucket["_id"]] += bucket["count"]
+                tier_count += bucket["count"]
+            tier_counts.append(tier_count)
+        count = sum(tier_counts)
+
+        samples: Dict[str, List[float]] = {
+            "turnaround": [],
+            "queue_wait": [],
+            "processing": [],
+            "attempts": [],
+        }
+        sample_count = 0
+        for collection, tier_count in zip(collections, tier_counts):
+            tier_sample_size = math.ceil(sample_size * tier_count / count) if count else 0
+            if not tier_sample_size:
+                continue
+            durations = collection.aggregate(
+                [
+                    {"$match": match},
+                    {"$sample": {"size": tier_sample_size}},
+                    {
+                        "$project": {
+                            "_id": 0,
+                            "turnaround": {
+                                "$subtract": [
+                                    "$completed_at",
+                                    {"$ifNull": ["$requested_at", "$created_at"]},
+                                ]
+                            },
+                            "queue_wait": {"$subtract": ["$worker_started_at", "$dispatched_at"]},
+                            "processing": {"$subtract": ["$completed_at", "$worker_started_at"]},
+                            "attempts": "$attempts",
+                        }
+                    },
+                ]
+            )
+            for document in durations:
+                sample_count += 1
+                for name, values in samples.items():
+                    value = document.get(name)
+                    if value is None:
+                        continue
+                    # Date differences are expressed in milliseconds
+                    values.append(value if name == "attempts" else value / 1000)
+
+        recent_periods = sorted(periods)[-max_periods:]
+        return {
+            "count": count,
+            "sample_count": sample_count,
+            "turnaround_seconds": percentiles(samples["turnaround"]),
+            "queue_wait_seconds": percentiles(samples["queue_wait"]),
+            "processing_seconds": percentiles(samples["processing"]),
+            "attempts": percentiles(samples["attempts"]),
+            "throughput": [
+                {"period": period, "count": periods[period]}
+                for period in recent_periods
+            ],
+            "throughput_truncated": len(recent_periods) < len(periods),
+        }
+
+    @guarded
+    async def find_result_histories(self, year: int) -> List[List[dict]]:
+        """
+        Retrieve the result histories of the verbatims of a year classified
+        at least twice.
+
+        The whole year is read, across the tiers, in a worker thread so the
+        event loop is not blocked meanwhile.
+
+        Args:
+            year (int): Year of the verbatims.
+
+        Returns:
+            List[List[dict]]: The results of each verbatim, oldest first.
+        """
+        return await asyncio.to_thread(self._read_result_histories, year)
+
+    def _read_result_histories(self, year: int) -> List[List[dict]]:
+        """
+        Read the result histories of a year, see find_result_histories.
+        """
+        query = {"year": year, "result_history.1": {"$exists": True}}
+        histories = []
+        for collection in self.tier_collections(query, analytics=True):
+            for document in collection.find(query, {"result_history.result": 1}):
+                histories.append(
+                    [entry["result"] for entry in document["result_history"]]
+                )
+        return histories
+
+    @guarded
+    async def list_tiers(self) -> List[dict]:
+        """
+        List the archived years and the state of their archiving.
+
+        Returns:
+            List[dict]: The tier documents, by year.
+        """
+        tiers = self.tiers_collection.find({}).sort("_id", ASCENDING)
+        return [{"year": tier.pop("_id"), **tier} for tier in tiers]
+
+    @guarded
+    async def set_tier_state(self, year: int, state: str, **fields) -> None:
+        """
+        Record the archiving state of a year.
+
+        Once a year has a tier document, its queries also read the archive.
+
+        Args:
+            year (int): The archived year.
+            state (str): "ARCHIVING" or "ARCHIVED".
+            **fields: Other fields to record, e.g. the timestamps and counts.
+        """
+        self.tiers_collection.update_one(
+            {"_id": year}, {"$set": {"state": state, **fields}}, upsert=True
+        )
+        self._archived_years = None
+
+    @guarded
+    async def archive_chunk(self, year: int, limit: int) -> int:
+        """
+        Move a chunk of verbatims of a year from the hot collection to the archive.
+
+        Documents are copied before being deleted, so an interrupted move is
+        resumed by the next call: documents already copied are skipped. The
+        chunk is moved in a worker thread, off the event loop.
+
+        Args:
+            year (int): The year to archive.
+            limit (int): Maximum number of verbatims moved.
+
+        Returns:
+            int: Number of verbatims moved, 0 once the year is archived.
+        """
+        return await asyncio.to_thread(self._archive_chunk, year, limit)
+
+    def _archive_chunk(self, year: int, limit: int) -> int:
+        """
+        Move a chunk of verbatims to the archive, see archive_chunk.
+        """
+        query = {"year": year, "status": {"$ne": Status.RUN.value}}
+        # A chunk only made of verbatims rerun since the copy is followed by
+        # the next one, so the job does not stop before the year is moved
+        while True:
+            documents = list(
+                self.collection.find(query).sort("_id", ASCENDING).limit(limit)
+            )
+            if not documents:
+                return 0
+            try:
+                self.archive_collection.insert_many(documents, ordered=False)
+            except BulkWriteError as e:
+                # Only tolerate documents copied by an interrupted move
+                if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                    raise
+            object_ids = [document["_id"] for document in documents]
+            # A verbatim rerun since the copy stays in the hot collection, and
+            # its stale copy is removed from the archive
+            result = self.collection.delete_many({"_id": {"$in": object_ids}, **query})
+            if result.deleted_count < len(object_ids):
+                rerun_ids = [
+                    doc["_id"]
+                    for doc in self.collection.find(
+                        {"_id": {"$in": object_ids}}, {"_id": 1}
+                    )
+                ]
+                self.archive_collection.delete_many({"_id": {"$in": rerun_ids}})
+            if result.deleted_count:
+                return result.deleted_count
+
+
+@lru_cache(maxsize=None)
+def get_verbatim_controller() -> VerbatimController:
+    """
+    Get the shared VerbatimController instance, created on first use.
+
+    Returns:
+        VerbatimController: The VerbatimController instance.
+    """
+    return VerbatimController()
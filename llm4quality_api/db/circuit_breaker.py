@@ -0,0 +1,141 @@
+import time
+from functools import wraps
+from threading import Lock
+from pymongo.errors import ConnectionFailure, ExecutionTimeout, WTimeoutError
+
+
+class DatabaseUnavailableError(Exception):
+    """
+    Raised instead of calling MongoDB while the circuit breaker is open.
+    """
+
+
+# Errors showing that the database is unhealthy, as opposed to a bad query
+UNHEALTHY_ERRORS = (ConnectionFailure, ExecutionTimeout, WTimeoutError)
+
+
+class CircuitBreaker:
+    """
+    A thread-safe circuit breaker failing fast while the database is unhealthy.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    are rejected for `reset_timeout` seconds. A single trial call is then let
+    through: its success closes the circuit, its failure opens it again.
+    """
+
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            failure_threshold (int): Consecutive failures opening the circuit.
+            reset_timeout (float): Seconds before a trial call is let through.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = Lock()
+
+    def before_call(self) -> bool:
+        """
+        Check that a call may proceed.
+
+        Returns:
+            bool: True if the call is the trial call of a half-open circuit.
+
+        Raises:
+            DatabaseUnavailableError: If the circuit is open.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return False
+            if (
+                self.state == self.OPEN
+                and time.monotonic() - self.opened_at >= self.reset_timeout
+            ):
+                # Let a single trial call through
+                self.state = self.HALF_OPEN
+                return True
+            raise DatabaseUnavailableError(
+                "Database unavailable, retry in a few seconds"
+            )
+
+    def record_success(self):
+        """
+        Record a successful call, closing the circuit.
+        """
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def release_trial(self):
+        """
+        Give back the trial slot of a call that did not reach the database,
+        so the next call is let through as the trial.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+
+    def record_failure(self):
+        """
+        Record a failed call, opening the circuit past the threshold.
+        """
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def status(self) -> dict:
+        """
+        Get the state of the circuit.
+
+        Returns:
+            dict: -state: CLOSED, OPEN or HALF_OPEN.
+                    -failures: Consecutive failures recorded.
+                    -retry_in_seconds: Seconds before a trial call, if open.
+        """
+        with self._lock:
+            status = {"state": self.state, "failures": self.failures}
+            if self.state == self.OPEN:
+                status["retry_in_seconds"] = round(
+                    max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1
+                )
+            return status
+
+
+def guarded(method):
+    """
+    Decorate an async controller method so its database calls go through the
+    circuit breaker of the controller's MongoDB client.
+    """
+
+    @wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        breaker = self.client.breaker
+        trial = breaker.before_call()
+        try:
+            result = await method(self, *args, **kwargs)
+        except DatabaseUnavailableError:
+            # Rejected by a nested guarded call, the database was not reached
+            if trial:
+                breaker.release_trial()
+            raise
+        except UNHEALTHY_ERRORS:
+            breaker.record_failure()
+            raise
+        except Exception:
+            # The database answered, the error comes from the call itself
+            breaker.record_success()
+            raise
+        breaker.record_success()
+        return result
+
+    return wrapper
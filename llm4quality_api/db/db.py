@@ -1,6 +1,33 @@
-from pymongo import MongoClient
+import pymongo
+from pymongo import MongoClient, ReadPreference, WriteConcern
 from threading import Lock
 from llm4quality_api.config.config import Config
+from llm4quality_api.db.circuit_breaker import CircuitBreaker
+
+# Read preferences by their connection string name
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+# Fail at startup rather than on the first analytics query
+if Config.MONGO_ANALYTICS_READ_PREFERENCE not in READ_PREFERENCES:
+    raise ValueError(
+        f"Invalid MONGO_ANALYTICS_READ_PREFERENCE: "
+        f"{Config.MONGO_ANALYTICS_READ_PREFERENCE!r}, expected one of "
+        f"{', '.join(READ_PREFERENCES)}"
+    )
+
+# The ingestion reads back its inserts and relies on duplicate key errors to
+# skip the rows of a resumed upload, so bulk writes must be acknowledged
+if Config.MONGO_BULK_WRITE_CONCERN_W < 1:
+    raise ValueError(
+        f"Invalid MONGO_BULK_WRITE_CONCERN_W: {Config.MONGO_BULK_WRITE_CONCERN_W}, "
+        f"expected at least 1"
+    )
 
 
 class MongoDBClient:
@@ -26,14 +53,60 @@ class MongoDBClient:
         self, uri: str = Config.MONGO_URI, database_name: str = Config.MONGO_DB_NAME
     ):
         """
-        Initialize the MongoDB client and specify the database.
+        Specify the MongoDB connection. The client itself is only created on
+        first use, so importing and instantiating have no side effect.
 
         Args:
             uri (str): MongoDB connection string.
             database_name (str): Name of the database to connect to.
         """
-        self.client = MongoClient(uri)
-        self.database = self.client[database_name]
+        self.uri = uri
+        self.database_name = database_name
+        self._client = None
+        self._client_lock = Lock()
+        self.breaker = CircuitBreaker(
+            failure_threshold=Config.MONGO_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=Config.MONGO_CIRCUIT_RESET_SECONDS,
+        )
+        self.analytics_read_preference = READ_PREFERENCES[
+            Config.MONGO_ANALYTICS_READ_PREFERENCE
+        ]
+        self.bulk_write_concern = WriteConcern(
+            w=Config.MONGO_BULK_WRITE_CONCERN_W, j=Config.MONGO_BULK_WRITE_CONCERN_J
+        )
+
+    @property
+    def client(self) -> MongoClient:
+        """
+        Get the MongoDB client, creating it on first access.
+
+        Returns:
+            MongoClient: The MongoDB client.
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = MongoClient(
+                        self.uri,
+                        maxPoolSize=Config.MONGO_MAX_POOL_SIZE,
+                        minPoolSize=Config.MONGO_MIN_POOL_SIZE,
+                        maxIdleTimeMS=Config.MONGO_MAX_IDLE_TIME_MS,
+                        serverSelectionTimeoutMS=Config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                        connectTimeoutMS=Config.MONGO_CONNECT_TIMEOUT_MS,
+                        socketTimeoutMS=Config.MONGO_SOCKET_TIMEOUT_MS,
+                        waitQueueTimeoutMS=Config.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+                    )
+        return self._client
+
+    @property
+    def database(self):
+        """
+        Get the MongoDB database.
+
+        Returns:
+            Database: The MongoDB database.
+        """
+        return self.client[self.database_name]
 
     def get_collection(self, collection_name: str):
         """
@@ -47,11 +120,24 @@ class MongoDBClient:
         """
         return self.database[collection_name]
 
+    def ping(self, timeout: float = Config.HEALTH_CHECK_TIMEOUT_SECONDS) -> bool:
+        """
+        Check that the MongoDB server is reachable.
+
+        Args:
+            timeout (float): Seconds to wait for the server, selection included.
+
+        Returns:
+            bool: True if the server answered the ping.
+        """
+        with pymongo.timeout(timeout):
+            self.client.admin.command("ping")
+        return True
+
     def close_connection(self):
         """
         Close the MongoDB connection.
         """
-        if self.client:
-            self.client.close()
-    
-
+        if self._client:
+            self._client.close()
+            self._client = None
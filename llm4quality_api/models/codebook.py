@@ -0,0 +1,192 @@
+import sys
+from array import array
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Key marking a Result stored in its compact representation
+COMPACT_KEY = "_cb"
+
+# Version of the compact binary layout
+COMPACT_VERSION = 1
+
+# Label recorded for a criterion without any label, so it survives a round-trip
+EMPTY_LABEL = ""
+
+Path = Tuple[str, str, str]
+
+
+class Codebook:
+    """
+    A Singleton dictionary mapping each (theme, criterion, label) path of a
+    Result to a small integer code.
+
+    A compact Result only stores the codes and values of its paths as packed
+    integer arrays instead of repeating the long key strings in every
+    document. Codes are append-only, so a code never changes meaning once
+    assigned.
+    """
+
+    _instance = None
+    _lock = Lock()
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Create or return the singleton instance.
+        """
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super(Codebook, cls).__new__(cls)
+                cls._instance._initialize(*args, **kwargs)
+        return cls._instance
+
+    def _initialize(self, entries: Optional[Iterable[Iterable[str]]] = None):
+        """
+        Initialize the codebook.
+
+        Args:
+            entries (Optional[Iterable[Iterable[str]]]): Known paths, in code order.
+        """
+        self.entries: List[Path] = []
+        self.codes: Dict[Path, int] = {}
+        # Callable returning the persisted entries, used to learn new codes
+        self.loader: Optional[Callable[[], List[List[str]]]] = None
+        self.load(entries or [])
+
+    @classmethod
+    def get_instance(cls):
+        """
+        Get the singleton Codebook instance.
+
+        Returns:
+            Codebook: The singleton Codebook instance.
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def load(self, entries: Iterable[Iterable[str]]):
+        """
+        Learn the codes of persisted entries.
+
+        Args:
+            entries (Iterable[Iterable[str]]): Persisted paths, in code order.
+        """
+        entries = [tuple(entry) for entry in entries]
+        if entries[: len(self.entries)] != self.entries:
+            raise ValueError("Codebook entries can only be appended")
+        for path in entries[len(self.entries) :]:
+            self.codes[path] = len(self.entries)
+            self.entries.append(path)
+
+    def refresh(self):
+        """
+        Reload the persisted entries through the loader, if any.
+        """
+        if self.loader:
+            self.load(self.loader())
+
+    @staticmethod
+    def paths(data: dict) -> List[Tuple[Path, int]]:
+        """
+        Flatten a Result dictionary into its paths and values.
+
+        Args:
+            data (dict): Result dictionary.
+
+        Returns:
+            List[Tuple[Path, int]]: The (path, value) pairs, in dictionary order.
+        """
+        items = []
+        for theme, criteria in data.items():
+            for criterion, labels in (criteria or {}).items():
+                if not labels:
+                    items.append(((theme, criterion, EMPTY_LABEL), 0))
+                for label, value in labels.items():
+                    items.append(((theme, criterion, label), value))
+        return items
+
+    def missing_paths(self, data: dict) -> List[Path]:
+        """
+        List the paths of a Result dictionary that have no code yet.
+
+        Args:
+            data (dict): Result dictionary.
+
+        Returns:
+            List[Path]: The unknown paths, without duplicates.
+        """
+        missing = []
+        for path, _ in self.paths(data):
+            if path not in self.codes and path not in missing:
+                missing.append(path)
+        return missing
+
+    def encode(self, data: dict) -> dict:
+        """
+        Encode a Result dictionary into its compact representation.
+
+        Args:
+            data (dict): Result dictionary whose paths all have a code.
+
+        Returns:
+            dict: The compact representation.
+        """
+        items = self.paths(data)
+        codes = array("H", [self.codes[path] for path, _ in items])
+        values = array("h", [value for _, value in items])
+        if codes.itemsize != 2 or values.itemsize != 2:
+            raise ValueError("Unsupported platform for the compact encoding")
+        if sys.byteorder == "big":
+            # Always store little-endian arrays
+            codes.byteswap()
+            values.byteswap()
+        return {
+            COMPACT_KEY: bytes([COMPACT_VERSION]) + codes.tobytes() + values.tobytes()
+        }
+
+    def decode(self, data: dict) -> dict:
+        """
+        Decode the compact representation of a Result.
+
+        Args:
+            data (dict): The compact representation.
+
+        Returns:
+            dict: The Result dictionary.
+        """
+        payload = bytes(data[COMPACT_KEY])
+        if payload[0] != COMPACT_VERSION:
+            raise ValueError(f"Unsupported compact result version: {payload[0]}")
+        size = (len(payload) - 1) // 4
+        codes = array("H")
+        codes.frombytes(payload[1 : 1 + 2 * size])
+        values = array("h")
+        values.frombytes(payload[1 + 2 * size :])
+        if sys.byteorder == "big":
+            codes.byteswap()
+            values.byteswap()
+
+        if codes and max(codes) >= len(self.entries):
+            # Codes assigned by another process since the last load
+            self.refresh()
+
+        result: Dict[str, Dict[str, Dict[str, int]]] = {}
+        for code, value in zip(codes, values):
+            theme, criterion, label = self.entries[code]
+            labels = result.setdefault(theme, {}).setdefault(criterion, {})
+            if label != EMPTY_LABEL:
+                labels[label] = value
+        return result
+
+    @staticmethod
+    def is_compact(data) -> bool:
+        """
+        Check whether a stored Result uses the compact representation.
+
+        Args:
+            data: The stored Result.
+
+        Returns:
+            bool: True if the Result is compact, False otherwise.
+        """
+        return isinstance(data, dict) and COMPACT_KEY in data
@@ -1,8 +1,9 @@
-from typing import Optional, Dict
+from typing import Optional, Dict, Any
 from pydantic import BaseModel, Field, field_serializer
 from bson import ObjectId
 from datetime import datetime
 from enum import Enum
+from llm4quality_api.models.codebook import Codebook
 
 
 # Enum for status
@@ -20,8 +21,11 @@ class Result(BaseModel):
     @classmethod
     def from_dict(cls, data: dict):
         """
-        Create a Result instance from a dictionary.
+        Create a Result instance from a dictionary, in its full or compact
+        representation.
         """
+        if Codebook.is_compact(data):
+            data = Codebook.get_instance().decode(data)
         return cls(**data)
 
     def to_dict(self) -> dict:
@@ -51,15 +55,33 @@ class Verbatim(BaseModel):
     result: Optional[Result]
     year: int
     created_at: Optional[datetime]
+    batch_id: Optional[str] = None
+    # Lifecycle of the latest classification request
+    requested_at: Optional[datetime] = None
+    dispatched_at: Optional[datetime] = None
+    worker_started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    attempts: Optional[int] = None
+    # Token of the latest dispatch, echoed back by the worker in its response
+    attempt_token: Optional[int] = None
+    # Pre-filter rule that completed the verbatim without a worker, if any
+    prefilter_rule: Optional[str] = None
 
     class Config:
         arbitrary_types_allowed = True
         json_encoders = {ObjectId: str}
         populate_by_name = True
 
-    @field_serializer("created_at", when_used="json")
+    @field_serializer(
+        "created_at",
+        "requested_at",
+        "dispatched_at",
+        "worker_started_at",
+        "completed_at",
+        when_used="json",
+    )
     def serialize_created_at(self, value: Optional[datetime]) -> Optional[str]:
-        """Serialize `created_at` to an ISO 8601 string."""
+        """Serialize the timestamps to ISO 8601 strings."""
         return value.isoformat() if value else None
 
     @classmethod
@@ -69,9 +91,21 @@ class Verbatim(BaseModel):
             id=str(data.get("_id")) if data.get("_id") else None,
             content=data["content"],
             status=data["status"],
-            result=data.get("result"),
+            result=(
+                Result.from_dict(data["result"])
+                if data.get("result") is not None
+                else None
+            ),
             year=data["year"],
             created_at=data.get("created_at"),
+            batch_id=data.get("batch_id"),
+            requested_at=data.get("requested_at"),
+            dispatched_at=data.get("dispatched_at"),
+            worker_started_at=data.get("worker_started_at"),
+            completed_at=data.get("completed_at"),
+            attempts=data.get("attempts"),
+            attempt_token=data.get("attempt_token"),
+            prefilter_rule=data.get("prefilter_rule"),
         )
 
     def to_dict(self) -> dict:
@@ -80,3 +114,43 @@ class Verbatim(BaseModel):
         if "_id" in doc:
             doc["_id"] = str(doc["_id"])
         return doc
+
+
+# Enum for background job status
+class JobStatus(str, Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    SUCCESS = "SUCCESS"
+    ERROR = "ERROR"
+
+
+class Job(BaseModel):
+    id: str = Field(default_factory=lambda: str(ObjectId()), alias="_id")
+    kind: str
+    status: JobStatus
+    params: Dict[str, Any] = Field(default_factory=dict)
+    total: int = 0
+    processed: int = 0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        populate_by_name = True
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Create a Job instance from a dictionary."""
+        return cls(
+            id=str(data.get("_id")),
+            kind=data["kind"],
+            status=data["status"],
+            params=data.get("params") or {},
+            total=data.get("total", 0),
+            processed=data.get("processed", 0),
+            result=data.get("result"),
+            error=data.get("error"),
+            created_at=data.get("created_at"),
+            updated_at=data.get("updated_at"),
+        )
@@ -0,0 +1,31 @@
+import asyncio
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import PlainTextResponse
+from llm4quality_api.auth import get_current_user
+from llm4quality_api.config.config import Config
+from llm4quality_api.utils.profiling import sample_stacks
+
+# Définir un routeur FastAPI pour le diagnostic, inclus seulement si activé
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+# Endpoint de profilage : échantillonne les piles de tous les threads
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(
+        default=10, gt=0, le=Config.PROFILE_MAX_SECONDS, description="Durée du profilage"
+    ),
+    user: dict = Depends(get_current_user),
+):
+    return await asyncio.to_thread(
+        sample_stacks, seconds, Config.PROFILE_SAMPLE_INTERVAL_MS / 1000
+    )
+
+
+# Endpoint de la latence de la boucle d'événements mesurée par le watchdog
+@router.get("/loop")
+async def loop_lag(request: Request, user: dict = Depends(get_current_user)):
+    watchdog = getattr(request.app.state, "loop_watchdog", None)
+    if watchdog is None:
+        return {"enabled": False}
+    return {"enabled": True, **watchdog.status()}
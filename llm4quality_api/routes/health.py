@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+from llm4quality_api.config.config import Config
+from llm4quality_api.db.db import MongoDBClient
+from llm4quality_api.utils.broker import check_connection
+from llm4quality_api.utils.startup import run_blocking, run_phases
+
+# Définir un routeur FastAPI pour les sondes de l'orchestrateur
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+# Endpoint de liveness : le processus répond
+@router.get("/live")
+async def liveness():
+    return {"status": "alive"}
+
+
+# Endpoint de readiness : MongoDB et RabbitMQ sont joignables
+@router.get("/ready")
+async def readiness(request: Request):
+    checks = await run_phases(
+        {
+            "mongodb": lambda: run_blocking(MongoDBClient().ping),
+            "rabbitmq": lambda: run_blocking(check_connection),
+        },
+        timeout=Config.HEALTH_CHECK_TIMEOUT_SECONDS,
+    )
+    ready = all(check["status"] == "ok" for check in checks.values())
+    return JSONResponse(
+        {
+            "status": "ready" if ready else "not ready",
+            "checks": checks,
+            "database_circuit": MongoDBClient().breaker.status(),
+            "startup": getattr(request.app.state, "startup_report", None),
+        },
+        status_code=200 if ready else 503,
+    )
@@ -1,13 +1,49 @@
-from fastapi import APIRouter,WebSocket,WebSocketDisconnect,WebSocketException, HTTPException, Query, Depends
-from typing import List, Optional
+from fastapi import APIRouter,WebSocket,WebSocketDisconnect,WebSocketException, HTTPException, Query, Depends, BackgroundTasks, Response
+from typing import Dict, List, Optional
 from bson import ObjectId
+from datetime import datetime, timedelta, timezone
 import json
 from pydantic import BaseModel
-from llm4quality_api.controllers.verbatim_controller import VerbatimController
-from llm4quality_api.models.models import Verbatim, Status
+from llm4quality_api.controllers.verbatim_controller import (
+    VerbatimController,
+    get_verbatim_controller,
+)
+from llm4quality_api.controllers.job_controller import JobController, get_job_controller
+from llm4quality_api.controllers.evaluation_controller import (
+    EvaluationController,
+    get_evaluation_controller,
+)
+from llm4quality_api.config.config import Config
+from llm4quality_api.models.models import Verbatim, Status, Job
+from llm4quality_api.db.circuit_breaker import DatabaseUnavailableError
 from llm4quality_api.utils.logger import Logger
-from llm4quality_api.auth import get_current_user
-from llm4quality_api.services.verbatims import handle_csv_action, handle_rerun_action
+from llm4quality_api.utils.metrics import (
+    Counters,
+    get_prefilter_counters,
+    get_response_counters,
+)
+from llm4quality_api.utils.serialization import (
+    parse_verbatim_fields,
+    verbatim_projection,
+    verbatim_documents_to_json,
+)
+from llm4quality_api.auth import (
+    get_current_user,
+    get_current_user_websocket,
+    get_principal_id,
+)
+from llm4quality_api.services.verbatims import (
+    handle_csv_action,
+    handle_rerun_action,
+    handle_upload_status_action,
+)
+from llm4quality_api.services.admission import AdmissionControl, get_admission_control
+from llm4quality_api.services.framing import ClientFraming, FramingOptions
+from llm4quality_api.tasks.jobs import (
+    run_archive_job,
+    run_delete_job,
+    run_evaluation_job,
+)
 
 # Définir un routeur FastAPI
 router = APIRouter()
@@ -18,8 +54,8 @@ logger = Logger.get_instance().get_logger()
 # Set of active WebSocket connections
 connected_clients = set()
 
-# Instanciation du contrôleur
-controller = VerbatimController()
+# Framing chosen by each active WebSocket connection
+client_framing: Dict[WebSocket, ClientFraming] = {}
 
 
 # Endpoint pour récupérer les verbatims
@@ -30,10 +66,21 @@ async def get_verbatims(
     year: Optional[int] = Query(None, description="Filtrer par année"),
     status: Optional[str] = Query(None, description="Filtrer par statut"),
     created_at: Optional[str] = Query(None, description="Filtrer par date de création"),
+    batch_id: Optional[str] = Query(None, description="Filtrer par lot d'import"),
+    fields: Optional[str] = Query(
+        None,
+        description="Champs à retourner, séparés par des virgules (ex: id,status,year)",
+    ),
     user: dict = Depends(get_current_user),
+    controller: VerbatimController = Depends(get_verbatim_controller),
 ):
     
     try:
+        try:
+            field_list = parse_verbatim_fields(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
         query = {}
         if year:
             # Check if the year is valid
@@ -52,9 +99,24 @@ async def get_verbatims(
         if created_at:
             # Check if the date is valid
             query["created_at"] = created_at
-        return await controller.get_verbatims(
-            query, pagination=page, per_page=pagination
+        if batch_id:
+            query["batch_id"] = batch_id
+
+        # Serialize the raw documents directly, without a pydantic round-trip
+        documents = await controller.get_verbatim_documents(
+            query,
+            pagination=page,
+            per_page=pagination,
+            projection=verbatim_projection(field_list),
         )
+        return Response(
+            content=verbatim_documents_to_json(documents, field_list),
+            media_type="application/json",
+        )
+    except HTTPException as e:
+        raise e  # Re-raise validation errors
+    except DatabaseUnavailableError:
+        raise  # Answered with a 503 by the application handler
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -69,6 +131,7 @@ class DeleteVerbatimsRequest(BaseModel):
 async def delete_verbatims(
     request: DeleteVerbatimsRequest,
     user: dict = Depends(get_current_user),
+    controller: VerbatimController = Depends(get_verbatim_controller),
 ):
     try:
         # Validate each ID
@@ -83,27 +146,316 @@ async def delete_verbatims(
         return {"message": f"{deleted_count} verbatims supprimés."}
     except HTTPException as e:
         raise e  # Re-raise validation errors
+    except DatabaseUnavailableError:
+        raise  # Answered with a 503 by the application handler
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Pydantic model for the filter-based deletion request body
+class DeleteFilterRequest(BaseModel):
+    year: Optional[int] = None
+    status: Optional[Status] = None
+    batch_id: Optional[str] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+    def to_query(self) -> dict:
+        """Build the MongoDB query filter matching the request."""
+        query = {}
+        if self.year is not None:
+            query["year"] = self.year
+        if self.status is not None:
+            query["status"] = self.status.value
+        if self.batch_id is not None:
+            query["batch_id"] = self.batch_id
+        if self.created_from or self.created_to:
+            query["created_at"] = {}
+            if self.created_from:
+                query["created_at"]["$gte"] = self.created_from
+            if self.created_to:
+                query["created_at"]["$lt"] = self.created_to
+        return query
+
+
+# Endpoint pour supprimer en arrière-plan les verbatims correspondant à un filtre
+@router.post("/delete/filter", status_code=202, response_model=Job)
+async def delete_verbatims_by_filter(
+    request: DeleteFilterRequest,
+    background_tasks: BackgroundTasks,
+    user: dict = Depends(get_current_user),
+    job_controller: JobController = Depends(get_job_controller),
+):
+    try:
+        query = request.to_query()
+        if not query:
+            raise HTTPException(
+                status_code=400, detail="At least one filter is required"
+            )
+        if request.year is not None and request.year < 0:
+            raise HTTPException(
+                status_code=400, detail=f"Invalid year: {request.year}"
+            )
+
+        job = await job_controller.create_job(
+            "delete", request.model_dump(mode="json", exclude_none=True)
+        )
+        background_tasks.add_task(run_delete_job, job.id, query)
+        return job
+    except HTTPException as e:
+        raise e  # Re-raise validation errors
+    except DatabaseUnavailableError:
+        raise  # Answered with a 503 by the application handler
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Endpoint pour suivre l'avancement d'une tâche en arrière-plan
+@router.get("/jobs/{job_id}", response_model=Job)
+async def get_job(
+    job_id: str,
+    user: dict = Depends(get_current_user),
+    job_controller: JobController = Depends(get_job_controller),
+):
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(status_code=400, detail=f"Invalid ObjectId: {job_id}")
+    job = await job_controller.find_job_by_id(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+# Endpoint pour archiver les verbatims d'une année
+@router.post("/archive/{year}", status_code=202, response_model=Job)
+async def archive_year(
+    year: int,
+    background_tasks: BackgroundTasks,
+    user: dict = Depends(get_current_user),
+    job_controller: JobController = Depends(get_job_controller),
+):
+    try:
+        if year < 0:
+            raise HTTPException(status_code=400, detail=f"Invalid year: {year}")
+        if year >= datetime.now().year:
+            raise HTTPException(
+                status_code=400, detail=f"The current year cannot be archived: {year}"
+            )
+
+        job = await job_controller.create_job("archive", {"year": year})
+        background_tasks.add_task(run_archive_job, job.id, year)
+        return job
+    except HTTPException as e:
+        raise e  # Re-raise validation errors
+    except DatabaseUnavailableError:
+        raise  # Answered with a 503 by the application handler
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Endpoint pour lister les années archivées
+@router.get("/tiers")
+async def get_tiers(
+    user: dict = Depends(get_current_user),
+    controller: VerbatimController = Depends(get_verbatim_controller),
+):
+    try:
+        return await controller.list_tiers()
+    except DatabaseUnavailableError:
+        raise  # Answered with a 503 by the application handler
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Endpoint pour lancer l'évaluation de la cohérence des classifications d'une année
+@router.post("/evaluations/{year}", status_code=202, response_model=Job)
+async def evaluate_year(
+    year: int,
+    background_tasks: BackgroundTasks,
+    user: dict = Depends(get_current_user),
+    job_controller: JobController = Depends(get_job_controller),
+):
+    try:
+        if year < 0:
+            raise HTTPException(status_code=400, detail=f"Invalid year: {year}")
+
+        job = await job_controller.create_job("evaluation", {"year": year})
+        background_tasks.add_task(run_evaluation_job, job.id, year)
+        return job
+    except HTTPException as e:
+        raise e  # Re-raise validation errors
+    except DatabaseUnavailableError:
+        raise  # Answered with a 503 by the application handler
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Endpoint pour obtenir la dernière évaluation de la cohérence d'une année
+@router.get("/evaluations/{year}")
+async def get_evaluation(
+    year: int,
+    user: dict = Depends(get_current_user),
+    controller: VerbatimController = Depends(get_verbatim_controller),
+    evaluation_controller: EvaluationController = Depends(get_evaluation_controller),
+):
+    try:
+        evaluation = await evaluation_controller.find_evaluation(year)
+        if not evaluation:
+            raise HTTPException(
+                status_code=404, detail=f"No evaluation for {year}, start one first"
+            )
+        # Results completed since the evaluation are not taken into account
+        evaluation["stale"] = (
+            await controller.count_verbatims(
+                {"year": year, "completed_at": {"$gt": evaluation["computed_at"]}}
+            )
+            > 0
+        )
+        return evaluation
+    except HTTPException as e:
+        raise e  # Re-raise validation errors
+    except DatabaseUnavailableError:
+        raise  # Answered with a 503 by the application handler
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
 # Endpoint pour obtenir les informations de count de la collection
 @router.get("/count")
-async def get_count(user: dict = Depends(get_current_user)):
+async def get_count(
+    year: Optional[int] = Query(None, description="Filtrer par année"),
+    user: dict = Depends(get_current_user),
+    controller: VerbatimController = Depends(get_verbatim_controller),
+):
+    try:
+        query = {"year": year} if year is not None else {}
+        return await controller.get_collection_count(query)
+    except DatabaseUnavailableError:
+        raise  # Answered with a 503 by the application handler
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Endpoint pour obtenir les percentiles de latence et le débit de traitement
+@router.get("/stats/latency")
+async def get_latency_stats(
+    year: Optional[int] = Query(None, description="Filtrer par année"),
+    batch_id: Optional[str] = Query(None, description="Filtrer par lot d'import"),
+    completed_from: Optional[datetime] = Query(
+        None, description="Terminés à partir de, par défaut sur les dernières périodes"
+    ),
+    completed_to: Optional[datetime] = Query(None, description="Terminés avant"),
+    granularity: str = Query(
+        default="hour", pattern="^(minute|hour)$", description="Période du débit"
+    ),
+    user: dict = Depends(get_current_user),
+    controller: VerbatimController = Depends(get_verbatim_controller),
+):
     try:
-        return await controller.get_collection_count()
+        query = {}
+        if year is not None:
+            query["year"] = year
+        if batch_id:
+            query["batch_id"] = batch_id
+        if completed_from is None:
+            # Sans date de début, seules les dernières périodes sont analysées
+            end = completed_to or datetime.now(timezone.utc)
+            if granularity == "minute":
+                period = timedelta(minutes=1)
+                current = end.replace(second=0, microsecond=0)
+            else:
+                period = timedelta(hours=1)
+                current = end.replace(minute=0, second=0, microsecond=0)
+            completed_from = current - (Config.LATENCY_MAX_PERIODS - 1) * period
+        query["completed_at"] = {"$gte": completed_from}
+        if completed_to:
+            query["completed_at"]["$lt"] = completed_to
+        stats = await controller.get_latency_stats(query, granularity=granularity)
+        return {"completed_from": completed_from, **stats}
+    except DatabaseUnavailableError:
+        raise  # Answered with a 503 by the application handler
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Endpoint pour obtenir les réponses des workers appliquées et ignorées par ce processus
+@router.get("/stats/responses")
+async def get_response_stats(
+    user: dict = Depends(get_current_user),
+    counters: Counters = Depends(get_response_counters),
+):
+    counts = counters.snapshot()
+    return {
+        "instance_id": Config.INSTANCE_ID,
+        "applied": counts.get("applied", 0),
+        "dropped_stale": counts.get("dropped_stale", 0),
+        "dropped_duplicate": counts.get("dropped_duplicate", 0),
+        "dropped_unknown": counts.get("dropped_unknown", 0),
+    }
+
+
+# Endpoint pour obtenir les lignes écartées par le pré-filtre de ce processus, par règle
+@router.get("/stats/prefilter")
+async def get_prefilter_stats(
+    user: dict = Depends(get_current_user),
+    counters: Counters = Depends(get_prefilter_counters),
+):
+    counts = counters.snapshot()
+    classified = counts.pop("classified", 0)
+    filtered = sum(counts.values())
+    return {
+        "instance_id": Config.INSTANCE_ID,
+        "mode": Config.PREFILTER_MODE,
+        "classified": classified,
+        "filtered": filtered,
+        "filtered_ratio": (
+            round(filtered / (filtered + classified), 3) if filtered + classified else None
+        ),
+        "rules": counts,
+    }
+
+
+# Endpoint pour obtenir l'état de la file des workers et l'estimation de fin de traitement
+@router.get("/queue")
+async def get_queue(
+    user: dict = Depends(get_current_user),
+    admission: AdmissionControl = Depends(get_admission_control),
+):
+    try:
+        sample = await admission.sample()
+        return {
+            **sample,
+            "max_backlog": admission.max_backlog,
+            "estimated_completion_seconds": await admission.estimate_completion(),
+        }
+    except DatabaseUnavailableError:
+        raise  # Answered with a 503 by the application handler
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(
+    websocket: WebSocket,
+    framing: str = Query(default="legacy", pattern="^(legacy|batch)$"),
+    summary: bool = Query(default=False),
+    user: Optional[dict] = Depends(get_current_user_websocket),
+):
     """
     WebSocket endpoint for managing live client connections.
 
     Args:
         websocket (WebSocket): WebSocket instance.
+        framing (str): "batch" to receive the updates coalesced into array frames.
+        summary (bool): True to only receive the acknowledgements of uploads
+            and reruns, without one update per verbatim.
+        user (Optional[dict]): Claims of the user authenticated by the
+            `token` query parameter, required by the resumable uploads.
     """
     await websocket.accept()
+    client = ClientFraming(
+        websocket, FramingOptions(mode=framing, summary_only=summary)
+    )
+    client_framing[websocket] = client
+    owner = get_principal_id(user)
     connected_clients.add(websocket)
     logger.info(f"WebSocket client connected: {websocket.client}")
     try:
@@ -146,15 +498,57 @@ async def websocket_endpoint(websocket: WebSocket):
                     {"error": "Invalid 'year' field, must be an integer"}
                 )
 
+            upload_key = parsed_data.get("upload_key")
+            if upload_key is not None and (
+                not isinstance(upload_key, str) or not 0 < len(upload_key) <= 128
+            ):
+                await websocket.send_json(
+                    {"error": "Invalid 'upload_key' field, must be a string of 1 to 128 characters"}
+                )
+                continue
+
+            offset = parsed_data.get("offset", 0)
+            if not isinstance(offset, int) or offset < 0:
+                await websocket.send_json(
+                    {"error": "Invalid 'offset' field, must be a positive integer"}
+                )
+                continue
+
             action = parsed_data["action"]
 
             if action == "CSV" and "file" in parsed_data:
                 logger.info(f"Gonna process CSV file")
                 await handle_csv_action(
-                    websocket, parsed_data["file"], parsed_data["year"]
+                    websocket,
+                    parsed_data["file"],
+                    parsed_data["year"],
+                    client,
+                    upload_key=upload_key,
+                    offset=offset,
+                    owner=owner,
                 )
+            elif action == "UPLOAD_STATUS" and upload_key:
+                await handle_upload_status_action(websocket, upload_key, owner)
             elif action == "RERUN" and "verbatims" in parsed_data:
-                await handle_rerun_action(websocket, parsed_data["verbatims"])
+                await handle_rerun_action(websocket, parsed_data["verbatims"], client)
+            elif action == "CONFIG":
+                try:
+                    options = FramingOptions(
+                        **{
+                            key: value
+                            for key, value in parsed_data.items()
+                            if key != "action"
+                        }
+                    )
+                except ValueError as e:
+                    await websocket.send_json({"error": f"Invalid CONFIG: {e}"})
+                    continue
+                await client.configure(options)
+                await websocket.send_json(
+                    {"status": "CONFIG applied", **options.model_dump()}
+                )
     except WebSocketDisconnect:
-        connected_clients.remove(websocket)
+        connected_clients.discard(websocket)
+        client_framing.pop(websocket, None)
+        await client.close()
         logger.info(f"WebSocket client disconnected: {websocket.client}")
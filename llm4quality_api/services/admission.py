@@ -0,0 +1,155 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+from llm4quality_api.config.config import Config
+from llm4quality_api.controllers.verbatim_controller import (
+    VerbatimController,
+    get_verbatim_controller,
+)
+from llm4quality_api.utils.broker import get_queue_stats
+from llm4quality_api.utils.logger import Logger
+
+# Logger instance
+logger = Logger.get_instance().get_logger()
+
+
+class AdmissionControl:
+    """
+    Decide how many verbatims can be dispatched to the workers right now.
+
+    The decision is driven by the depth of the worker requests queue: beyond
+    the maximum backlog, new verbatims are kept pending in MongoDB and the
+    dispatch scheduler releases them as the workers catch up.
+    """
+
+    def __init__(
+        self,
+        controller: Optional[VerbatimController] = None,
+        queue: str = "worker_requests",
+        max_backlog: int = Config.ADMISSION_MAX_BACKLOG,
+        sample_ttl: float = Config.ADMISSION_SAMPLE_TTL_SECONDS,
+        throughput_window: float = Config.ADMISSION_THROUGHPUT_WINDOW_SECONDS,
+    ):
+        """
+        Initialize the admission control.
+
+        Args:
+            controller (Optional[VerbatimController]): Controller to use.
+            queue (str): Queue the verbatims are published to.
+            max_backlog (int): Maximum number of messages waiting in the queue,
+                0 to disable the admission control.
+            sample_ttl (float): Seconds during which a sample is reused.
+            throughput_window (float): Seconds over which throughput is measured.
+        """
+        self.controller = controller or get_verbatim_controller()
+        self.queue = queue
+        self.max_backlog = max_backlog
+        self.sample_ttl = sample_ttl
+        self.throughput_window = throughput_window
+        self._sample: Optional[dict] = None
+        self._sampled_at = 0.0
+
+    async def sample(self) -> dict:
+        """
+        Sample the backlog and the throughput of the workers.
+
+        Returns:
+            dict: -queue_depth: Messages waiting in the worker requests queue.
+                    -consumers: Workers consuming the queue.
+                    -deferred: Verbatims pending in MongoDB.
+                    -throughput_per_second: Verbatims completed per second recently.
+        """
+        if self._sample and time.monotonic() - self._sampled_at < self.sample_ttl:
+            return self._sample
+
+        stats = await asyncio.to_thread(get_queue_stats, self.queue)
+        since = datetime.now(timezone.utc) - timedelta(seconds=self.throughput_window)
+        completed = await self.controller.count_completed_since(since)
+        self._sample = {
+            "queue_depth": stats["message_count"],
+            "consumers": stats["consumer_count"],
+            "deferred": await self.controller.count_deferred_verbatims(),
+            "throughput_per_second": completed / self.throughput_window,
+        }
+        self._sampled_at = time.monotonic()
+        return self._sample
+
+    async def capacity(self) -> Optional[int]:
+        """
+        Get the number of verbatims the queue can take before the maximum backlog.
+
+        Returns:
+            Optional[int]: The available capacity, None if unlimited.
+        """
+        if self.max_backlog <= 0:
+            return None
+        sample = await self.sample()
+        return max(0, self.max_backlog - sample["queue_depth"])
+
+    def reserve(self, count: int):
+        """
+        Account for verbatims just published until the next sample.
+
+        Args:
+            count (int): Number of verbatims published.
+        """
+        if self._sample:
+            self._sample["queue_depth"] += count
+
+    async def admit(self, count: int) -> int:
+        """
+        Get how many of `count` new verbatims can be dispatched right now.
+
+        New verbatims wait behind the ones already pending, so nothing is
+        admitted while the backlog is being drained.
+
+        Args:
+            count (int): Number of verbatims to dispatch.
+
+        Returns:
+            int: Number of verbatims to dispatch now, the rest must be deferred.
+        """
+        capacity = await self.capacity()
+        if capacity is None:
+            return count
+        if self._sample["deferred"] > 0:
+            admitted = 0
+        else:
+            admitted = min(count, capacity)
+        self.reserve(admitted)
+        self._sample["deferred"] += count - admitted
+        if admitted < count:
+            logger.info(
+                f"Admission control: {count - admitted} verbatims deferred, queue depth {self._sample['queue_depth']}"
+            )
+        return admitted
+
+    async def estimate_completion(self, pending: int = 0) -> Optional[float]:
+        """
+        Estimate the seconds needed to process the backlog and `pending` more
+        verbatims at the measured throughput.
+
+        Args:
+            pending (int): Verbatims to process in addition to the backlog.
+
+        Returns:
+            Optional[float]: Estimated seconds, None if no throughput was measured.
+        """
+        sample = await self.sample()
+        if sample["throughput_per_second"] <= 0:
+            return None
+        backlog = sample["queue_depth"] + sample["deferred"] + pending
+        return round(backlog / sample["throughput_per_second"], 1)
+
+
+@lru_cache(maxsize=None)
+def get_admission_control() -> AdmissionControl:
+    """
+    Get the shared AdmissionControl instance, created on first use.
+
+    Returns:
+        AdmissionControl: The AdmissionControl instance.
+    """
+    return AdmissionControl()
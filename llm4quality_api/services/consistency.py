@@ -0,0 +1,144 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from llm4quality_api.models.codebook import Codebook, EMPTY_LABEL, Path
+
+
+def build_matrix(
+    histories: List[List[dict]],
+) -> Tuple[List[Path], np.ndarray, np.ndarray]:
+    """
+    Flatten the result histories into a dense matrix.
+
+    A label missing from a result counts as the value 0.
+
+    Args:
+        histories (List[List[dict]]): The results of each verbatim, oldest
+            first, in their full or compact representation.
+
+    Returns:
+        Tuple[List[Path], np.ndarray, np.ndarray]: The (theme, criterion,
+            label) path of each column, the values shaped (verbatims, runs,
+            paths), and the mask of the existing runs shaped (verbatims, runs).
+    """
+    codebook = Codebook.get_instance()
+    columns: Dict[Path, int] = {}
+    rows, runs, cols, values = [], [], [], []
+    for row, history in enumerate(histories):
+        for run, result in enumerate(history):
+            if Codebook.is_compact(result):
+                result = codebook.decode(result)
+            for path, value in Codebook.paths(result):
+                if path[2] == EMPTY_LABEL:
+                    continue
+                rows.append(row)
+                runs.append(run)
+                cols.append(columns.setdefault(path, len(columns)))
+                values.append(value)
+
+    run_counts = np.array([len(history) for history in histories], dtype=np.int64)
+    max_runs = int(run_counts.max()) if len(histories) else 0
+    matrix = np.zeros((len(histories), max_runs, len(columns)), dtype=np.int16)
+    matrix[rows, runs, cols] = values
+    mask = np.arange(max_runs) < run_counts[:, None]
+    return list(columns), matrix, mask
+
+
+def _round(value: float) -> Optional[float]:
+    """Round a statistic, None when it is undefined."""
+    return None if np.isnan(value) else round(float(value), 4)
+
+
+def evaluate_consistency(histories: List[List[dict]]) -> dict:
+    """
+    Measure how consistently the verbatims are classified across reruns.
+
+    All statistics are computed at once on the (verbatims, runs, paths)
+    matrix of the histories:
+    - agreement rate: share of verbatims whose runs all gave the same value,
+    - flips: number of value changes between two consecutive runs,
+    - kappa: Fleiss' kappa of the runs, seen as raters of each verbatim,
+      undefined (None) when a single value was ever given.
+
+    A criterion agrees when all its labels agree, flips when any of its
+    labels flips, and its kappa is the mean kappa of its labels.
+
+    Args:
+        histories (List[List[dict]]): The results of each verbatim classified
+            at least twice, oldest first.
+
+    Returns:
+        dict: -verbatims: Number of verbatims evaluated.
+                -results: Number of results compared.
+                -full_agreement_rate: Share of verbatims whose runs all gave
+                    the same classification.
+                -criteria: The statistics per theme and criterion, with the
+                    statistics of their labels.
+    """
+    paths, matrix, mask = build_matrix(histories)
+    run_counts = mask.sum(axis=1)
+    report = {
+        "verbatims": len(histories),
+        "results": int(run_counts.sum()),
+        "full_agreement_rate": None,
+        "criteria": [],
+    }
+    if not len(histories) or not paths:
+        return report
+
+    # Number of runs giving each value, shaped (values, verbatims, paths)
+    categories = np.unique(matrix)
+    counts = np.stack(
+        [((matrix == category) & mask[:, :, None]).sum(axis=1) for category in categories]
+    )
+    agree = counts.max(axis=0) == run_counts[:, None]
+    changes = (matrix[:, 1:] != matrix[:, :-1]) & mask[:, 1:, None]
+
+    # Fleiss' kappa, allowing a different number of runs per verbatim
+    n = run_counts[:, None].astype(np.float64)
+    observed = (((counts.astype(np.float64) ** 2).sum(axis=0) - n) / (n * (n - 1))).mean(axis=0)
+    proportions = counts.sum(axis=1) / run_counts.sum()
+    expected = (proportions**2).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kappa = np.where(expected < 1, (observed - expected) / (1 - expected), np.nan)
+
+    # Group the label columns by criterion
+    order = np.array(sorted(range(len(paths)), key=lambda column: paths[column]))
+    criteria = [paths[column][:2] for column in order]
+    starts = np.array(
+        [0] + [i for i in range(1, len(criteria)) if criteria[i] != criteria[i - 1]]
+    )
+    criterion_agree = np.logical_and.reduceat(agree[:, order], starts, axis=1)
+    criterion_flips = np.logical_or.reduceat(changes[:, :, order], starts, axis=2).sum(axis=(0, 1))
+    defined = ~np.isnan(kappa[order])
+    kappa_sums = np.add.reduceat(np.where(defined, kappa[order], 0.0), starts)
+    kappa_counts = np.add.reduceat(defined.astype(np.int64), starts)
+
+    agreement_rates = agree.mean(axis=0)
+    flips = changes.sum(axis=(0, 1))
+    ends = list(starts[1:]) + [len(order)]
+    for group, (start, end) in enumerate(zip(starts, ends)):
+        theme, criterion = criteria[start]
+        report["criteria"].append(
+            {
+                "theme": theme,
+                "criterion": criterion,
+                "agreement_rate": _round(criterion_agree[:, group].mean()),
+                "flips": int(criterion_flips[group]),
+                "kappa": _round(
+                    kappa_sums[group] / kappa_counts[group]
+                    if kappa_counts[group]
+                    else np.nan
+                ),
+                "labels": [
+                    {
+                        "label": paths[column][2],
+                        "agreement_rate": _round(agreement_rates[column]),
+                        "flips": int(flips[column]),
+                        "kappa": _round(kappa[column]),
+                    }
+                    for column in order[start:end]
+                ],
+            }
+        )
+    report["full_agreement_rate"] = _round(agree.all(axis=1).mean())
+    return report
@@ -0,0 +1,212 @@
+import asyncio
+from typing import Any, Iterable, List, Literal, Optional
+from fastapi import WebSocket
+from pydantic import BaseModel, Field
+from llm4quality_api.config.config import Config
+from llm4quality_api.models.models import Verbatim
+from llm4quality_api.utils.logger import Logger
+
+# Logger instance
+logger = Logger.get_instance().get_logger()
+
+# Type of the frames carrying coalesced updates
+BATCH_FRAME_TYPE = "batch"
+
+
+class FramingOptions(BaseModel):
+    """
+    Framing of the messages sent to a WebSocket client.
+
+    In "legacy" mode every update is sent as its own frame. In "batch" mode
+    updates are coalesced into {"type": "batch", "items": [...]} frames.
+    """
+
+    mode: Literal["legacy", "batch"] = "legacy"
+    # Only acknowledge uploads and reruns, without one update per verbatim
+    summary_only: bool = False
+    batch_size: int = Field(default=Config.WS_BATCH_SIZE, ge=1, le=10000)
+    flush_interval_ms: int = Field(default=Config.WS_FLUSH_INTERVAL_MS, ge=0, le=10000)
+
+
+class FrameCoalescer:
+    """
+    Coalesce the updates sent to a WebSocket client into array frames.
+
+    Updates are buffered and sent as one frame once `max_items` are pending,
+    or `max_delay` seconds after the first pending one, whichever comes first.
+    """
+
+    def __init__(self, websocket: WebSocket, max_items: int, max_delay: float):
+        """
+        Initialize the coalescer.
+
+        Args:
+            websocket (WebSocket): WebSocket instance.
+            max_items (int): Maximum number of updates per frame.
+            max_delay (float): Maximum seconds an update waits before being sent.
+        """
+        self.websocket = websocket
+        self.max_items = max_items
+        self.max_delay = max_delay
+        self._pending: List[Any] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def add(self, item: Any):
+        """
+        Queue an update.
+
+        Args:
+            item (Any): The JSON-serializable update.
+        """
+        await self.add_many([item])
+
+    async def add_many(self, items: Iterable[Any]):
+        """
+        Queue updates, sending every full frame right away.
+
+        Args:
+            items (Iterable[Any]): The JSON-serializable updates.
+        """
+        self._pending.extend(items)
+        if len(self._pending) >= self.max_items:
+            async with self._lock:
+                while len(self._pending) >= self.max_items:
+                    await self._send_frame()
+        if self._pending and self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.max_delay, self._flush_later
+            )
+
+    async def flush(self):
+        """
+        Send every pending update.
+        """
+        self._cancel_timer()
+        async with self._lock:
+            while self._pending:
+                await self._send_frame()
+
+    async def close(self):
+        """
+        Drop the pending updates of a disconnected client.
+        """
+        self._cancel_timer()
+        self._pending.clear()
+
+    async def _send_frame(self):
+        """
+        Send the oldest pending updates as one frame.
+        """
+        items = self._pending[: self.max_items]
+        del self._pending[: self.max_items]
+        await self.websocket.send_json({"type": BATCH_FRAME_TYPE, "items": items})
+
+    def _flush_later(self):
+        """
+        Flush the pending updates once the time window is over.
+        """
+        self._timer = None
+        self._flush_task = asyncio.ensure_future(self._flush_safely())
+
+    async def _flush_safely(self):
+        """
+        Flush from the timer, where nobody awaits the result.
+        """
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Error sending batch frame to client: {e}")
+
+    def _cancel_timer(self):
+        """
+        Cancel the pending time window, if any.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+
+class ClientFraming:
+    """
+    Send the messages of a WebSocket client according to its framing options.
+    """
+
+    def __init__(self, websocket: WebSocket, options: Optional[FramingOptions] = None):
+        """
+        Initialize the client framing.
+
+        Args:
+            websocket (WebSocket): WebSocket instance.
+            options (Optional[FramingOptions]): Options chosen by the client.
+        """
+        self.websocket = websocket
+        self.options = options or FramingOptions()
+        self.coalescer = self._build_coalescer()
+
+    def _build_coalescer(self) -> Optional[FrameCoalescer]:
+        """
+        Create the coalescer of the batch mode.
+
+        Returns:
+            Optional[FrameCoalescer]: The coalescer, None in legacy mode.
+        """
+        if self.options.mode != "batch":
+            return None
+        return FrameCoalescer(
+            self.websocket,
+            self.options.batch_size,
+            self.options.flush_interval_ms / 1000,
+        )
+
+    async def configure(self, options: FramingOptions):
+        """
+        Switch to new framing options, sending the pending updates first.
+
+        Args:
+            options (FramingOptions): Options chosen by the client.
+        """
+        if self.coalescer:
+            await self.coalescer.flush()
+        self.options = options
+        self.coalescer = self._build_coalescer()
+
+    async def send_update(self, message: dict):
+        """
+        Send a verbatim update broadcast to every client.
+
+        Args:
+            message (dict): The update to send.
+        """
+        if self.coalescer:
+            await self.coalescer.add(message)
+        else:
+            await self.websocket.send_json(message)
+
+    async def send_verbatims(self, verbatims: List[Verbatim]):
+        """
+        Send the verbatims created or rerun by a client request, after its
+        acknowledgement.
+
+        Args:
+            verbatims (List[Verbatim]): The verbatims to send.
+        """
+        if self.options.summary_only:
+            return
+        if self.coalescer:
+            await self.coalescer.add_many(
+                verbatim.model_dump(mode="json") for verbatim in verbatims
+            )
+            await self.coalescer.flush()
+            return
+        # Legacy framing: one JSON-encoded string per verbatim
+        for verbatim in verbatims:
+            await self.websocket.send_json(verbatim.model_dump_json())
+
+    async def close(self):
+        """
+        Drop the pending updates of a disconnected client.
+        """
+        if self.coalescer:
+            await self.coalescer.close()
@@ -0,0 +1,235 @@
+import string
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+from numpy.dtypes import StringDType
+from llm4quality_api.config.config import Config
+
+# Rules of the pre-filter, in order of precedence
+RULES = ("header", "punctuation", "placeholder", "numeric", "too_short", "language")
+
+# Modes of the pre-filter: store the filtered lines as classified with an
+# empty result, drop them, or classify every line
+MODES = ("short_circuit", "skip", "off")
+
+PUNCTUATION = string.punctuation + "«»“”‘’…–—•·"
+
+# Translation tables applied to every line at once
+_REMOVE_PUNCTUATION = str.maketrans("", "", PUNCTUATION + string.whitespace)
+_REMOVE_NUMBERS = str.maketrans(
+    "", "", PUNCTUATION + string.whitespace + string.digits
+)
+
+# Lines longer than this are never only punctuation, numbers or a placeholder
+SHORT_LINE_LENGTH = 32
+
+# Lines longer than this are scanned apart, so they do not widen the
+# fixed-width array the other lines are scanned in
+LONG_LINE_LENGTH = 200
+
+# Characters separating the words of a line, besides spaces
+WORD_SEPARATORS = ",.;:!?'’\"()/-"
+
+# Frequent words telling French verbatims apart from other languages
+FRENCH_WORDS = (
+    "le", "les", "des", "du", "et", "est", "une", "pour", "pas", "que", "qui",
+    "dans", "très", "avec", "sur", "je", "nous", "il", "elle", "mais", "été",
+)
+FOREIGN_WORDS = (
+    "the", "and", "was", "were", "with", "very", "this", "that", "have", "staff",
+    "el", "los", "las", "muy", "pero", "por", "und", "der", "die", "das", "nicht",
+    "ist", "mit", "sehr",
+)
+
+
+def parse_list(value: str) -> List[str]:
+    """
+    Parse a comma-separated configuration value.
+
+    Args:
+        value (str): The value, e.g. "ras,n/a".
+
+    Returns:
+        List[str]: The lowercase items.
+    """
+    return [item.strip().lower() for item in value.split(",") if item.strip()]
+
+
+def check_mode(mode: str) -> str:
+    """
+    Check a pre-filter mode.
+
+    Args:
+        mode (str): The mode, e.g. Config.PREFILTER_MODE.
+
+    Returns:
+        str: The mode.
+
+    Raises:
+        ValueError: If the mode does not exist.
+    """
+    if mode not in MODES:
+        raise ValueError(
+            f"Invalid pre-filter mode: {mode!r}, expected one of {', '.join(MODES)}"
+        )
+    return mode
+
+
+# Fail at startup rather than silently dropping the filtered lines
+check_mode(Config.PREFILTER_MODE)
+
+
+class Prefilter:
+    """
+    Recognize the lines of an upload that do not need an LLM classification.
+
+    Every rule is evaluated on all the lines at once with NumPy string
+    operations, and each filtered line is attributed to the first rule it
+    matches, in the order of RULES. The lines are held in a variable-width
+    string array, so the memory and the work grow with the total size of the
+    upload and not with its longest line.
+    """
+
+    def __init__(
+        self,
+        rules: Iterable[str] = RULES,
+        min_length: int = 3,
+        placeholders: Iterable[str] = (),
+        headers: Iterable[str] = (),
+    ):
+        """
+        Initialize the pre-filter.
+
+        Args:
+            rules (Iterable[str]): Rules to apply, among RULES.
+            min_length (int): Minimum number of characters, punctuation and
+                spaces excluded, of a line to classify.
+            placeholders (Iterable[str]): Lowercase answers meaning "nothing
+                to report", e.g. "ras" or "n/a".
+            headers (Iterable[str]): Lowercase column names of a header row.
+
+        Raises:
+            ValueError: If a rule does not exist.
+        """
+        rules = set(rules)
+        unknown = rules - set(RULES)
+        if unknown:
+            raise ValueError(f"Invalid pre-filter rule(s): {', '.join(sorted(unknown))}")
+        self.rules = [rule for rule in RULES if rule in rules]
+        self.min_length = min_length
+        self.placeholders = list(placeholders)
+        self.headers = list(headers)
+
+    def classify(self, lines: List[str], header: bool = True) -> np.ndarray:
+        """
+        Find the rule filtering each line.
+
+        Args:
+            lines (List[str]): The lines of the upload.
+            header (bool): False if the first line cannot be a header row,
+                e.g. in the middle of an upload.
+
+        Returns:
+            np.ndarray: The name of the rule filtering each line, "" for the
+                lines to classify.
+        """
+        if not lines or not self.rules:
+            return np.full(len(lines), "", dtype=str)
+
+        text = np.strings.lower(np.strings.strip(np.array(lines, dtype=StringDType())))
+        # Character counts without punctuation and numbers, only computed for
+        # short lines since translate is not vectorized by NumPy
+        letters = np.strings.str_len(text)
+        non_numeric = letters.copy()
+        short = np.flatnonzero(letters <= SHORT_LINE_LENGTH)
+        short_text = text[short].astype(f"<U{SHORT_LINE_LENGTH}")
+        letters[short] = np.strings.str_len(
+            np.strings.translate(short_text, _REMOVE_PUNCTUATION)
+        )
+        non_numeric[short] = np.strings.str_len(
+            np.strings.translate(short_text, _REMOVE_NUMBERS)
+        )
+        masks = {
+            "punctuation": letters == 0,
+            "placeholder": np.isin(text, self.placeholders),
+            "numeric": (letters > 0) & (non_numeric == 0),
+            "too_short": letters < self.min_length,
+        }
+        if "header" in self.rules:
+            masks["header"] = np.zeros(len(lines), dtype=bool)
+            masks["header"][0] = header and text[0] in self.headers
+        if "language" in self.rules:
+            # Fixed-width strings are faster to scan, as long as the longest
+            # line does not set the width of every other
+            masks["language"] = np.zeros(len(lines), dtype=bool)
+            regular = letters <= LONG_LINE_LENGTH
+            if regular.any():
+                width = max(int(letters[regular].max()), 1)
+                masks["language"][regular] = self.foreign_language(
+                    text[regular].astype(f"<U{width}")
+                )
+            if not regular.all():
+                masks["language"][~regular] = self.foreign_language(text[~regular])
+
+        return np.select(
+            [masks[rule] for rule in self.rules], list(self.rules), default=""
+        )
+
+    @staticmethod
+    def foreign_language(text: np.ndarray) -> np.ndarray:
+        """
+        Detect the lines written in another language than French, from the
+        frequent words they contain.
+
+        Args:
+            text (np.ndarray): The lowercase lines, of fixed or variable width.
+
+        Returns:
+            np.ndarray: True for the lines in another language.
+        """
+        words = text
+        for separator in WORD_SEPARATORS:
+            words = np.strings.replace(words, separator, " ")
+        words = np.strings.add(np.strings.add(" ", words), " ")
+        french = sum(np.strings.count(words, f" {word} ") for word in FRENCH_WORDS)
+        foreign = sum(np.strings.count(words, f" {word} ") for word in FOREIGN_WORDS)
+        return (foreign >= 2) & (foreign > french)
+
+    def split(
+        self, lines: List[str], header: bool = True
+    ) -> Tuple[List[int], Dict[str, List[int]]]:
+        """
+        Separate the lines to classify from the filtered ones.
+
+        Args:
+            lines (List[str]): The lines of the upload.
+            header (bool): False if the first line cannot be a header row.
+
+        Returns:
+            Tuple[List[int], Dict[str, List[int]]]: The indexes of the lines
+                to classify, and the indexes of the filtered lines by rule.
+        """
+        kept: List[int] = []
+        filtered: Dict[str, List[int]] = {}
+        for index, rule in enumerate(self.classify(lines, header=header)):
+            if rule:
+                filtered.setdefault(str(rule), []).append(index)
+            else:
+                kept.append(index)
+        return kept, filtered
+
+
+@lru_cache(maxsize=None)
+def get_prefilter() -> Prefilter:
+    """
+    Get the shared Prefilter instance, configured from the environment.
+
+    Returns:
+        Prefilter: The Prefilter instance.
+    """
+    return Prefilter(
+        rules=parse_list(Config.PREFILTER_RULES),
+        min_length=Config.PREFILTER_MIN_LENGTH,
+        placeholders=parse_list(Config.PREFILTER_PLACEHOLDERS),
+        headers=parse_list(Config.PREFILTER_HEADERS),
+    )
@@ -1,26 +1,143 @@
+import asyncio
 import base64
+from bson import ObjectId
+from collections import Counter
+from typing import List, Optional
 from fastapi import WebSocket
 from llm4quality_api.models.models import Verbatim, Status
-from llm4quality_api.controllers.verbatim_controller import VerbatimController
-from llm4quality_api.utils.broker import publish_message
+from llm4quality_api.controllers.verbatim_controller import get_verbatim_controller
+from llm4quality_api.controllers.upload_controller import get_upload_controller
+from llm4quality_api.services.admission import get_admission_control
+from llm4quality_api.services.framing import ClientFraming
+from llm4quality_api.services.prefilter import get_prefilter
+from llm4quality_api.config.config import Config
+from llm4quality_api.utils.broker import publish_messages
 from llm4quality_api.utils.logger import Logger
+from llm4quality_api.utils.metrics import get_prefilter_counters
 
 
 # Logger instance
 logger = Logger.get_instance().get_logger()
 
-# Controller instance
-controller = VerbatimController()
 
+async def ingest_lines(
+    lines: List[str], year: int, batch_id: str, rows: Optional[List[int]] = None
+) -> dict:
+    """
+    Pre-filter, insert and publish CSV lines.
+
+    With row numbers, the rows already inserted are skipped, so re-sent
+    lines never cost additional classifications.
+
+    Args:
+        lines (List[str]): The non-empty lines.
+        year (int): Year associated with the verbatims.
+        batch_id (str): Identifier of the upload the lines come from.
+        rows (Optional[List[int]]): Row numbers of the lines in a resumable upload.
 
-async def handle_csv_action(websocket: WebSocket, csv_file: str, year: int):
+    Returns:
+        dict: -dispatched: The verbatims published to the workers.
+                -deferred: The verbatims kept pending by the admission control.
+                -prefiltered: The verbatims completed by the pre-filter.
+                -prefilter_counts: The lines filtered, by rule.
+                -duplicate_count: The rows already inserted.
+    """
+    controller = get_verbatim_controller()
+    admission = get_admission_control()
+
+    duplicate_count = 0
+    if rows is not None:
+        existing = await controller.find_existing_rows(batch_id, rows, year)
+        if existing:
+            kept = [index for index, row in enumerate(rows) if row not in existing]
+            duplicate_count = len(lines) - len(kept)
+            lines = [lines[index] for index in kept]
+            rows = [rows[index] for index in kept]
+
+    # Keep the trivial lines away from the workers
+    kept, filtered = list(range(len(lines))), {}
+    if Config.PREFILTER_MODE != "off":
+        # Off the event loop, large uploads take a noticeable time
+        # Only the first row of an upload can be its header
+        header = rows is None or (bool(rows) and rows[0] == 0)
+        kept, filtered = await asyncio.to_thread(
+            get_prefilter().split, lines, header
+        )
+    prefilter_counts = {rule: len(indexes) for rule, indexes in filtered.items()}
+    counters = get_prefilter_counters()
+    for rule, count in prefilter_counts.items():
+        counters.increment(rule, count)
+    counters.increment("classified", len(kept))
+    if prefilter_counts:
+        logger.info(f"Pre-filter ({Config.PREFILTER_MODE}): {prefilter_counts}")
+
+    def select(indexes: List[int]) -> dict:
+        """Select the lines, and their rows, to create verbatims from."""
+        return {
+            "lines": [lines[index] for index in indexes],
+            "rows": [rows[index] for index in indexes] if rows is not None else None,
+        }
+
+    prefiltered = []
+    if Config.PREFILTER_MODE == "short_circuit":
+        for rule, indexes in filtered.items():
+            prefiltered += await controller.create_verbatims(
+                year=year, batch_id=batch_id, prefilter_rule=rule, **select(indexes)
+            )
+
+    # Only dispatch what the workers queue can take, keep the rest pending
+    admitted = await admission.admit(len(kept))
+    dispatched = await controller.create_verbatims(
+        year=year, batch_id=batch_id, **select(kept[:admitted])
+    )
+    deferred = await controller.create_verbatims(
+        year=year, batch_id=batch_id, deferred=True, **select(kept[admitted:])
+    )
+
+    logger.info(f"Publishing {len(dispatched)} verbatims to workers queue")
+    # Publish each verbatim as a job to RabbitMQ
+    publish_messages(
+        "worker_requests", [verbatim.model_dump_json() for verbatim in dispatched]
+    )
+    return {
+        "dispatched": dispatched,
+        "deferred": deferred,
+        "prefiltered": prefiltered,
+        "prefilter_counts": prefilter_counts,
+        "duplicate_count": duplicate_count,
+    }
+
+
+async def handle_csv_action(
+    websocket: WebSocket,
+    csv_file: str,
+    year: int,
+    framing: Optional[ClientFraming] = None,
+    upload_key: Optional[str] = None,
+    offset: int = 0,
+    owner: Optional[str] = None,
+):
     """
     Handle CSV action: process CSV content and publish jobs to RabbitMQ.
 
+    With an upload key, the upload is resumable: its rows are processed in
+    chunks, the offset up to which they are inserted and published is
+    committed after each chunk, and the rows before the committed offset
+    are ignored when the upload is sent again. The key is scoped to the
+    authenticated user, so resumable uploads require one.
+
     Args:
         websocket (WebSocket): WebSocket instance.
         csv_file (bytes): CSV file content as base64 string.
+        year (int): Year associated with the verbatims.
+        framing (Optional[ClientFraming]): Framing chosen by the client.
+        upload_key (Optional[str]): Key of a resumable upload, chosen by the client.
+        offset (int): Row number of the first line of the content in the upload.
+        owner (Optional[str]): Identifier of the authenticated user, if any.
     """
+    framing = framing or ClientFraming(websocket)
+    admission = get_admission_control()
+    uploads = get_upload_controller()
     try:
         # Decode base64 to bytes
         csv_file_bytes = base64.b64decode(csv_file)
@@ -30,32 +147,140 @@ async def handle_csv_action(websocket: WebSocket, csv_file: str, year: int):
         lines = csv_content.splitlines()
 
         logger.info(f"Processing CSV with {len(lines)} lines")
-        # Remove empty lines and header if needed
-        lines = [line for line in lines if line.strip()]
+        # Remove empty lines, numbering the others by their row in the upload
+        numbered = [
+            (offset + index, line) for index, line in enumerate(lines) if line.strip()
+        ]
+        end_offset = offset + len(lines)
 
-        verbatims = await controller.create_verbatims(lines, year)
+        if upload_key:
+            if not owner:
+                raise ValueError("Resumable uploads require an authenticated connection")
+            upload = await uploads.start_upload(owner, upload_key, year)
+            # Rows committed before a disconnection are not processed again
+            numbered = [
+                (row, line) for row, line in numbered if row >= upload["committed_offset"]
+            ]
+            batch_id = upload["_id"]
+            chunk_size = Config.UPLOAD_CHUNK_SIZE
+        else:
+            batch_id = str(ObjectId())
+            chunk_size = max(len(numbered), 1)
 
-        logger.info(f"Publishing {len(verbatims)} verbatims to workers queue")
-        # Publish each verbatim as a job to RabbitMQ
-        for verbatim in verbatims:
-            publish_message("worker_requests", verbatim.model_dump_json())
+        dispatched, deferred, prefiltered = [], [], []
+        prefilter_counts: Counter = Counter()
+        duplicate_count = 0
+        for start in range(0, len(numbered), chunk_size):
+            chunk = numbered[start : start + chunk_size]
+            ingested = await ingest_lines(
+                [line for _, line in chunk],
+                year,
+                batch_id,
+                rows=[row for row, _ in chunk] if upload_key else None,
+            )
+            dispatched += ingested["dispatched"]
+            deferred += ingested["deferred"]
+            prefiltered += ingested["prefiltered"]
+            prefilter_counts.update(ingested["prefilter_counts"])
+            duplicate_count += ingested["duplicate_count"]
+
+            if upload_key:
+                # Every row before the next chunk is now inserted and published
+                next_offset = (
+                    numbered[start + chunk_size][0]
+                    if start + chunk_size < len(numbered)
+                    else end_offset
+                )
+                await uploads.commit_offset(
+                    batch_id,
+                    next_offset,
+                    {
+                        "dispatched": len(ingested["dispatched"]),
+                        "deferred": len(ingested["deferred"]),
+                        "prefiltered": len(ingested["prefiltered"]),
+                        "duplicates": ingested["duplicate_count"],
+                    },
+                )
+                await websocket.send_json(
+                    {
+                        "status": "CSV chunk committed",
+                        "upload_key": upload_key,
+                        "committed_offset": next_offset,
+                    }
+                )
+        if upload_key and not numbered:
+            await uploads.commit_offset(batch_id, end_offset)
+        verbatims = dispatched + deferred + prefiltered
 
-        await websocket.send_json({"status": "CSV processed", "count": len(verbatims)})
-        for verbatim in verbatims:
-            await websocket.send_json(verbatim.model_dump_json())
+        response = {
+            "status": "CSV processed",
+            "count": len(verbatims),
+            "batch_id": batch_id,
+            "dispatched_count": len(dispatched),
+            "deferred_count": len(deferred),
+            "prefiltered_count": sum(prefilter_counts.values()),
+            "prefilter": dict(prefilter_counts),
+            "estimated_completion_seconds": await admission.estimate_completion(),
+        }
+        if upload_key:
+            response["upload_key"] = upload_key
+            response["committed_offset"] = max(end_offset, upload["committed_offset"])
+            response["duplicate_count"] = duplicate_count
+        await websocket.send_json(response)
+        await framing.send_verbatims(verbatims)
     except Exception as e:
         logger.error(f"Error processing CSV action for client {websocket.client} Error trace:  {str(e)}")
         await websocket.send_json({"status": "error", "message": str(e)})
 
 
-async def handle_rerun_action(websocket: WebSocket, verbatims: list[dict]):
+async def handle_upload_status_action(
+    websocket: WebSocket, upload_key: str, owner: Optional[str] = None
+):
+    """
+    Handle UPLOAD_STATUS action: send the offset a resumable upload can be
+    resumed from.
+
+    Args:
+        websocket (WebSocket): WebSocket instance.
+        upload_key (str): Key of the upload.
+        owner (Optional[str]): Identifier of the authenticated user, if any.
+    """
+    try:
+        if not owner:
+            raise ValueError("Resumable uploads require an authenticated connection")
+        upload = await get_upload_controller().find_upload(owner, upload_key)
+        response = {
+            "status": "UPLOAD_STATUS",
+            "upload_key": upload_key,
+            "found": upload is not None,
+            "committed_offset": upload["committed_offset"] if upload else 0,
+        }
+        if upload:
+            response["year"] = upload["year"]
+            response["counts"] = upload.get("counts", {})
+            response["updated_at"] = upload["updated_at"].isoformat()
+        await websocket.send_json(response)
+    except Exception as e:
+        logger.error(f"Error processing UPLOAD_STATUS action: {e}")
+        await websocket.send_json({"status": "error", "message": str(e)})
+
+
+async def handle_rerun_action(
+    websocket: WebSocket,
+    verbatims: list[dict],
+    framing: Optional[ClientFraming] = None,
+):
     """
     Handle RERUN action: publish each verbatim as a job to RabbitMQ.
 
     Args:
         websocket (WebSocket): WebSocket instance.
         verbatims (list): List of verbatim dictionaries.
+        framing (Optional[ClientFraming]): Framing chosen by the client.
     """
+    framing = framing or ClientFraming(websocket)
+    controller = get_verbatim_controller()
+    admission = get_admission_control()
     try:
         existing_verbatims = []
         non_existing_verbatims = []
@@ -76,36 +301,43 @@ async def handle_rerun_action(websocket: WebSocket, verbatims: list[dict]):
                 )
                 non_existing_verbatims.append(verbatim_data)
 
-        # Publish only existing verbatims
-        for verbatim in existing_verbatims:
-            # Update the status to 'RUN' before publishing
-            res = await controller.update_verbatim_status(
-                verbatim_id=verbatim.id, status=Status.RUN, result=None
+        # Publish only existing verbatims, as far as the workers queue can take them
+        admitted = await admission.admit(len(existing_verbatims))
+        dispatched = existing_verbatims[:admitted]
+        deferred = existing_verbatims[admitted:]
+        if dispatched:
+            # Update the status to 'RUN' and restart the delivery cycle before publishing
+            tokens = await controller.mark_dispatched(
+                [verbatim.id for verbatim in dispatched]
+            )
+            logger.info(f"Updated {len(tokens)} verbatims with status {Status.RUN}")
+            for verbatim in dispatched:
+                # The worker echoes the token so older responses can be dropped
+                verbatim.attempt_token = tokens.get(verbatim.id)
+            publish_messages(
+                "worker_requests",
+                [verbatim.model_dump_json() for verbatim in dispatched],
+            )
+        if deferred:
+            await controller.mark_dispatched(
+                [verbatim.id for verbatim in deferred], deferred=True
             )
-            if res.modified_count > 0:
-                logger.info(
-                    f"Updated verbatim {verbatim.id} with status {Status.RUN}"
-                )
-            else:
-                if res.matched_count > 0:
-                    logger.error(f"Nothing to update verbatim {verbatim.id}")
-                else:
-                    logger.error(f"Error verbatim {verbatim.id} not found")
-            publish_message("worker_requests", verbatim.model_dump_json())
 
         # Send the response back to WebSocket
         response = {
             "status": "RERUN initiated",
-            "published_count": len(existing_verbatims),
+            "published_count": len(dispatched),
+            "deferred_count": len(deferred),
             "non_existing_count": len(non_existing_verbatims),
             "non_existing_verbatims": non_existing_verbatims,
+            "estimated_completion_seconds": await admission.estimate_completion(),
         }
         await websocket.send_json(response)
 
         # Send each verbatim to WebSocket
         for verbatim in existing_verbatims:
             verbatim.status = Status.RUN
-            await websocket.send_json(verbatim.model_dump_json())
+        await framing.send_verbatims(existing_verbatims)
     except Exception as e:
         logger.error(f"Error processing RERUN action: {e}")
         await websocket.send_json({"status": "error", "message": str(e)})
@@ -0,0 +1,172 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from llm4quality_api.config.config import Config
+from llm4quality_api.controllers.verbatim_controller import get_verbatim_controller
+from llm4quality_api.controllers.job_controller import get_job_controller
+from llm4quality_api.controllers.evaluation_controller import get_evaluation_controller
+from llm4quality_api.models.models import Status
+from llm4quality_api.services.consistency import evaluate_consistency
+from llm4quality_api.utils.logger import Logger
+
+# Logger instance
+logger = Logger.get_instance().get_logger()
+
+
+@asynccontextmanager
+async def job_heartbeat(job_id: str, interval: float = Config.JOB_HEARTBEAT_SECONDS):
+    """
+    Keep a job marked as alive while it runs, including during its long
+    steps, so it is not taken for the job of a stopped process.
+
+    Args:
+        job_id (str): ID of the running job.
+        interval (float): Seconds between two heartbeats.
+    """
+
+    async def beat():
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await get_job_controller().heartbeat(job_id)
+            except Exception as e:
+                logger.warning(f"Error recording heartbeat of job {job_id}: {e}")
+
+    task = asyncio.create_task(beat())
+    try:
+        yield
+    finally:
+        task.cancel()
+
+
+async def run_delete_job(
+    job_id: str,
+    query: dict,
+    chunk_size: int = Config.DELETE_CHUNK_SIZE,
+    throttle: float = Config.DELETE_THROTTLE_SECONDS,
+):
+    """
+    Delete every verbatim matching a query in bounded, throttled chunks.
+
+    Args:
+        job_id (str): ID of the job tracking the deletion.
+        query (dict): MongoDB query filter of the verbatims to delete.
+        chunk_size (int): Maximum number of verbatims deleted per chunk.
+        throttle (float): Pause in seconds between two chunks.
+    """
+    controller = get_verbatim_controller()
+    job_controller = get_job_controller()
+    async with job_heartbeat(job_id):
+        try:
+            total = await controller.count_verbatims(query)
+            await job_controller.update_progress(job_id, 0, total=total)
+            logger.info(f"Delete job {job_id} started for {total} verbatims")
+
+            deleted = 0
+            while True:
+                deleted_count = await controller.delete_verbatims_chunk(query, chunk_size)
+                if deleted_count == 0:
+                    break
+                deleted += deleted_count
+                await job_controller.update_progress(job_id, deleted)
+                # Leave room for the other requests between two chunks
+                await asyncio.sleep(throttle)
+
+            await job_controller.complete_job(job_id, {"deleted_count": deleted})
+            logger.info(f"Delete job {job_id} completed: {deleted} verbatims deleted")
+        except Exception as e:
+            logger.error(f"Error running delete job {job_id}: {e}")
+            await job_controller.fail_job(job_id, str(e))
+
+
+async def run_archive_job(
+    job_id: str,
+    year: int,
+    chunk_size: int = Config.ARCHIVE_CHUNK_SIZE,
+    throttle: float = Config.ARCHIVE_THROTTLE_SECONDS,
+):
+    """
+    Move the verbatims of a year to the archive collection in bounded,
+    throttled chunks.
+
+    The year is marked as archiving before the first chunk is moved, so its
+    queries read both collections while the move is in progress.
+
+    Args:
+        job_id (str): ID of the job tracking the move.
+        year (int): The year to archive.
+        chunk_size (int): Maximum number of verbatims moved per chunk.
+        throttle (float): Pause in seconds between two chunks.
+    """
+    controller = get_verbatim_controller()
+    job_controller = get_job_controller()
+    async with job_heartbeat(job_id):
+        try:
+            running = await controller.count_verbatims(
+                {"year": year, "status": Status.RUN.value}
+            )
+            if running:
+                raise ValueError(f"{running} verbatims of {year} are still running")
+
+            total = await controller.count_verbatims({"year": year})
+            await job_controller.update_progress(job_id, 0, total=total)
+            await controller.set_tier_state(
+                year, "ARCHIVING", started_at=datetime.now(timezone.utc)
+            )
+            logger.info(f"Archive job {job_id} started for {total} verbatims of {year}")
+
+            moved = 0
+            while True:
+                moved_count = await controller.archive_chunk(year, chunk_size)
+                if moved_count == 0:
+                    break
+                moved += moved_count
+                await job_controller.update_progress(job_id, moved)
+                # Leave room for the other requests between two chunks
+                await asyncio.sleep(throttle)
+
+            counts = await controller.get_collection_count({"year": year})
+            await controller.set_tier_state(
+                year, "ARCHIVED", archived_at=datetime.now(timezone.utc), counts=counts
+            )
+            await job_controller.complete_job(job_id, {"archived_count": moved})
+            logger.info(f"Archive job {job_id} completed: {moved} verbatims of {year} archived")
+        except Exception as e:
+            logger.error(f"Error running archive job {job_id}: {e}")
+            await job_controller.fail_job(job_id, str(e))
+
+
+async def run_evaluation_job(job_id: str, year: int):
+    """
+    Evaluate the consistency of the classifications of a year across reruns
+    and cache the report.
+
+    Args:
+        job_id (str): ID of the job tracking the evaluation.
+        year (int): Year of the verbatims to evaluate.
+    """
+    controller = get_verbatim_controller()
+    job_controller = get_job_controller()
+    async with job_heartbeat(job_id):
+        try:
+            histories = await controller.find_result_histories(year)
+            await job_controller.update_progress(job_id, 0, total=len(histories))
+            logger.info(f"Evaluation job {job_id} started for {len(histories)} verbatims of {year}")
+
+            # Flattening the histories and the statistics are CPU-bound, kept
+            # off the event loop like the read of the histories
+            report = await asyncio.to_thread(evaluate_consistency, histories)
+            await get_evaluation_controller().save_evaluation(year, report, job_id)
+
+            await job_controller.update_progress(job_id, len(histories))
+            await job_controller.complete_job(
+                job_id,
+                {
+                    "verbatims": report["verbatims"],
+                    "full_agreement_rate": report["full_agreement_rate"],
+                },
+            )
+            logger.info(f"Evaluation job {job_id} completed for {year}")
+        except Exception as e:
+            logger.error(f"Error running evaluation job {job_id}: {e}")
+            await job_controller.fail_job(job_id, str(e))
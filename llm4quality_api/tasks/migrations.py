@@ -0,0 +1,96 @@
+import argparse
+import asyncio
+from pymongo import ASCENDING, UpdateOne
+from llm4quality_api.controllers.verbatim_controller import (
+    VerbatimController,
+    get_verbatim_controller,
+)
+from llm4quality_api.models.codebook import Codebook, COMPACT_KEY
+from llm4quality_api.utils.logger import Logger
+
+# Logger instance
+logger = Logger.get_instance().get_logger()
+
+
+async def migrate_results(
+    controller: VerbatimController, compact: bool = True, batch_size: int = 500
+) -> int:
+    """
+    Convert the stored results of existing verbatims to or from their compact
+    representation.
+
+    Documents are converted in batches, and each update only applies if the
+    result was not modified in the meantime, so the migration can run while
+    the API is serving.
+
+    Args:
+        controller (VerbatimController): Controller of the verbatims collections.
+        compact (bool): True to encode the results, False to decode them.
+        batch_size (int): Number of documents converted per batch.
+
+    Returns:
+        int: Number of documents converted.
+    """
+    query = {
+        "result": {"$type": "object"},
+        f"result.{COMPACT_KEY}": {"$exists": not compact},
+    }
+    codebook = Codebook.get_instance()
+    codebook.refresh()
+
+    converted = 0
+    # The archived verbatims are converted too
+    for collection in controller.tier_collections(query):
+        last_id = None
+        while True:
+            batch_query = dict(query, _id={"$gt": last_id}) if last_id else query
+            documents = list(
+                collection.find(batch_query, {"result": 1})
+                .sort("_id", ASCENDING)
+                .limit(batch_size)
+            )
+            if not documents:
+                break
+            last_id = documents[-1]["_id"]
+
+            operations = [
+                UpdateOne(
+                    {"_id": document["_id"], "result": document["result"]},
+                    {
+                        "$set": {
+                            "result": (
+                                controller.encode_result(document["result"])
+                                if compact
+                                else codebook.decode(document["result"])
+                            )
+                        }
+                    },
+                )
+                for document in documents
+            ]
+            converted += collection.bulk_write(
+                operations, ordered=False
+            ).modified_count
+            logger.info(f"Result migration: {converted} verbatims converted")
+
+    return converted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert stored verbatim results to or from the compact representation."
+    )
+    parser.add_argument(
+        "--decode",
+        action="store_true",
+        help="Convert compact results back to the full representation.",
+    )
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    count = asyncio.run(
+        migrate_results(
+            get_verbatim_controller(), compact=not args.decode, batch_size=args.batch_size
+        )
+    )
+    logger.info(f"Result migration completed: {count} verbatims converted")
@@ -0,0 +1,217 @@
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from llm4quality_api.config.config import Config
+from llm4quality_api.controllers.verbatim_controller import (
+    VerbatimController,
+    get_verbatim_controller,
+)
+from llm4quality_api.controllers.job_controller import get_job_controller
+from llm4quality_api.controllers.lease_controller import get_lease_controller
+from llm4quality_api.services.admission import AdmissionControl, get_admission_control
+from llm4quality_api.models.models import Verbatim, Status
+from llm4quality_api.tasks.verbatims import broadcast_updates
+from llm4quality_api.utils.broker import publish_messages
+from llm4quality_api.utils.logger import Logger
+
+# Logger instance
+logger = Logger.get_instance().get_logger()
+
+
+class DispatchScheduler:
+    """
+    Periodically redispatch verbatims whose worker response never arrived.
+
+    Verbatims stuck in RUN past their delivery deadline are published again
+    with an exponentially growing deadline, and marked ERROR once the maximum
+    number of attempts is reached. Verbatims deferred by the admission control
+    are dispatched as the workers queue drains. The background jobs of a
+    stopped process are marked as failed. Only the process holding the scheduler
+    lease sweeps, so the work is done once however many processes run.
+    """
+
+    LEASE_NAME = "dispatch_scheduler"
+
+    def __init__(
+        self,
+        controller: Optional[VerbatimController] = None,
+        admission: Optional[AdmissionControl] = None,
+        interval: float = Config.DISPATCH_SWEEP_INTERVAL_SECONDS,
+        batch_size: int = Config.DISPATCH_SWEEP_BATCH_SIZE,
+        max_attempts: int = Config.DISPATCH_MAX_ATTEMPTS,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            controller (Optional[VerbatimController]): Controller to use.
+            admission (Optional[AdmissionControl]): Admission control to use.
+            interval (float): Seconds between two sweeps.
+            batch_size (int): Maximum number of verbatims handled per sweep.
+            max_attempts (int): Attempts after which a verbatim is marked ERROR.
+        """
+        self.controller = controller or get_verbatim_controller()
+        self.admission = admission or get_admission_control()
+        self.leases = get_lease_controller()
+        self.jobs = get_job_controller()
+        self.owner = Config.INSTANCE_ID
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self._task: Optional[asyncio.Task] = None
+
+    async def dispatch_messages(self, docs: List[dict], claimed: List[str]) -> List[str]:
+        """
+        Build the worker requests of the claimed verbatims, with the dispatch
+        token set by their claim.
+
+        Args:
+            docs (List[dict]): The documents read before the claim.
+            claimed (List[str]): IDs of the claimed verbatims.
+
+        Returns:
+            List[str]: The messages to publish.
+        """
+        if not claimed:
+            return []
+        tokens = await self.controller.get_attempt_tokens(claimed)
+        return [
+            Verbatim.from_dict(
+                {**doc, "attempt_token": tokens[str(doc["_id"])]}
+            ).model_dump_json()
+            for doc in docs
+            if str(doc["_id"]) in tokens
+        ]
+
+    async def sweep(self, now: Optional[datetime] = None) -> dict:
+        """
+        Redispatch or fail one batch of expired verbatims.
+
+        Args:
+            now (Optional[datetime]): Reference time (default is the current time).
+
+        Returns:
+            dict: -redispatched: Number of verbatims published again.
+                    -failed: Number of verbatims marked ERROR.
+        """
+        now = now or datetime.now(timezone.utc)
+        expired = await self.controller.find_expired_dispatches(
+            now, limit=self.batch_size
+        )
+
+        groups = defaultdict(list)
+        for doc in expired:
+            groups[doc.get("attempts", 1)].append(doc)
+
+        redispatched, failed = 0, 0
+        for attempts, docs in groups.items():
+            ids = [str(doc["_id"]) for doc in docs]
+            if attempts >= self.max_attempts:
+                claimed = await self.controller.claim_expired_dispatches(
+                    ids, attempts, now, Status.ERROR
+                )
+                await broadcast_updates(
+                    [
+                        {"id": verbatim_id, "status": Status.ERROR.value, "result": None}
+                        for verbatim_id in claimed
+                    ]
+                )
+                failed += len(claimed)
+            else:
+                claimed = await self.controller.claim_expired_dispatches(
+                    ids, attempts, now, Status.RUN
+                )
+                messages = await self.dispatch_messages(docs, claimed)
+                await asyncio.to_thread(publish_messages, "worker_requests", messages)
+                redispatched += len(messages)
+
+        if redispatched or failed:
+            logger.info(
+                f"Dispatch sweep: {redispatched} verbatims redispatched, {failed} marked {Status.ERROR.value}"
+            )
+        return {"redispatched": redispatched, "failed": failed}
+
+    async def release_deferred(self) -> int:
+        """
+        Dispatch deferred verbatims, oldest first, within the queue capacity.
+
+        Returns:
+            int: Number of verbatims dispatched.
+        """
+        released = 0
+        while True:
+            capacity = await self.admission.capacity()
+            limit = self.batch_size if capacity is None else min(capacity, self.batch_size)
+            if limit <= 0:
+                break
+            docs = await self.controller.find_deferred_verbatims(limit=limit)
+            if not docs:
+                break
+            claimed = await self.controller.claim_deferred_verbatims(
+                [str(doc["_id"]) for doc in docs]
+            )
+            messages = await self.dispatch_messages(docs, claimed)
+            await asyncio.to_thread(publish_messages, "worker_requests", messages)
+            self.admission.reserve(len(messages))
+            released += len(messages)
+            if len(docs) < limit:
+                break
+
+        if released:
+            logger.info(f"Dispatch sweep: {released} deferred verbatims dispatched")
+        return released
+
+    async def fail_orphaned_jobs(self, now: Optional[datetime] = None) -> int:
+        """
+        Mark as failed the background jobs left unfinished by a stopped
+        process, which stopped recording their heartbeat.
+
+        Args:
+            now (Optional[datetime]): Reference time (default is the current time).
+
+        Returns:
+            int: Number of jobs marked as failed.
+        """
+        now = now or datetime.now(timezone.utc)
+        failed = await self.jobs.fail_orphaned_jobs(
+            now - timedelta(seconds=Config.JOB_STALE_SECONDS)
+        )
+        if failed:
+            logger.warning(f"Dispatch sweep: {failed} orphaned jobs marked as failed")
+        return failed
+
+    async def run(self):
+        """
+        Sweep expired verbatims forever, every `interval` seconds, while this
+        process holds the scheduler lease.
+        """
+        ttl = max(Config.LEADER_LEASE_SECONDS, 3 * self.interval)
+        while True:
+            try:
+                if await self.leases.acquire(self.LEASE_NAME, self.owner, ttl):
+                    await self.sweep()
+                    await self.release_deferred()
+                    await self.fail_orphaned_jobs()
+            except Exception as e:
+                logger.error(f"Error during dispatch sweep: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """
+        Start the sweep loop as a background task of the running event loop.
+        """
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """
+        Stop the sweep loop.
+        """
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            await self.leases.release(self.LEASE_NAME, self.owner)
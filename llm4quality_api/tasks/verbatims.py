@@ -1,15 +1,104 @@
 import asyncio
 import json
+from datetime import datetime
+from typing import List, Optional
+from llm4quality_api.config.config import Config
 from llm4quality_api.models.models import Result, Status
-from llm4quality_api.controllers.verbatim_controller import VerbatimController
+from llm4quality_api.controllers.verbatim_controller import get_verbatim_controller
+from llm4quality_api.utils.broker import publish_broadcast_on_channel, publish_broadcasts
 from llm4quality_api.utils.logger import Logger
-from llm4quality_api.routes.routes import connected_clients
+from llm4quality_api.utils.metrics import get_response_counters
+from llm4quality_api.routes.routes import client_framing, connected_clients
 
 # Logger instance
 logger = Logger.get_instance().get_logger()
 
-# Controller instance
-controller = VerbatimController()
+# Event loop serving the WebSocket connections of this process
+main_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def set_main_loop(loop: asyncio.AbstractEventLoop):
+    """
+    Register the event loop owning the WebSocket connections of this process.
+
+    Args:
+        loop (asyncio.AbstractEventLoop): The running event loop.
+    """
+    global main_loop
+    main_loop = loop
+
+
+async def broadcast_updates(messages: List[dict]):
+    """
+    Publish verbatim updates to the WebSocket clients of every API process,
+    over a single RabbitMQ connection.
+
+    Args:
+        messages (List[dict]): The updates to send.
+    """
+    await asyncio.to_thread(publish_broadcasts, Config.BROADCAST_EXCHANGE, messages)
+
+
+async def notify_local_clients(message: dict):
+    """
+    Send a verbatim update to every WebSocket client connected to this process.
+
+    Args:
+        message (dict): The update to send.
+    """
+    for websocket in list(connected_clients):
+        try:
+            framing = client_framing.get(websocket)
+            if framing:
+                await framing.send_update(message)
+            else:
+                await websocket.send_json(message)
+        except Exception as e:
+            logger.error(f"Error sending message to client: {e}")
+            connected_clients.discard(websocket)
+            client_framing.pop(websocket, None)
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    """
+    Parse an ISO 8601 timestamp reported by a worker.
+
+    Args:
+        value: The reported value.
+
+    Returns:
+        Optional[datetime]: The timestamp, or None if missing or invalid.
+    """
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        logger.error(f"Invalid worker timestamp: {value}")
+        return None
+
+
+async def classify_dropped_response(
+    verbatim_id: str, attempt_token: Optional[int]
+) -> str:
+    """
+    Find out why a worker response did not match its verbatim.
+
+    Args:
+        verbatim_id (str): ID of the verbatim answered.
+        attempt_token (Optional[int]): Token of the dispatch answered.
+
+    Returns:
+        str: "unknown" if the verbatim no longer exists, "stale" if it was
+            dispatched again since, "duplicate" if it was already completed.
+    """
+    state = await get_verbatim_controller().find_attempt_state(verbatim_id)
+    if state is None:
+        return "unknown"
+    if attempt_token is not None and state.get("attempt_token") != attempt_token:
+        return "stale"
+    return "duplicate"
+
 
 def handle_worker_response(channel, method, properties, body):
     """
@@ -23,6 +112,8 @@ def handle_worker_response(channel, method, properties, body):
     """
 
     async def process_response():
+        controller = get_verbatim_controller()
+        counters = get_response_counters()
         try:
             logger.info(f"Received worker body : {body}")
             # Decode the RabbitMQ message
@@ -36,28 +127,30 @@ def handle_worker_response(channel, method, properties, body):
             # Get the Status from the verbatim
             verbatim_status = Status(message["status"])
 
+            # Time the worker started processing the verbatim, if it reports it
+            worker_started_at = parse_timestamp(message.get("started_at"))
+
+            # Token of the dispatch answered, missing from older workers
+            attempt_token = message.get("attempt_token")
+
             # Mettre à jour MongoDB avec le nouveau statut et le résultat
             update_success = await controller.update_verbatim_status(
                 verbatim_id=verbatim_id,
                 status=verbatim_status,
                 result=result,  # Passer l'objet Pydantic
+                worker_started_at=worker_started_at,
+                attempt_token=attempt_token,
             )
-            if update_success.modified_count > 0:
-                logger.info(
-                    f"Updated verbatim {verbatim_id} with status {verbatim_status}"
-                )
-            else:
-                if update_success.matched_count > 0:
-                    logger.error(f"Nothing to update verbatim {verbatim_id}")
-                else:
-                    logger.error(f"Error verbatim {verbatim_id} not found")
-            # Notifier tous les clients WebSocket connectés
-            for websocket in connected_clients:
-                try:
-                    await websocket.send_json(message)
-                except Exception as e:
-                    logger.error(f"Error sending message to client: {e}")
-                    connected_clients.remove(websocket)
+            if update_success.matched_count == 0:
+                # Stale or duplicate response: nothing to write nor broadcast
+                reason = await classify_dropped_response(verbatim_id, attempt_token)
+                counters.increment(f"dropped_{reason}")
+                logger.info(f"Dropped {reason} response for verbatim {verbatim_id}")
+                return
+            counters.increment("applied")
+            logger.info(f"Updated verbatim {verbatim_id} with status {verbatim_status}")
+            # Notifier les clients WebSocket connectés à tous les processus
+            publish_broadcast_on_channel(channel, Config.BROADCAST_EXCHANGE, message)
         except Exception as e:
             logger.error(f"Error processing worker response: {e}")
 
@@ -68,3 +161,24 @@ def handle_worker_response(channel, method, properties, body):
         # If an event loop is already running, use ensure_future
         loop = asyncio.get_event_loop()
         loop.create_task(process_response())
+
+
+def handle_broadcast_update(channel, method, properties, body):
+    """
+    Forward a verbatim update broadcast by any API process to the local clients.
+
+    Args:
+        channel: RabbitMQ channel.
+        method: RabbitMQ method frame.
+        properties: RabbitMQ properties.
+        body (bytes): The message body.
+    """
+    try:
+        message = json.loads(body)
+    except json.JSONDecodeError as e:
+        logger.error(f"Invalid broadcast update: {e}")
+        return
+
+    if main_loop is None or main_loop.is_closed():
+        return
+    asyncio.run_coroutine_threadsafe(notify_local_clients(message), main_loop)
@@ -1,8 +1,42 @@
 import pika
 import json
 import time
+import weakref
 from llm4quality_api.config.config import Config
 
+# Fanout exchanges already declared on each open channel
+_declared_exchanges = weakref.WeakKeyDictionary()
+
+
+def check_connection(timeout=Config.HEALTH_CHECK_TIMEOUT_SECONDS):
+    """Check that RabbitMQ is reachable by opening and closing a connection, within a timeout."""
+    connection = pika.BlockingConnection(
+        pika.ConnectionParameters(host=Config.RABBITMQ_HOST, port=Config.RABBITMQ_PORT, credentials=pika.PlainCredentials(Config.RABBITMQ_USERNAME, Config.RABBITMQ_PASSWORD), connection_attempts=1, socket_timeout=timeout, stack_timeout=timeout, blocked_connection_timeout=timeout)
+    )
+    connection.close()
+    return True
+
+
+def get_queue_stats(queue):
+    """Get the number of ready messages and consumers of a RabbitMQ queue."""
+    connection = pika.BlockingConnection(
+        pika.ConnectionParameters(host=Config.RABBITMQ_HOST, port=Config.RABBITMQ_PORT, credentials=pika.PlainCredentials(Config.RABBITMQ_USERNAME, Config.RABBITMQ_PASSWORD))
+    )
+    try:
+        channel = connection.channel()
+        # A passive declaration only inspects the queue, without creating it
+        declared = channel.queue_declare(queue=queue, passive=True)
+        return {
+            "message_count": declared.method.message_count,
+            "consumer_count": declared.method.consumer_count,
+        }
+    except pika.exceptions.ChannelClosedByBroker:
+        # The queue does not exist yet
+        return {"message_count": 0, "consumer_count": 0}
+    finally:
+        if connection.is_open:
+            connection.close()
+
 
 def publish_message(queue, message):
     """Publish a message to RabbitMQ."""
@@ -15,6 +49,71 @@ def publish_message(queue, message):
     connection.close()
 
 
+def publish_messages(queue, messages):
+    """Publish several messages to RabbitMQ over a single connection."""
+    if not messages:
+        return
+    connection = pika.BlockingConnection(
+        pika.ConnectionParameters(host=Config.RABBITMQ_HOST, port=Config.RABBITMQ_PORT, credentials=pika.PlainCredentials(Config.RABBITMQ_USERNAME, Config.RABBITMQ_PASSWORD))
+    )
+    channel = connection.channel()
+    channel.queue_declare(queue=queue, durable=True)
+    for message in messages:
+        channel.basic_publish(exchange="", routing_key=queue, body=json.dumps(message))
+    connection.close()
+
+
+def publish_broadcasts(exchange, messages):
+    """Publish several messages to every process bound to a RabbitMQ fanout exchange, over a single connection."""
+    if not messages:
+        return
+    connection = pika.BlockingConnection(
+        pika.ConnectionParameters(host=Config.RABBITMQ_HOST, port=Config.RABBITMQ_PORT, credentials=pika.PlainCredentials(Config.RABBITMQ_USERNAME, Config.RABBITMQ_PASSWORD))
+    )
+    channel = connection.channel()
+    channel.exchange_declare(exchange=exchange, exchange_type="fanout", durable=True)
+    for message in messages:
+        channel.basic_publish(exchange=exchange, routing_key="", body=json.dumps(message))
+    connection.close()
+
+
+def publish_broadcast_on_channel(channel, exchange, message):
+    """Publish a message to a RabbitMQ fanout exchange on an existing channel."""
+    declared = _declared_exchanges.setdefault(channel, set())
+    if exchange not in declared:
+        channel.exchange_declare(exchange=exchange, exchange_type="fanout", durable=True)
+        declared.add(exchange)
+    channel.basic_publish(exchange=exchange, routing_key="", body=json.dumps(message))
+
+
+def consume_broadcasts(exchange, callback):
+    """
+    Consume every message of a RabbitMQ fanout exchange with retry logic.
+
+    Each call binds its own exclusive queue, so every process receives a copy
+    of each message instead of competing for it.
+    """
+    while True:
+        try:
+            connection = pika.BlockingConnection(
+                pika.ConnectionParameters(host=Config.RABBITMQ_HOST, port=Config.RABBITMQ_PORT, credentials=pika.PlainCredentials(Config.RABBITMQ_USERNAME, Config.RABBITMQ_PASSWORD))
+            )
+            channel = connection.channel()
+            channel.exchange_declare(exchange=exchange, exchange_type="fanout", durable=True)
+            declared = channel.queue_declare(queue="", exclusive=True, auto_delete=True)
+            queue = declared.method.queue
+            channel.queue_bind(exchange=exchange, queue=queue)
+
+            channel.basic_consume(
+                queue=queue, on_message_callback=callback, auto_ack=True
+            )
+            print(f"Connected to RabbitMQ. Listening on {exchange} broadcasts...")
+            channel.start_consuming()
+        except pika.exceptions.AMQPConnectionError:
+            print("RabbitMQ connection failed. Retrying in 5 seconds...")
+            time.sleep(5)
+
+
 def consume_messages(queue, callback):
     """Consume messages from RabbitMQ with retry logic."""
     while True:
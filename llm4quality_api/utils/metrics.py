@@ -0,0 +1,91 @@
+from collections import Counter
+from functools import lru_cache
+from threading import Lock
+from typing import Dict, Iterable, List, Optional
+
+
+def percentiles(
+    values: Iterable[float], ranks: Iterable[float] = (50, 95, 99)
+) -> Dict[str, Optional[float]]:
+    """
+    Compute percentiles with linear interpolation between the closest values.
+
+    Args:
+        values (Iterable[float]): The sample.
+        ranks (Iterable[float]): The percentile ranks to compute, from 0 to 100.
+
+    Returns:
+        Dict[str, Optional[float]]: The percentiles by name (e.g. "p95"), None
+            for an empty sample.
+    """
+    ordered: List[float] = sorted(values)
+    report = {}
+    for rank in ranks:
+        name = f"p{rank:g}"
+        if not ordered:
+            report[name] = None
+            continue
+        position = (len(ordered) - 1) * rank / 100
+        lower = int(position)
+        upper = min(lower + 1, len(ordered) - 1)
+        fraction = position - lower
+        report[name] = round(
+            ordered[lower] + (ordered[upper] - ordered[lower]) * fraction, 3
+        )
+    return report
+
+
+class Counters:
+    """
+    A thread-safe set of named counters, local to the process.
+    """
+
+    def __init__(self):
+        """
+        Initialize the counters.
+        """
+        self._counts: Counter = Counter()
+        self._lock = Lock()
+
+    def increment(self, name: str, value: int = 1):
+        """
+        Increment a counter.
+
+        Args:
+            name (str): Name of the counter.
+            value (int): Amount to add.
+        """
+        with self._lock:
+            self._counts[name] += value
+
+    def snapshot(self) -> Dict[str, int]:
+        """
+        Get the current value of every counter.
+
+        Returns:
+            Dict[str, int]: The counters by name.
+        """
+        with self._lock:
+            return dict(self._counts)
+
+
+@lru_cache(maxsize=None)
+def get_prefilter_counters() -> Counters:
+    """
+    Get the counters of the uploaded lines filtered by this process, by rule.
+
+    Returns:
+        Counters: The shared Counters instance.
+    """
+    return Counters()
+
+
+@lru_cache(maxsize=None)
+def get_response_counters() -> Counters:
+    """
+    Get the counters of the worker responses applied and dropped by this process.
+
+    Returns:
+        Counters: The shared Counters instance.
+    """
+    return Counters()
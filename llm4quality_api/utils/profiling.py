@@ -0,0 +1,160 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from typing import Optional
+from llm4quality_api.utils.logger import Logger
+
+# Logger instance
+logger = Logger.get_instance().get_logger()
+
+
+class LoopWatchdog:
+    """
+    Detect the event loop being blocked, e.g. by a synchronous database call
+    in an async handler.
+
+    A heartbeat task on the loop measures how late it wakes up, and a
+    watchdog thread logs the stack of the loop thread once a heartbeat is
+    overdue by more than the threshold, while the loop is still blocked.
+    """
+
+    def __init__(self, threshold: float = 0.2, interval: float = 0.05):
+        """
+        Initialize the watchdog.
+
+        Args:
+            threshold (float): Seconds of blocking after which a stall is reported.
+            interval (float): Seconds between two heartbeats.
+        """
+        self.threshold = threshold
+        self.interval = interval
+        self.stalls = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    async def heartbeat(self):
+        """
+        Record the heartbeats of the loop and its lag, forever.
+        """
+        while True:
+            before = time.monotonic()
+            self._last_beat = before
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(0.0, time.monotonic() - before - self.interval)
+            self.max_lag = max(self.max_lag, self.last_lag)
+
+    def watch(self):
+        """
+        Check the heartbeats from a separate thread until stopped, reporting
+        each stall once.
+        """
+        reported_beat = None
+        while not self._stopped.wait(self.interval):
+            last_beat = self._last_beat
+            blocked = time.monotonic() - last_beat - self.interval
+            if blocked < self.threshold or last_beat == reported_beat:
+                continue
+            reported_beat = last_beat
+            self.stalls += 1
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "unavailable"
+            logger.warning(
+                f"Event loop blocked for {blocked * 1000:.0f} ms, loop thread stack:\n{stack}"
+            )
+
+    def start(self):
+        """
+        Start the heartbeat on the running event loop and the watchdog thread.
+        """
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self.heartbeat())
+        self._thread = threading.Thread(target=self.watch, daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        """
+        Stop the heartbeat and the watchdog thread.
+        """
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> dict:
+        """
+        Get the measured event loop lag.
+
+        Returns:
+            dict: -stalls: Stalls reported since the start.
+                    -last_lag_ms: Lag of the latest heartbeat.
+                    -max_lag_ms: Largest lag measured.
+                    -threshold_ms: Blocking reported as a stall.
+        """
+        return {
+            "stalls": self.stalls,
+            "last_lag_ms": round(self.last_lag * 1000, 1),
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "threshold_ms": round(self.threshold * 1000, 1),
+        }
+
+
+def frame_key(frame) -> str:
+    """
+    Describe a stack frame for a folded stack.
+
+    Args:
+        frame: The frame.
+
+    Returns:
+        str: "function (file:line)", without the ";" separator.
+    """
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{frame.f_lineno})".replace(";", ":")
+
+
+def sample_stacks(seconds: float, interval: float = 0.01) -> str:
+    """
+    Sample the stacks of every other thread of the process.
+
+    Meant to run in a worker thread, so the event loop is sampled too.
+
+    Args:
+        seconds (float): Duration of the sampling.
+        interval (float): Seconds between two samples.
+
+    Returns:
+        str: The profile in the folded stack format ("thread;outer;...;inner
+            count" per line) read by flamegraph.pl and speedscope.
+    """
+    samples: Counter = Counter()
+    own_id = threading.get_ident()
+    names = {}
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        if len(names) != threading.active_count():
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame_key(frame))
+                frame = frame.f_back
+            stack.append(names.get(thread_id, str(thread_id)).replace(";", ":"))
+            samples[";".join(reversed(stack))] += 1
+        time.sleep(interval)
+    return "\n".join(f"{stack} {count}" for stack, count in samples.most_common())
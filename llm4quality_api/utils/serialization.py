@@ -0,0 +1,94 @@
+import json
+from datetime import datetime
+from typing import Iterable, List, Optional
+from bson import ObjectId
+from llm4quality_api.models.codebook import Codebook
+from llm4quality_api.models.models import Verbatim, Result
+
+# Public fields of a verbatim, in the order of the Verbatim model
+VERBATIM_FIELDS = list(Verbatim.model_fields)
+
+
+def parse_verbatim_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated list of verbatim fields.
+
+    Args:
+        fields (Optional[str]): Requested fields, e.g. "id,status,year".
+
+    Returns:
+        Optional[List[str]]: The requested fields in model order, or None for all.
+
+    Raises:
+        ValueError: If a requested field does not exist.
+    """
+    if not fields:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(VERBATIM_FIELDS)
+    if unknown:
+        raise ValueError(f"Invalid field(s): {', '.join(sorted(unknown))}")
+    return [field for field in VERBATIM_FIELDS if field in requested]
+
+
+def verbatim_projection(fields: Optional[List[str]]) -> dict:
+    """
+    Build the MongoDB projection returning only the requested verbatim fields.
+
+    Args:
+        fields (Optional[List[str]]): Requested fields, or None for all of them.
+
+    Returns:
+        dict: The MongoDB projection.
+    """
+    fields = fields or VERBATIM_FIELDS
+    projection = {"_id": 1 if "id" in fields else 0}
+    for field in fields:
+        if field != "id":
+            projection[field] = 1
+    return projection
+
+
+def _json_default(value):
+    """Serialize the BSON values json does not support."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def verbatim_documents_to_json(
+    documents: Iterable[dict], fields: Optional[List[str]] = None
+) -> bytes:
+    """
+    Serialize raw verbatim documents straight to JSON bytes.
+
+    The output matches the JSON of the Verbatim model without building and
+    validating a model per document.
+
+    Args:
+        documents (Iterable[dict]): Documents returned by the MongoDB cursor.
+        fields (Optional[List[str]]): Fields to include, or None for all of them.
+
+    Returns:
+        bytes: The JSON array of verbatims.
+    """
+    fields = fields or VERBATIM_FIELDS
+    items = []
+    for document in documents:
+        item = {}
+        for field in fields:
+            if field == "id":
+                item["_id"] = str(document["_id"])
+                continue
+            value = document.get(field)
+            if field == "result" and value is not None:
+                if Codebook.is_compact(value):
+                    value = Codebook.get_instance().decode(value)
+                value = {theme: value.get(theme, {}) for theme in Result.model_fields}
+            item[field] = value
+        items.append(item)
+    return json.dumps(
+        items, default=_json_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
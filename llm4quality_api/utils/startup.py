@@ -0,0 +1,109 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict
+from llm4quality_api.config.config import Config
+from llm4quality_api.utils.logger import Logger
+
+# Logger instance
+logger = Logger.get_instance().get_logger()
+
+# Threads of the blocking startup phases and health checks. They are kept
+# apart from the default executor, so checks stuck on an unreachable server
+# neither pile up threads nor starve the other blocking calls.
+_executor = ThreadPoolExecutor(
+    max_workers=Config.HEALTH_CHECK_THREADS, thread_name_prefix="health-check"
+)
+
+
+async def run_blocking(function: Callable, *args) -> Any:
+    """
+    Run a blocking startup phase or health check in its dedicated threads.
+
+    A timed out call keeps its thread until the call returns, so the call
+    itself must be bounded, e.g. by a client timeout.
+
+    Args:
+        function (Callable): The blocking function.
+        *args: Its arguments.
+
+    Returns:
+        Any: The result of the function.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        _executor, partial(function, *args)
+    )
+
+
+async def run_phase(action: Callable[[], Awaitable], timeout: float) -> dict:
+    """
+    Run a startup or health check phase with a timeout and time it.
+
+    Args:
+        action (Callable[[], Awaitable]): Function returning the awaitable to run.
+        timeout (float): Maximum duration of the phase in seconds.
+
+    Returns:
+        dict: -status: "ok", "timeout" or "error".
+                -duration_ms: Duration of the phase in milliseconds.
+                -error: Error message, if the phase failed.
+    """
+    start = time.perf_counter()
+    report = {"status": "ok"}
+    try:
+        await asyncio.wait_for(action(), timeout)
+    except asyncio.TimeoutError:
+        report["status"] = "timeout"
+    except Exception as e:
+        report = {"status": "error", "error": str(e) or type(e).__name__}
+    report["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return report
+
+
+async def run_phases(
+    phases: Dict[str, Callable[[], Awaitable]], timeout: float
+) -> Dict[str, dict]:
+    """
+    Run independent phases in parallel, each with its own timeout.
+
+    Args:
+        phases (Dict[str, Callable[[], Awaitable]]): Phases by name.
+        timeout (float): Maximum duration of each phase in seconds.
+
+    Returns:
+        Dict[str, dict]: The report of each phase by name.
+    """
+    reports = await asyncio.gather(
+        *(run_phase(action, timeout) for action in phases.values())
+    )
+    return dict(zip(phases, reports))
+
+
+async def retry_failed_phases(
+    phases: Dict[str, Callable[[], Awaitable]],
+    reports: Dict[str, dict],
+    timeout: float,
+    interval: float,
+):
+    """
+    Run the failed phases again until they all succeed.
+
+    Args:
+        phases (Dict[str, Callable[[], Awaitable]]): Phases by name.
+        reports (Dict[str, dict]): The report of each phase by name, updated
+            in place with the outcome of the retries.
+        timeout (float): Maximum duration of each phase in seconds.
+        interval (float): Pause in seconds between two retries.
+    """
+    while True:
+        failed = [name for name, report in reports.items() if report["status"] != "ok"]
+        if not failed:
+            return
+        await asyncio.sleep(interval)
+        retried = await run_phases({name: phases[name] for name in failed}, timeout)
+        for name, report in retried.items():
+            report["attempts"] = reports[name].get("attempts", 1) + 1
+            if report["status"] == "ok":
+                logger.info(f"Startup phase {name} succeeded after {report['attempts']} attempts")
+        reports.update(retried)
@@ -0,0 +1,51 @@
+import pytest
+from datetime import datetime, timezone
+from llm4quality_api.services import admission as admission_module
+from llm4quality_api.services.admission import AdmissionControl
+
+
+def mock_queue(monkeypatch, message_count, consumer_count=1):
+    """
+    Mock the RabbitMQ queue statistics.
+    """
+    monkeypatch.setattr(
+        admission_module,
+        "get_queue_stats",
+        lambda queue: {"message_count": message_count, "consumer_count": consumer_count},
+    )
+
+
+@pytest.mark.asyncio
+async def test_admit_within_capacity(mock_controller, monkeypatch):
+    mock_queue(monkeypatch, message_count=90)
+    admission = AdmissionControl(mock_controller, max_backlog=100)
+
+    # Only the remaining capacity is admitted, including over consecutive calls
+    assert await admission.admit(4) == 4
+    assert await admission.admit(10) == 6
+    assert await admission.admit(10) == 0
+
+
+@pytest.mark.asyncio
+async def test_admit_behind_deferred(mock_controller, monkeypatch):
+    mock_queue(monkeypatch, message_count=0)
+    await mock_controller.create_verbatims(["Verbatim 1"], 2024, deferred=True)
+    admission = AdmissionControl(mock_controller, max_backlog=100)
+
+    # New verbatims wait behind the pending ones
+    assert await admission.admit(10) == 0
+    assert await admission.capacity() == 100
+
+
+@pytest.mark.asyncio
+async def test_estimate_completion(mock_controller, monkeypatch):
+    mock_queue(monkeypatch, message_count=50)
+    now = datetime.now(timezone.utc)
+    mock_controller.collection.insert_many(
+        [{"content": f"Test {i}", "status": "SUCCESS", "year": 2024, "completed_at": now} for i in range(10)]
+    )
+    admission = AdmissionControl(mock_controller, max_backlog=0, throughput_window=10)
+
+    # 10 verbatims completed in 10 seconds, 50 waiting and 50 more to process
+    assert await admission.admit(50) == 50
+    assert await admission.estimate_completion(pending=50) == 100.0
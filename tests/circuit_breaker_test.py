@@ -0,0 +1,89 @@
+import pytest
+from pymongo.errors import AutoReconnect, DuplicateKeyError
+from llm4quality_api.db.circuit_breaker import (
+    CircuitBreaker,
+    DatabaseUnavailableError,
+    guarded,
+)
+
+
+class FakeClient:
+    def __init__(self, breaker):
+        self.breaker = breaker
+
+
+class FakeController:
+    def __init__(self, breaker):
+        self.client = FakeClient(breaker)
+        self.error = None
+
+    @guarded
+    async def query(self):
+        if self.error:
+            raise self.error
+        return "ok"
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_after_failures():
+    controller = FakeController(CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    controller.error = AutoReconnect("connection refused")
+
+    for _ in range(2):
+        with pytest.raises(AutoReconnect):
+            await controller.query()
+
+    # The database is not called anymore while the circuit is open
+    controller.error = None
+    with pytest.raises(DatabaseUnavailableError):
+        await controller.query()
+    assert controller.client.breaker.status()["state"] == CircuitBreaker.OPEN
+
+
+@pytest.mark.asyncio
+async def test_circuit_closes_after_successful_trial():
+    controller = FakeController(CircuitBreaker(failure_threshold=1, reset_timeout=0))
+    controller.error = AutoReconnect("connection refused")
+    with pytest.raises(AutoReconnect):
+        await controller.query()
+
+    # The trial call succeeds and closes the circuit
+    controller.error = None
+    assert await controller.query() == "ok"
+    assert controller.client.breaker.status() == {"state": CircuitBreaker.CLOSED, "failures": 0}
+
+
+@pytest.mark.asyncio
+async def test_query_errors_do_not_open_circuit():
+    controller = FakeController(CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    controller.error = DuplicateKeyError("duplicate key")
+
+    with pytest.raises(DuplicateKeyError):
+        await controller.query()
+
+    assert controller.client.breaker.status()["state"] == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_nested_call_does_not_close_circuit():
+    controller = FakeController(CircuitBreaker(failure_threshold=1, reset_timeout=0))
+    controller.error = AutoReconnect("connection refused")
+    with pytest.raises(AutoReconnect):
+        await controller.query()
+
+    # The outer call takes the trial slot, so the inner call is rejected
+    controller.error = None
+    controller.client.breaker.reset_timeout = 60
+    controller.client.breaker.opened_at -= 60
+
+    @guarded
+    async def outer(self):
+        return await self.query()
+
+    with pytest.raises(DatabaseUnavailableError):
+        await outer(controller)
+    assert controller.client.breaker.status()["state"] == CircuitBreaker.OPEN
+
+    # The trial slot was given back to the next call
+    assert await controller.query() == "ok"
+    assert controller.client.breaker.status()["state"] == CircuitBreaker.CLOSED
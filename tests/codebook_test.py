@@ -0,0 +1,51 @@
+import pytest
+from llm4quality_api.models.codebook import Codebook
+from llm4quality_api.models.models import Result
+
+
+@pytest.fixture
+def codebook():
+    """
+    Create a fresh Codebook instance.
+    """
+    Codebook._instance = None
+    codebook = Codebook.get_instance()
+    yield codebook
+    Codebook._instance = None
+
+
+def test_encode_decode_round_trip(codebook):
+    result = {
+        "circuit_de_prise_en_charge": {
+            "accueil": {"positive": 1, "negative": 0, "neutral": 0, "not mentioned": 0},
+            "attente": {},
+        },
+        "qualite_hoteliere": {"repas": {"positive": 0, "negative": 2}},
+    }
+    codebook.load(codebook.missing_paths(result))
+
+    encoded = codebook.encode(result)
+
+    # Verify the results
+    assert Codebook.is_compact(encoded)
+    assert codebook.decode(encoded) == result
+    assert Result.from_dict(encoded) == Result(**result)
+
+
+def test_decode_refreshes_unknown_codes(codebook):
+    persisted = [["qualite_hoteliere", "repas", "positive"]]
+    codebook.loader = lambda: persisted
+
+    # The codes were assigned by another process
+    writer = Codebook.__new__(Codebook)
+    writer._initialize(persisted)
+    encoded = writer.encode({"qualite_hoteliere": {"repas": {"positive": 1}}})
+
+    assert codebook.decode(encoded) == {"qualite_hoteliere": {"repas": {"positive": 1}}}
+
+
+def test_load_rejects_reordered_entries(codebook):
+    codebook.load([["a", "b", "c"], ["a", "b", "d"]])
+
+    with pytest.raises(ValueError):
+        codebook.load([["a", "b", "d"], ["a", "b", "c"]])
@@ -0,0 +1,59 @@
+import pytest
+from mongomock import MongoClient
+from llm4quality_api.controllers.job_controller import JobController
+from llm4quality_api.controllers.lease_controller import LeaseController
+from llm4quality_api.controllers.upload_controller import UploadController
+from llm4quality_api.controllers.verbatim_controller import VerbatimController
+from llm4quality_api.models.codebook import Codebook
+
+
+@pytest.fixture
+def mock_client():
+    """
+    Create a mocked MongoDB client, shared by the controllers of a test.
+    """
+    return MongoClient()
+
+
+@pytest.fixture
+def mock_controller(mock_client):
+    """
+    Create a VerbatimController instance with mocked MongoDB collections.
+    """
+    Codebook._instance = None
+    mock_controller = VerbatimController()
+    mock_controller.collection = mock_client.llm4quality.verbatims
+    mock_controller.archive_collection = mock_client.llm4quality.verbatims_archive
+    mock_controller.tiers_collection = mock_client.llm4quality.tiers
+    mock_controller.codebook_collection = mock_client.llm4quality.codebooks
+    return mock_controller
+
+
+@pytest.fixture
+def mock_uploads(mock_client):
+    """
+    Create an UploadController instance with a mocked MongoDB collection.
+    """
+    mock_uploads = UploadController()
+    mock_uploads.collection = mock_client.llm4quality.uploads
+    return mock_uploads
+
+
+@pytest.fixture
+def mock_jobs(mock_client):
+    """
+    Create a JobController instance with a mocked MongoDB collection.
+    """
+    mock_jobs = JobController()
+    mock_jobs.collection = mock_client.llm4quality.jobs
+    return mock_jobs
+
+
+@pytest.fixture
+def mock_leases(mock_client):
+    """
+    Create a LeaseController instance with a mocked MongoDB collection.
+    """
+    mock_leases = LeaseController()
+    mock_leases.collection = mock_client.llm4quality.leases
+    return mock_leases
@@ -0,0 +1,80 @@
+import pytest
+from llm4quality_api.models.codebook import Codebook
+from llm4quality_api.services.consistency import build_matrix, evaluate_consistency
+
+
+def result(**labels):
+    return {"qualite_hoteliere": {"repas": labels}}
+
+
+@pytest.fixture(autouse=True)
+def reset_codebook():
+    Codebook._instance = None
+
+
+def test_build_matrix():
+    histories = [
+        [result(positive=1), result(negative=1)],
+        [result(positive=1), result(positive=1), result(positive=0)],
+    ]
+
+    paths, matrix, mask = build_matrix(histories)
+
+    assert paths == [
+        ("qualite_hoteliere", "repas", "positive"),
+        ("qualite_hoteliere", "repas", "negative"),
+    ]
+    assert matrix.shape == (2, 3, 2)
+    assert matrix[0].tolist() == [[1, 0], [0, 1], [0, 0]]
+    assert mask.tolist() == [[True, True, False], [True, True, True]]
+
+
+def test_evaluate_consistency():
+    histories = [
+        [result(positive=1), result(positive=1)],
+        [result(positive=1), result(negative=1)],
+        [result(positive=1), result(positive=1), result(positive=0)],
+    ]
+
+    report = evaluate_consistency(histories)
+
+    assert report["verbatims"] == 3
+    assert report["results"] == 7
+    assert report["full_agreement_rate"] == pytest.approx(1 / 3, abs=1e-4)
+    criterion = report["criteria"][0]
+    assert (criterion["theme"], criterion["criterion"]) == ("qualite_hoteliere", "repas")
+    assert criterion["agreement_rate"] == pytest.approx(1 / 3, abs=1e-4)
+    assert criterion["flips"] == 2
+
+    labels = {label["label"]: label for label in criterion["labels"]}
+    assert labels["positive"]["flips"] == 2
+    assert labels["negative"]["flips"] == 1
+    # Fleiss' kappa: observed agreement 4/9, expected agreement 29/49
+    assert labels["positive"]["kappa"] == pytest.approx(
+        (4 / 9 - 29 / 49) / (1 - 29 / 49), abs=1e-4
+    )
+
+
+def test_evaluate_consistency_partial_agreement():
+    # The positive label always agrees, the negative one only for the second verbatim
+    histories = [
+        [result(positive=1, negative=0), result(positive=1, negative=1)],
+        [result(positive=1, negative=1), result(positive=1, negative=1)],
+    ]
+
+    criterion = evaluate_consistency(histories)["criteria"][0]
+
+    labels = {label["label"]: label for label in criterion["labels"]}
+    assert labels["positive"]["agreement_rate"] == 1.0
+    assert labels["negative"]["agreement_rate"] == 0.5
+    # A criterion agrees when all its labels agree, and flips when any label flips
+    assert criterion["agreement_rate"] == 0.5
+    assert criterion["flips"] == 1
+
+
+def test_evaluate_consistency_undefined_kappa():
+    report = evaluate_consistency([[result(positive=1), result(positive=1)]])
+
+    assert report["full_agreement_rate"] == 1.0
+    assert report["criteria"][0]["kappa"] is None
+    assert evaluate_consistency([])["criteria"] == []
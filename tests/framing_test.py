@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+from llm4quality_api.models.models import Verbatim, Status
+from llm4quality_api.services.framing import (
+    ClientFraming,
+    FrameCoalescer,
+    FramingOptions,
+)
+
+
+class FakeWebSocket:
+    """
+    Record the JSON frames sent to a client.
+    """
+
+    def __init__(self):
+        self.frames = []
+
+    async def send_json(self, data):
+        self.frames.append(data)
+
+
+def make_verbatims(count):
+    return [
+        Verbatim(content=f"Verbatim {i}", status=Status.RUN, result=None, year=2024, created_at=None)
+        for i in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_coalescer_sends_full_frames():
+    websocket = FakeWebSocket()
+    coalescer = FrameCoalescer(websocket, max_items=2, max_delay=10)
+
+    await coalescer.add_many([1, 2, 3, 4, 5])
+
+    # Full frames are sent right away, the rest waits for the time window
+    assert websocket.frames == [
+        {"type": "batch", "items": [1, 2]},
+        {"type": "batch", "items": [3, 4]},
+    ]
+    await coalescer.flush()
+    assert websocket.frames[-1] == {"type": "batch", "items": [5]}
+
+
+@pytest.mark.asyncio
+async def test_coalescer_flushes_after_time_window():
+    websocket = FakeWebSocket()
+    coalescer = FrameCoalescer(websocket, max_items=100, max_delay=0.01)
+
+    await coalescer.add({"id": "a"})
+    await coalescer.add({"id": "b"})
+    assert websocket.frames == []
+
+    await asyncio.sleep(0.05)
+    assert websocket.frames == [{"type": "batch", "items": [{"id": "a"}, {"id": "b"}]}]
+
+
+@pytest.mark.asyncio
+async def test_client_framing_modes():
+    verbatims = make_verbatims(3)
+
+    legacy = FakeWebSocket()
+    await ClientFraming(legacy).send_verbatims(verbatims)
+    assert legacy.frames == [verbatim.model_dump_json() for verbatim in verbatims]
+
+    batch = FakeWebSocket()
+    await ClientFraming(
+        batch, FramingOptions(mode="batch", batch_size=2)
+    ).send_verbatims(verbatims)
+    assert [len(frame["items"]) for frame in batch.frames] == [2, 1]
+    assert batch.frames[0]["items"][0]["content"] == "Verbatim 0"
+
+    summary = FakeWebSocket()
+    await ClientFraming(
+        summary, FramingOptions(mode="batch", summary_only=True)
+    ).send_verbatims(verbatims)
+    assert summary.frames == []
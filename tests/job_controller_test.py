@@ -0,0 +1,51 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from llm4quality_api.models.models import JobStatus
+
+
+@pytest.mark.asyncio
+async def test_job_lifecycle(mock_jobs):
+    job = await mock_jobs.create_job("delete", {"year": 2023})
+    assert job.status == JobStatus.PENDING
+
+    # Record the progress of the job
+    await mock_jobs.update_progress(job.id, 10, total=20)
+    job = await mock_jobs.find_job_by_id(job.id)
+    assert job.status == JobStatus.RUNNING
+    assert (job.processed, job.total) == (10, 20)
+
+    # Complete the job
+    await mock_jobs.complete_job(job.id, {"deleted_count": 20})
+    job = await mock_jobs.find_job_by_id(job.id)
+    assert job.status == JobStatus.SUCCESS
+    assert job.result == {"deleted_count": 20}
+
+
+@pytest.mark.asyncio
+async def test_fail_job(mock_jobs):
+    job = await mock_jobs.create_job("delete", {"year": 2023})
+
+    await mock_jobs.fail_job(job.id, "Database unavailable")
+
+    job = await mock_jobs.find_job_by_id(job.id)
+    assert job.status == JobStatus.ERROR
+    assert job.error == "Database unavailable"
+
+
+@pytest.mark.asyncio
+async def test_fail_orphaned_jobs(mock_jobs):
+    orphaned = await mock_jobs.create_job("archive", {"year": 2022})
+    alive = await mock_jobs.create_job("delete", {"year": 2023})
+    done = await mock_jobs.create_job("delete", {"year": 2021})
+    await mock_jobs.complete_job(done.id)
+    # The process running the first job stopped recording its heartbeat
+    stale = datetime.now(timezone.utc) - timedelta(minutes=5)
+    mock_jobs.collection.update_many({}, {"$set": {"updated_at": stale}})
+    await mock_jobs.heartbeat(alive.id)
+
+    failed = await mock_jobs.fail_orphaned_jobs(stale + timedelta(minutes=1))
+
+    assert failed == 1
+    assert (await mock_jobs.find_job_by_id(orphaned.id)).status == JobStatus.ERROR
+    assert (await mock_jobs.find_job_by_id(alive.id)).status == JobStatus.PENDING
+    assert (await mock_jobs.find_job_by_id(done.id)).status == JobStatus.SUCCESS
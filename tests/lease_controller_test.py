@@ -0,0 +1,30 @@
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_acquire_lease(mock_leases):
+    # The first candidate wins and can renew its lease
+    assert await mock_leases.acquire("scheduler", "api-1", ttl=30)
+    assert await mock_leases.acquire("scheduler", "api-1", ttl=30)
+
+    # Another candidate cannot take over an active lease
+    assert not await mock_leases.acquire("scheduler", "api-2", ttl=30)
+
+
+@pytest.mark.asyncio
+async def test_acquire_expired_lease(mock_leases):
+    await mock_leases.acquire("scheduler", "api-1", ttl=-1)
+
+    # An expired lease is taken over by the next candidate
+    assert await mock_leases.acquire("scheduler", "api-2", ttl=30)
+    assert mock_leases.collection.find_one({"_id": "scheduler"})["owner"] == "api-2"
+
+
+@pytest.mark.asyncio
+async def test_release_lease(mock_leases):
+    await mock_leases.acquire("scheduler", "api-1", ttl=30)
+
+    # Only the owner can release the lease
+    assert not await mock_leases.release("scheduler", "api-2")
+    assert await mock_leases.release("scheduler", "api-1")
+    assert await mock_leases.acquire("scheduler", "api-2", ttl=30)
@@ -0,0 +1,70 @@
+import pytest
+from llm4quality_api.services.prefilter import Prefilter, check_mode, parse_list
+
+
+@pytest.fixture
+def prefilter():
+    return Prefilter(
+        min_length=3,
+        placeholders=parse_list("RAS,n/a,néant"),
+        headers=parse_list("verbatim,commentaire"),
+    )
+
+
+def test_classify_rules(prefilter):
+    lines = [
+        "Verbatim",
+        "...",
+        " RAS ",
+        "12,5",
+        "ok",
+        "The staff was very kind and the food was great",
+        "Le personnel était très gentil mais le repas était froid",
+        "Attente trop longue aux urgences",
+    ]
+
+    rules = prefilter.classify(lines)
+
+    assert list(rules) == [
+        "header",
+        "punctuation",
+        "placeholder",
+        "numeric",
+        "too_short",
+        "language",
+        "",
+        "",
+    ]
+
+
+def test_header_only_on_first_line(prefilter):
+    assert list(prefilter.classify(["Très bien", "Commentaire"])) == ["", ""]
+    assert list(prefilter.classify(["Commentaire"], header=False)) == [""]
+
+
+def test_split(prefilter):
+    kept, filtered = prefilter.split(["N/A", "Chambre propre et calme", "-", "néant"])
+
+    assert kept == [1]
+    assert filtered == {"punctuation": [2], "placeholder": [0, 3]}
+
+
+def test_rule_selection():
+    prefilter = Prefilter(rules=["numeric"])
+    assert list(prefilter.classify(["42", "..."])) == ["numeric", ""]
+    with pytest.raises(ValueError):
+        Prefilter(rules=["unknown"])
+
+
+def test_check_mode():
+    assert check_mode("skip") == "skip"
+    with pytest.raises(ValueError, match="short_circuit, skip, off"):
+        check_mode("shortcircuit")
+
+
+def test_long_line(prefilter):
+    # A single long line does not widen the array every line is scanned in
+    long_line = "The staff was very kind and the food was great. " * 500
+    lines = ["RAS", long_line, "Attente trop longue aux urgences", "x" * 20000]
+
+    assert list(prefilter.classify(lines)) == ["placeholder", "language", "", ""]
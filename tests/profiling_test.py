@@ -0,0 +1,42 @@
+import asyncio
+import threading
+import time
+import pytest
+from llm4quality_api.utils.profiling import LoopWatchdog, sample_stacks
+
+
+@pytest.mark.asyncio
+async def test_loop_watchdog_reports_stall():
+    watchdog = LoopWatchdog(threshold=0.05, interval=0.01)
+    watchdog.start()
+    await asyncio.sleep(0.05)
+
+    # Block the event loop with a synchronous call
+    time.sleep(0.2)
+    await asyncio.sleep(0.05)
+    await watchdog.stop()
+
+    status = watchdog.status()
+    assert status["stalls"] == 1
+    assert status["max_lag_ms"] >= 150
+
+
+def test_sample_stacks_folded_format():
+    stop = threading.Event()
+
+    def idle_worker():
+        stop.wait()
+
+    thread = threading.Thread(target=idle_worker, name="idle-worker")
+    thread.start()
+    try:
+        profile = sample_stacks(0.05, interval=0.01)
+    finally:
+        stop.set()
+        thread.join()
+
+    lines = profile.splitlines()
+    worker_line = next(line for line in lines if line.startswith("idle-worker;"))
+    stack, count = worker_line.rsplit(" ", 1)
+    assert "idle_worker" in stack
+    assert int(count) > 0
@@ -0,0 +1,42 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from llm4quality_api.services.admission import AdmissionControl
+from llm4quality_api.tasks import scheduler as scheduler_module
+from llm4quality_api.tasks import verbatims as verbatims_tasks
+from llm4quality_api.tasks.scheduler import DispatchScheduler
+
+
+@pytest.mark.asyncio
+async def test_sweep_fails_in_one_broadcast(mock_controller, monkeypatch):
+    now = datetime.now(timezone.utc)
+    mock_controller.collection.insert_many(
+        [
+            {
+                "content": f"Test {i}",
+                "status": "RUN",
+                "result": None,
+                "year": 2024,
+                "attempts": 3,
+                "dispatch_deadline": now - timedelta(minutes=1),
+            }
+            for i in range(3)
+        ]
+    )
+    broadcasts = []
+    monkeypatch.setattr(
+        verbatims_tasks,
+        "publish_broadcasts",
+        lambda exchange, messages: broadcasts.append(messages),
+    )
+    monkeypatch.setattr(scheduler_module, "publish_messages", lambda queue, messages: None)
+    scheduler = DispatchScheduler(
+        controller=mock_controller,
+        admission=AdmissionControl(mock_controller),
+        max_attempts=3,
+    )
+
+    assert await scheduler.sweep(now) == {"redispatched": 0, "failed": 3}
+
+    # The ERROR updates are published together, over a single connection
+    assert len(broadcasts) == 1
+    assert [message["status"] for message in broadcasts[0]] == ["ERROR"] * 3
@@ -0,0 +1,43 @@
+import json
+import pytest
+from datetime import datetime
+from bson import ObjectId
+from llm4quality_api.models.models import Verbatim
+from llm4quality_api.utils.serialization import (
+    parse_verbatim_fields,
+    verbatim_projection,
+    verbatim_documents_to_json,
+)
+
+
+def test_documents_to_json_matches_model():
+    document = {
+        "_id": ObjectId(),
+        "content": "Très bon accueil",
+        "status": "SUCCESS",
+        "result": {"qualite_hoteliere": {"repas": {"positive": 1}}},
+        "year": 2024,
+        "created_at": datetime(2024, 5, 1, 12, 30),
+        "attempts": 1,
+    }
+
+    # Verify the results
+    expected = [Verbatim.from_dict(document).model_dump(mode="json", by_alias=True)]
+    assert json.loads(verbatim_documents_to_json([document])) == expected
+
+
+def test_documents_to_json_with_fields():
+    document = {"_id": ObjectId(), "status": "RUN", "year": 2024}
+    fields = parse_verbatim_fields("year, id,status")
+
+    # Verify the results
+    assert fields == ["id", "status", "year"]
+    assert verbatim_projection(fields) == {"_id": 1, "status": 1, "year": 1}
+    assert json.loads(verbatim_documents_to_json([document], fields)) == [
+        {"_id": str(document["_id"]), "status": "RUN", "year": 2024}
+    ]
+
+
+def test_parse_invalid_fields():
+    with pytest.raises(ValueError):
+        parse_verbatim_fields("id,password")
@@ -0,0 +1,50 @@
+import asyncio
+import pytest
+from llm4quality_api.utils.startup import retry_failed_phases, run_blocking, run_phases
+
+
+@pytest.mark.asyncio
+async def test_run_phases():
+    async def fail():
+        raise ConnectionError("unreachable")
+
+    reports = await run_phases(
+        {
+            "ok": lambda: run_blocking(sum, [1, 2]),
+            "error": fail,
+            "timeout": lambda: asyncio.sleep(1),
+        },
+        timeout=0.05,
+    )
+
+    assert {name: report["status"] for name, report in reports.items()} == {
+        "ok": "ok",
+        "error": "error",
+        "timeout": "timeout",
+    }
+    assert reports["error"]["error"] == "unreachable"
+
+
+@pytest.mark.asyncio
+async def test_retry_failed_phases():
+    calls = {"stable": 0, "flaky": 0}
+
+    async def stable():
+        calls["stable"] += 1
+
+    async def flaky():
+        calls["flaky"] += 1
+        if calls["flaky"] < 3:
+            raise ConnectionError("unreachable")
+
+    phases = {"stable": stable, "flaky": flaky}
+    reports = await run_phases(phases, timeout=1)
+    assert reports["flaky"]["status"] == "error"
+
+    # Only the failed phase is run again, until it succeeds
+    await asyncio.wait_for(
+        retry_failed_phases(phases, reports, timeout=1, interval=0.01), timeout=1
+    )
+    assert reports["flaky"]["status"] == "ok"
+    assert reports["flaky"]["attempts"] == 3
+    assert calls == {"stable": 1, "flaky": 3}
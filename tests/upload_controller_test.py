@@ -0,0 +1,37 @@
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_resume_upload(mock_uploads):
+    upload = await mock_uploads.start_upload("user-1", "survey-2024.csv", 2024)
+    assert upload["committed_offset"] == 0
+
+    await mock_uploads.commit_offset(upload["_id"], 1000, {"dispatched": 990, "prefiltered": 10})
+    await mock_uploads.commit_offset(upload["_id"], 2000, {"dispatched": 1000})
+    # A late commit of an earlier chunk never moves the offset backwards
+    await mock_uploads.commit_offset(upload["_id"], 1000)
+
+    upload = await mock_uploads.start_upload("user-1", "survey-2024.csv", 2024)
+    assert upload["committed_offset"] == 2000
+    assert upload["counts"] == {"dispatched": 1990, "prefiltered": 10}
+
+
+@pytest.mark.asyncio
+async def test_resume_upload_other_year(mock_uploads):
+    await mock_uploads.start_upload("user-1", "survey.csv", 2024)
+
+    with pytest.raises(ValueError):
+        await mock_uploads.start_upload("user-1", "survey.csv", 2023)
+    assert await mock_uploads.find_upload("user-1", "unknown.csv") is None
+
+
+@pytest.mark.asyncio
+async def test_upload_key_scoped_to_owner(mock_uploads):
+    first = await mock_uploads.start_upload("user-1", "survey.csv", 2024)
+    await mock_uploads.commit_offset(first["_id"], 1000)
+
+    # Another user choosing the same key starts its own upload
+    second = await mock_uploads.start_upload("user-2", "survey.csv", 2023)
+    assert second["_id"] != first["_id"]
+    assert second["committed_offset"] == 0
+    assert (await mock_uploads.find_upload("user-1", "survey.csv"))["committed_offset"] == 1000
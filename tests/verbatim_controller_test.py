@@ -1,19 +1,8 @@
+import asyncio
 import pytest
-from mongomock import MongoClient
+from llm4quality_api.config.config import Config
+from llm4quality_api.models.codebook import Codebook
 from llm4quality_api.models.models import Verbatim, Result, Status
-from llm4quality_api.controllers.verbatim_controller import VerbatimController
-
-
-@pytest.fixture
-def mock_controller():
-    """
-    Create a VerbatimController instance with a mocked MongoDB collection.
-    """
-    # Mock MongoDB client and inject into VerbatimController
-    mock_client = MongoClient()
-    mock_controller = VerbatimController()
-    mock_controller.collection = mock_client.llm4quality.verbatims
-    return mock_controller
 
 
 @pytest.mark.asyncio
@@ -127,3 +116,344 @@ async def test_find_verbatim_by_id(mock_controller):
     assert verbatim is not None
     assert verbatim.content == "Test Verbatim"
     assert verbatim.status == Status.RUN
+
+
+@pytest.mark.asyncio
+async def test_claim_expired_dispatches(mock_controller):
+    from datetime import datetime, timedelta, timezone
+
+    created_verbatims = await mock_controller.create_verbatims(
+        ["Verbatim 1", "Verbatim 2"], 2024
+    )
+    now = datetime.now(timezone.utc) + timedelta(days=1)
+
+    # Both verbatims are past their delivery deadline
+    expired = await mock_controller.find_expired_dispatches(now)
+    assert len(expired) == len(created_verbatims)
+
+    # A worker response arrives for the first one before the sweep claims it
+    mock_controller.collection.update_one(
+        {"_id": expired[0]["_id"]}, {"$set": {"status": Status.SUCCESS.value}}
+    )
+    ids = [str(doc["_id"]) for doc in expired]
+    claimed = await mock_controller.claim_expired_dispatches(ids, 1, now, Status.RUN)
+
+    # Verify the results
+    assert claimed == [ids[1]]
+    redispatched = mock_controller.collection.find_one({"_id": expired[1]["_id"]})
+    assert redispatched["attempts"] == 2
+    assert redispatched["dispatch_deadline"] > now.replace(tzinfo=None)
+    assert await mock_controller.find_expired_dispatches(now) == []
+
+    # Giving up completes the verbatim, so it is counted in the statistics
+    later = now + timedelta(days=1)
+    claimed = await mock_controller.claim_expired_dispatches([ids[1]], 2, later, Status.ERROR)
+    assert claimed == [ids[1]]
+    failed = mock_controller.collection.find_one({"_id": expired[1]["_id"]})
+    assert failed["status"] == Status.ERROR.value
+    assert failed["completed_at"] == failed["failed_at"]
+    assert (await mock_controller.get_latency_stats({}))["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_delete_verbatims_chunk(mock_controller):
+    # Seed the mock database
+    mock_controller.collection.insert_many(
+        [{"content": f"Test {i}", "status": "SUCCESS", "result": None, "year": 2023} for i in range(5)]
+        + [{"content": "Test 2024", "status": "SUCCESS", "result": None, "year": 2024}]
+    )
+
+    # Delete the 2023 verbatims in chunks of 2
+    deleted_counts = []
+    while deleted_count := await mock_controller.delete_verbatims_chunk({"year": 2023}, 2):
+        deleted_counts.append(deleted_count)
+
+    # Verify the results
+    assert deleted_counts == [2, 2, 1]
+    assert await mock_controller.count_verbatims({"year": 2023}) == 0
+    assert await mock_controller.count_verbatims({"year": 2024}) == 1
+
+
+@pytest.mark.asyncio
+async def test_update_verbatim_status_compact(mock_controller, monkeypatch):
+    monkeypatch.setattr(Config, "COMPACT_RESULTS", True)
+    inserted_id = mock_controller.collection.insert_one(
+        {"content": "Test Verbatim", "status": "RUN", "result": None, "year": 2024}
+    ).inserted_id
+
+    result = Result(
+        circuit_de_prise_en_charge={"accueil": {"positive": 1, "negative": 0}},
+        qualite_hoteliere={"repas": {"positive": 0, "negative": 1}},
+    )
+    await mock_controller.update_verbatim_status(
+        verbatim_id=str(inserted_id), status=Status.SUCCESS, result=result
+    )
+
+    # The stored result is compact, the decoded verbatim is unchanged
+    stored = mock_controller.collection.find_one({"_id": inserted_id})
+    assert Codebook.is_compact(stored["result"])
+    verbatim = await mock_controller.find_verbatim_by_id(str(inserted_id))
+    assert verbatim.result == result
+    assert len(mock_controller.load_codebook_entries()) == 4
+
+
+@pytest.mark.asyncio
+async def test_deferred_verbatims(mock_controller):
+    dispatched = await mock_controller.create_verbatims(["Verbatim 1"], 2024)
+    deferred = await mock_controller.create_verbatims(
+        ["Verbatim 2", "Verbatim 3"], 2024, deferred=True
+    )
+
+    # Deferred verbatims are pending in MongoDB, without delivery deadline
+    assert all(v.status == Status.RUN for v in dispatched + deferred)
+    assert await mock_controller.count_deferred_verbatims() == 2
+    pending = await mock_controller.find_deferred_verbatims(limit=1)
+    assert [str(doc["_id"]) for doc in pending] == [deferred[0].id]
+    assert "dispatch_deadline" not in pending[0]
+
+    # Claiming them starts their delivery cycle
+    claimed = await mock_controller.claim_deferred_verbatims([deferred[0].id])
+    assert claimed == [deferred[0].id]
+    assert await mock_controller.count_deferred_verbatims() == 1
+    document = mock_controller.collection.find_one({"_id": pending[0]["_id"]})
+    assert document["attempts"] == 1
+    assert "dispatch_deadline" in document
+
+
+@pytest.mark.asyncio
+async def test_get_latency_stats(mock_controller):
+    from datetime import datetime, timedelta
+
+    # Seed the mock database with verbatims completed in 10, 20, ..., 100 seconds
+    requested_at = datetime(2024, 5, 1, 12, 0)
+    mock_controller.collection.insert_many(
+        [
+            {
+                "content": f"Test {i}",
+                "status": "SUCCESS",
+                "year": 2024,
+                "created_at": requested_at,
+                "requested_at": requested_at,
+                "dispatched_at": requested_at,
+                "worker_started_at": requested_at + timedelta(seconds=5),
+                "completed_at": requested_at + timedelta(seconds=10 * i),
+                "attempts": 1,
+            }
+            for i in range(1, 11)
+        ]
+        + [{"content": "Pending", "status": "RUN", "year": 2024, "created_at": requested_at}]
+    )
+
+    stats = await mock_controller.get_latency_stats({"year": 2024}, granularity="minute")
+
+    # Verify the results
+    assert stats["count"] == stats["sample_count"] == 10
+    assert stats["turnaround_seconds"] == {"p50": 55.0, "p95": 95.5, "p99": 99.1}
+    assert stats["queue_wait_seconds"]["p50"] == 5.0
+    assert stats["throughput"] == [
+        {"period": "2024-05-01T12:00", "count": 5},
+        {"period": "2024-05-01T12:01", "count": 5},
+    ]
+    assert not stats["throughput_truncated"]
+
+    # Only the most recent periods of the throughput are returned
+    stats = await mock_controller.get_latency_stats(
+        {"year": 2024}, granularity="minute", max_periods=1
+    )
+    assert stats["count"] == 10
+    assert stats["throughput"] == [{"period": "2024-05-01T12:01", "count": 5}]
+    assert stats["throughput_truncated"]
+
+    # The percentiles of large selections are computed on a bounded sample
+    stats = await mock_controller.get_latency_stats({"year": 2024}, sample_size=4)
+    assert stats["count"] == 10
+    assert stats["sample_count"] == 4
+    assert 10 <= stats["turnaround_seconds"]["p50"] <= 100
+
+
+@pytest.mark.asyncio
+async def test_archive_chunk(mock_controller):
+    mock_controller.collection.insert_many(
+        [
+            {"content": "Old 1", "status": "SUCCESS", "result": None, "year": 2022},
+            {"content": "Old 2", "status": "ERROR", "result": None, "year": 2022},
+            {"content": "Old 3", "status": "SUCCESS", "result": None, "year": 2022},
+            {"content": "New", "status": "SUCCESS", "result": None, "year": 2024},
+        ]
+    )
+    # A document already copied by an interrupted move
+    interrupted = mock_controller.collection.find_one({"content": "Old 1"})
+    mock_controller.archive_collection.insert_one(interrupted)
+
+    assert await mock_controller.archive_chunk(2022, limit=2) == 2
+    assert await mock_controller.archive_chunk(2022, limit=2) == 1
+    assert await mock_controller.archive_chunk(2022, limit=2) == 0
+
+    assert mock_controller.collection.count_documents({}) == 1
+    assert mock_controller.archive_collection.count_documents({"year": 2022}) == 3
+
+
+@pytest.mark.asyncio
+async def test_archive_chunk_rerun_during_copy(mock_controller, monkeypatch):
+    mock_controller.collection.insert_many(
+        [
+            {"content": f"Old {i}", "status": "SUCCESS", "result": None, "year": 2022}
+            for i in range(3)
+        ]
+    )
+    rerun = mock_controller.collection.find_one({"content": "Old 0"})
+    insert_many = mock_controller.archive_collection.insert_many
+
+    def copy_then_rerun(documents, **kwargs):
+        # The first verbatim is rerun between its copy and its deletion
+        result = insert_many(documents, **kwargs)
+        mock_controller.collection.update_one(
+            {"_id": rerun["_id"]}, {"$set": {"status": "RUN"}}
+        )
+        return result
+
+    monkeypatch.setattr(mock_controller.archive_collection, "insert_many", copy_then_rerun)
+    assert await mock_controller.archive_chunk(2022, limit=1) == 1
+    assert await mock_controller.archive_chunk(2022, limit=1) == 1
+    assert await mock_controller.archive_chunk(2022, limit=1) == 0
+
+    # The rerun verbatim stays in the hot collection only
+    assert mock_controller.collection.distinct("content") == ["Old 0"]
+    assert mock_controller.archive_collection.count_documents({"_id": rerun["_id"]}) == 0
+    assert mock_controller.archive_collection.count_documents({}) == 2
+
+
+@pytest.mark.asyncio
+async def test_tier_routing(mock_controller):
+    mock_controller.collection.insert_many(
+        [
+            {"content": "Hot", "status": "RUN", "result": None, "year": 2022},
+            {"content": "Other", "status": "SUCCESS", "result": None, "year": 2024},
+        ]
+    )
+    mock_controller.archive_collection.insert_many(
+        [
+            {"content": f"Cold {i}", "status": "SUCCESS", "result": None, "year": 2022}
+            for i in range(3)
+        ]
+    )
+
+    # The archive is only read once the year is recorded as archived
+    assert await mock_controller.count_verbatims({"year": 2022}) == 1
+    await mock_controller.set_tier_state(2022, "ARCHIVED")
+    assert mock_controller.archived_years() == {2022}
+    assert await mock_controller.count_verbatims({"year": 2022}) == 4
+
+    counts = await mock_controller.get_collection_count({"year": 2022})
+    assert counts["total"] == 4
+    assert counts["total_run"] == 1
+    assert counts["total_success"] == 3
+
+    # Queries without a year also reach the archive once a year is archived
+    assert (await mock_controller.get_collection_count())["total"] == 5
+    assert await mock_controller.count_verbatims({"status": "SUCCESS"}) == 4
+    assert await mock_controller.count_verbatims({"year": 2024}) == 1
+
+    # Pages span both tiers
+    first = await mock_controller.get_verbatims({"year": 2022}, pagination=1, per_page=3)
+    second = await mock_controller.get_verbatims({"year": 2022}, pagination=2, per_page=3)
+    contents = [v.content for v in first + second]
+    assert contents == ["Hot", "Cold 0", "Cold 1", "Cold 2"]
+
+    cold = mock_controller.archive_collection.find_one({"content": "Cold 0"})
+    assert await mock_controller.delete_verbatims([str(cold["_id"])]) == 1
+    assert await mock_controller.count_verbatims({"year": 2022}) == 3
+
+
+@pytest.mark.asyncio
+async def test_update_verbatim_status_attempt_token(mock_controller):
+    created = await mock_controller.create_verbatims(["Verbatim 1"], 2024)
+    verbatim_id = created[0].id
+    assert created[0].attempt_token == 1
+
+    # A rerun supersedes the first dispatch before its response arrives
+    tokens = await mock_controller.mark_dispatched([verbatim_id])
+    assert tokens == {verbatim_id: 2}
+
+    stale = await mock_controller.update_verbatim_status(
+        verbatim_id, Status.SUCCESS, None, attempt_token=1
+    )
+    assert stale.matched_count == 0
+    assert (await mock_controller.find_attempt_state(verbatim_id))["status"] == "RUN"
+
+    current = await mock_controller.update_verbatim_status(
+        verbatim_id, Status.SUCCESS, None, attempt_token=2
+    )
+    assert current.modified_count == 1
+
+    # The same response delivered twice is only applied once
+    duplicate = await mock_controller.update_verbatim_status(
+        verbatim_id, Status.ERROR, None, attempt_token=2
+    )
+    assert duplicate.matched_count == 0
+    verbatim = await mock_controller.find_verbatim_by_id(verbatim_id)
+    assert verbatim.status == Status.SUCCESS
+
+
+@pytest.mark.asyncio
+async def test_mark_dispatched_distinct_tokens(mock_controller):
+    created = await mock_controller.create_verbatims(["Verbatim 1"], 2024)
+    verbatim_id = created[0].id
+    unknown_id = "0" * 24
+
+    # Concurrent reruns of the same verbatim each get their own token
+    first, second = await asyncio.gather(
+        mock_controller.mark_dispatched([verbatim_id, unknown_id]),
+        mock_controller.mark_dispatched([verbatim_id]),
+    )
+    assert sorted([first[verbatim_id], second[verbatim_id]]) == [2, 3]
+    assert unknown_id not in first
+
+
+@pytest.mark.asyncio
+async def test_result_history(mock_controller):
+    created = await mock_controller.create_verbatims(["Verbatim 1"], 2024)
+    verbatim_id = created[0].id
+    first = Result(qualite_hoteliere={"repas": {"positive": 1}})
+    second = Result(qualite_hoteliere={"repas": {"negative": 1}})
+
+    await mock_controller.update_verbatim_status(verbatim_id, Status.SUCCESS, first)
+    assert await mock_controller.find_result_histories(2024) == []
+
+    tokens = await mock_controller.mark_dispatched([verbatim_id])
+    await mock_controller.update_verbatim_status(
+        verbatim_id, Status.SUCCESS, second, attempt_token=tokens[verbatim_id]
+    )
+
+    histories = await mock_controller.find_result_histories(2024)
+    assert histories == [[first.model_dump(), second.model_dump()]]
+    # The history is not returned by the listing
+    documents = await mock_controller.get_verbatim_documents({"year": 2024})
+    assert "result_history" not in documents[0]
+
+
+@pytest.mark.asyncio
+async def test_create_verbatims_rows(mock_controller):
+    mock_controller.collection.create_index(
+        [("batch_id", 1), ("row", 1)],
+        unique=True,
+        partialFilterExpression={"row": {"$exists": True}},
+    )
+    first = await mock_controller.create_verbatims(
+        ["Line 0", "Line 1"], 2024, batch_id="upload", rows=[0, 1]
+    )
+    assert [v.content for v in first] == ["Line 0", "Line 1"]
+    assert await mock_controller.find_existing_rows("upload", [1, 2]) == {1}
+
+    # A re-sent row is not inserted again, nor returned to be dispatched
+    resent = await mock_controller.create_verbatims(
+        ["Line 1", "Line 2"], 2024, batch_id="upload", rows=[1, 2]
+    )
+    assert [v.content for v in resent] == ["Line 2"]
+    assert mock_controller.collection.count_documents({"batch_id": "upload"}) == 3
+
+    # Rows moved to the archive since still count as inserted
+    mock_controller.collection.update_many({}, {"$set": {"status": Status.SUCCESS.value}})
+    await mock_controller.set_tier_state(2024, "ARCHIVED")
+    assert await mock_controller.archive_chunk(2024, limit=1) == 1
+    assert await mock_controller.find_existing_rows("upload", [0, 3], 2024) == {0}
@@ -0,0 +1,164 @@
+import base64
+import pytest
+from bson import ObjectId
+from llm4quality_api.models.models import Status
+from llm4quality_api.services import admission as admission_module
+from llm4quality_api.services import verbatims as verbatims_module
+from llm4quality_api.services.admission import AdmissionControl
+from llm4quality_api.services.verbatims import handle_csv_action, handle_rerun_action
+
+
+class FakeWebSocket:
+    """
+    Record the JSON messages sent to a client.
+    """
+
+    client = "test-client"
+
+    def __init__(self):
+        self.messages = []
+
+    async def send_json(self, data):
+        self.messages.append(data)
+
+    def statuses(self, status):
+        return [
+            message
+            for message in self.messages
+            if isinstance(message, dict) and message.get("status") == status
+        ]
+
+
+@pytest.fixture
+def published(monkeypatch, mock_controller, mock_uploads):
+    """
+    Mock the controllers, the admission control and RabbitMQ of the CSV
+    action, recording the published messages.
+    """
+    mock_controller.collection.create_index(
+        [("batch_id", 1), ("row", 1)],
+        unique=True,
+        partialFilterExpression={"row": {"$exists": True}},
+    )
+    admission = AdmissionControl(mock_controller, max_backlog=0)
+    monkeypatch.setattr(
+        admission_module,
+        "get_queue_stats",
+        lambda queue: {"message_count": 0, "consumer_count": 1},
+    )
+
+    messages = []
+    monkeypatch.setattr(verbatims_module, "get_verbatim_controller", lambda: mock_controller)
+    monkeypatch.setattr(verbatims_module, "get_upload_controller", lambda: mock_uploads)
+    monkeypatch.setattr(verbatims_module, "get_admission_control", lambda: admission)
+    monkeypatch.setattr(
+        verbatims_module,
+        "publish_messages",
+        lambda queue, batch: messages.extend(batch),
+    )
+    monkeypatch.setattr(verbatims_module.Config, "UPLOAD_CHUNK_SIZE", 2)
+    return messages
+
+
+def encode(lines):
+    return base64.b64encode("\n".join(lines).encode("utf-8")).decode("ascii")
+
+
+LINES = [
+    "Chambre propre et calme",
+    "",
+    "Repas froid le soir",
+    "RAS",
+    "Attente trop longue aux urgences",
+]
+
+
+@pytest.mark.asyncio
+async def test_resend_upload(published):
+    websocket = FakeWebSocket()
+    await handle_csv_action(websocket, encode(LINES), 2024, upload_key="survey.csv", owner="user-1")
+
+    # Chunks of 2 non-empty rows, committed past the blank line they skip
+    commits = [m["committed_offset"] for m in websocket.statuses("CSV chunk committed")]
+    assert commits == [3, 5]
+    (response,) = websocket.statuses("CSV processed")
+    assert response["count"] == 4
+    assert response["dispatched_count"] == 3
+    assert response["prefiltered_count"] == 1
+    assert response["committed_offset"] == 5
+    assert len(published) == 3
+
+    # Sending the same upload again publishes nothing
+    websocket = FakeWebSocket()
+    await handle_csv_action(websocket, encode(LINES), 2024, upload_key="survey.csv", owner="user-1")
+    (response,) = websocket.statuses("CSV processed")
+    assert response["count"] == 0
+    assert response["duplicate_count"] == 0
+    assert len(published) == 3
+
+
+@pytest.mark.asyncio
+async def test_resume_interrupted_upload(published):
+    # The first chunk was inserted and published, but its commit was lost
+    websocket = FakeWebSocket()
+    await handle_csv_action(websocket, encode(LINES[:3]), 2024, upload_key="survey.csv", owner="user-1")
+    uploads = verbatims_module.get_upload_controller()
+    uploads.collection.update_one({"owner": "user-1"}, {"$set": {"committed_offset": 0}})
+    assert len(published) == 2
+
+    # The rows already inserted are neither admitted nor published again
+    websocket = FakeWebSocket()
+    await handle_csv_action(websocket, encode(LINES), 2024, upload_key="survey.csv", owner="user-1")
+    (response,) = websocket.statuses("CSV processed")
+    assert response["duplicate_count"] == 2
+    assert response["dispatched_count"] == 1
+    assert response["prefiltered_count"] == 1
+    assert response["committed_offset"] == 5
+    assert len(published) == 3
+    controller = verbatims_module.get_verbatim_controller()
+    assert controller.collection.count_documents({"batch_id": "user-1:survey.csv"}) == 4
+
+
+@pytest.mark.asyncio
+async def test_upload_key_scoped_to_owner(published):
+    await handle_csv_action(FakeWebSocket(), encode(LINES), 2024, upload_key="survey.csv", owner="user-1")
+
+    # Another user sending a file under the same key has its rows inserted
+    websocket = FakeWebSocket()
+    await handle_csv_action(websocket, encode(LINES), 2024, upload_key="survey.csv", owner="user-2")
+    (response,) = websocket.statuses("CSV processed")
+    assert response["count"] == 4
+    assert response["duplicate_count"] == 0
+    assert len(published) == 6
+
+    # Resumable uploads require an authenticated user
+    websocket = FakeWebSocket()
+    await handle_csv_action(websocket, encode(LINES), 2024, upload_key="survey.csv")
+    assert websocket.messages[-1]["status"] == "error"
+    assert len(published) == 6
+
+
+@pytest.mark.asyncio
+async def test_rerun_archived_verbatim(published, mock_controller):
+    created = await mock_controller.create_verbatims(["Repas froid", "Chambre propre"], 2022)
+    mock_controller.collection.update_many({}, {"$set": {"status": "SUCCESS"}})
+    assert await mock_controller.archive_chunk(2022, limit=10) == 2
+    await mock_controller.set_tier_state(2022, "ARCHIVED")
+
+    websocket = FakeWebSocket()
+    await handle_rerun_action(websocket, [created[0].model_dump()])
+    (response,) = websocket.statuses("RERUN initiated")
+    assert response["published_count"] == 1
+    assert response["non_existing_count"] == 0
+    assert len(published) == 1
+
+    # The verbatim is back in the hot collection, and its response is stored
+    assert mock_controller.archive_collection.count_documents({}) == 1
+    restored = mock_controller.collection.find_one({"_id": ObjectId(created[0].id)})
+    assert restored["status"] == "RUN"
+    assert "deferred_at" not in restored
+    update = await mock_controller.update_verbatim_status(
+        created[0].id, Status.SUCCESS, None, attempt_token=restored["attempt_token"]
+    )
+    assert update.modified_count == 1
+    assert (await mock_controller.find_verbatim_by_id(created[0].id)).status == Status.SUCCESS